@@ -1,14 +1,45 @@
 """Generic algorithm configuration interface for unified planning."""
-import unified_planning
-from unified_planning.environment import get_environment
-from unified_planning.shortcuts import *
-from up_ac.utils.ac_feedback import qaul_feedback, runtime_feedback
-from up_ac.utils.patches import patch_pcs
-from tarski.io import PDDLReader as treader
+from up_ac.utils.ac_feedback import metric_objectives, record_feedback
+from up_ac.utils.log_parsers import parse_result
 
-from ConfigSpace.read_and_write import pcs
+# Engine discovery is expensive, cache it once per up environment
+_available_engines = {}
+_pcs = None
 
-pcs = patch_pcs(pcs)
+# Parameters of joint spaces are named <engine prefix><delimiter><name>,
+# irace only accepts alphanumeric names and underscores
+joint_delimiter = '__'
+
+
+def joint_prefix(engine):
+    """
+    Prefix of the parameters of an engine in a joint space.
+
+    Parameters:
+        engine (str): Name of the engine.
+
+    Returns:
+        str: Prefix of the engine's parameters.
+
+    """
+    return engine.replace('-', '_')
+
+
+def get_pcs():
+    """
+    Import and patch the ConfigSpace pcs reader on first use.
+
+    Returns:
+        module: Patched pcs module.
+
+    """
+    global _pcs
+    if _pcs is None:
+        from ConfigSpace.read_and_write import pcs
+        from up_ac.utils.patches import patch_pcs
+        _pcs = patch_pcs(pcs)
+
+    return _pcs
 
 
 class GenericACInterface():
@@ -16,17 +47,66 @@ class GenericACInterface():
 
     def __init__(self):
         """Initialize generic interface."""
-        self.environment = get_environment()
-        self.available_engines = self.get_available_engines()
+        self._environment = None
+        self._treader = None
+        self._plan_evaluator = None
+        # Compute quality from returned plans instead of engine logs
+        self.plan_quality = False
         self.engine_param_spaces = {}
         self.engine_param_types = {}
-        self.treader = treader(raise_on_error=True)
+        self.translators = {}
+        # Engines of joint spaces by name of the space
+        self.joint_engines = {}
+
+    @property
+    def environment(self):
+        """Up environment, loaded on first use."""
+        if self._environment is None:
+            from unified_planning.environment import get_environment
+            self._environment = get_environment()
+
+        return self._environment
+
+    @property
+    def available_engines(self):
+        """Planning engines installed in up, discovered on first use."""
+        return self.get_available_engines()
+
+    @property
+    def treader(self):
+        """Tarski PDDL reader for instance features, built on first use."""
+        if self._treader is None:
+            from tarski.io import PDDLReader as treader
+            self._treader = treader(raise_on_error=True)
+
+        return self._treader
+
+    @property
+    def plan_evaluator(self):
+        """Plan based quality evaluator, built on first use."""
+        if self._plan_evaluator is None:
+            from up_ac.utils.plan_metrics import PlanEvaluator
+            self._plan_evaluator = PlanEvaluator()
+
+        return self._plan_evaluator
 
     def get_available_engines(self):
-        """Get planning engines installed in up."""
-        factory = unified_planning.engines.factory.Factory(self.environment)
+        """
+        Get planning engines installed in up.
+
+        The engine factory is only queried once per environment, later
+        calls return the cached list.
+
+        Returns:
+            list: Names of the available engines.
+
+        """
+        key = id(self.environment)
+        if key not in _available_engines:
+            from unified_planning.engines.factory import Factory
+            _available_engines[key] = Factory(self.environment).engines
 
-        return factory.engines
+        return _available_engines[key]
 
     def compute_instance_features(self, domain, instance):
         """
@@ -43,8 +123,12 @@ class GenericACInterface():
         try:
             # TODO catch duplicte errors in tarski
             features = []
-            self.treader.parse_domain(domain)
-            problem = self.treader.parse_instance(instance)
+            # Tarski readers keep the language of their first domain,
+            # so every instance is read with a new reader
+            from tarski.io import PDDLReader as treader
+            reader = treader(raise_on_error=True)
+            reader.parse_domain(domain)
+            problem = reader.parse_instance(instance)
             lang = problem.language
             features.append(len(lang.predicates))
             features.append(len(lang.functions))
@@ -73,6 +157,7 @@ class GenericACInterface():
         if pcs_dir[-1] != '/':
             pcs_dir = pcs_dir + '/'
 
+        pcs = get_pcs()
         for engine in engines:
             with open(pcs_dir + engine + '.pcs', 'r') as f:
                 self.engine_param_spaces[engine] = pcs.read(f)
@@ -88,120 +173,258 @@ class GenericACInterface():
                         self.engine_param_types[engine][
                             '-' + line.split(' ')[0]] = 'FLAG'
 
-    def get_feedback(self, engine, fbtype, result):
+            self.translators.pop(engine, None)
+
+    def build_joint_space(self, engines, name='joint'):
+        """
+        Combine the parameter spaces of engines under a top-level engine choice.
+
+        Each engine's parameters are prefixed and only active if the
+        engine is chosen. The space is registered as a pseudo engine, so
+        configurators get the engine choice and parameters in one search.
+
+        Parameters:
+            engines (list of str): Names of the engines, their pcs has to be read before.
+            name (str, optional): Name to pass as engine to the configurators.
+
+        Returns:
+            ConfigSpace.ConfigurationSpace: The joint parameter space.
+
+        """
+        from ConfigSpace import ConfigurationSpace
+        from ConfigSpace.hyperparameters import CategoricalHyperparameter
+
+        joint_space = ConfigurationSpace()
+        engine_choice = CategoricalHyperparameter('engine', list(engines))
+        joint_space.add_hyperparameter(engine_choice)
+        for engine in engines:
+            joint_space.add_configuration_space(
+                joint_prefix(engine), self.engine_param_spaces[engine],
+                delimiter=joint_delimiter,
+                parent_hyperparameter={'parent': engine_choice,
+                                       'value': engine})
+        self.engine_param_spaces[name] = joint_space
+        self.joint_engines[name] = list(engines)
+
+        return joint_space
+
+    def split_joint_config(self, engine, configuration):
+        """
+        Select the engine and its configuration from a joint configuration.
+
+        Parameters:
+            engine (str): Name of the engine or joint space.
+            configuration (dict): The configuration with parameter names and values.
+
+        Returns:
+            tuple: Name of the chosen engine and its configuration, unchanged if engine is not a joint space.
+
+        """
+        if engine not in self.joint_engines:
+            return engine, configuration
+        configuration = dict(configuration)
+        engine = configuration.pop('engine')
+        prefix = joint_prefix(engine) + joint_delimiter
+
+        return engine, {name[len(prefix):]: value
+                        for name, value in configuration.items()
+                        if name.startswith(prefix)}
+
+    def get_translator(self, engine):
+        """
+        Get the compiled configuration translator of an engine.
+
+        Parameters:
+            engine (str): Name of the engine.
+
+        Returns:
+            ConfigTranslator: Translator compiled from the engine's pcs.
+
+        """
+        if engine not in self.translators:
+            from up_ac.utils.config_translator import ConfigTranslator
+            self.translators[engine] = ConfigTranslator(
+                engine, self.engine_param_spaces.get(engine),
+                self.engine_param_types.get(engine))
+
+        return self.translators[engine]
+
+    def transform_conf_from_ac(self, engine, configuration):
+        """
+        Transform a configuration to the format expected by the planning engines.
+
+        Parameters:
+            engine (str): Name of the planning engine.
+            configuration (dict): The configuration with parameter names and values.
+
+        Returns:
+            dict: The transformed configuration in the engine's expected format.
+
+        Raises:
+            InvalidConfigurationError: If the configuration does not translate to valid engine options.
+
+        """
+        engine, configuration = self.split_joint_config(engine, configuration)
+
+        return self.get_translator(engine).translate(configuration)
+
+    def canonicalize(self, engine, configuration):
+        """
+        Map a configuration to the engine invocation it produces.
+
+        Parameters:
+            engine (str): Name of the planning engine.
+            configuration (dict): The configuration with parameter names and values.
+
+        Returns:
+            tuple: Hash of the engine invocation and the configuration without inactive parameters.
+
+        Raises:
+            InvalidConfigurationError: If the configuration does not translate to valid engine options.
+
+        """
+        joint = engine in self.joint_engines
+        engine, configuration = self.split_joint_config(engine, configuration)
+        translator = self.get_translator(engine)
+        config_hash = translator.invocation_hash(configuration)
+        configuration = translator.cast(configuration)
+        if joint:
+            prefix = joint_prefix(engine) + joint_delimiter
+            configuration = {'engine': engine,
+                             **{prefix + name: value
+                                for name, value in configuration.items()}}
+
+        return config_hash, configuration
+
+    def get_feedback(self, engine, fbtype, result, record=None):
         """
         Get feedback from a planning engine after a run.
 
         Parameters:
             engine (str): Name of the planning engine.
-            fbtype (str): Type of feedback: 'quality' or 'runtime'.
+            fbtype (str): Type of feedback: 'quality', 'runtime' or 'runtime_quality'.
             result (object): Planning result.
+            record (EngineRecord, optional): Parsed output of the run.
 
         Returns:
-            object: Feedback based on the specified feedback type.
+            object: Feedback based on the specified feedback type, a dict with 'runtime' and 'quality' feedback for 'runtime_quality'.
 
         Raises:
             ValueError: If an unsupported feedback type is provided.
 
         """
-        if fbtype == 'quality':
-            feedback = qaul_feedback(engine, result)
-        if fbtype == 'runtime':
-            feedback = runtime_feedback(engine, result)
+        if fbtype not in metric_objectives:
+            raise ValueError(f'Feedback type {fbtype} is not supported.')
+        if record is None:
+            fields = [{'quality': 'cost', 'runtime': 'search_time'}[m]
+                      for m in metric_objectives[fbtype]]
+            record = parse_result(engine, result, fields)
 
-        return feedback
+        return record_feedback(engine, fbtype, record)
 
     def run_engine_config(self, config, metric, engine,
-                          plantype, problem, gray_box_listener=None):
+                          plantype, problem, gray_box_listener=None,
+                          with_record=False, timelimit=None,
+                          plan_channel=None):
         """
         Execute a configured engine run.
 
         Parameters:
             config (dict): Configuration of the engine.
-            metric (str): Metric for the evaluation: 'runtime' or 'quality'.
-            engine (str): Name of the engine.
+            metric (str): Metric for the evaluation: 'runtime', 'quality' or 'runtime_quality'.
+            engine (str): Name of the engine, or of a joint space to run the engine the configuration chooses.
             plantype (str): Type of planning: 'OneshotPlanner' or 'AnytimePlanner'.
             problem (str): Path to the problem instance.
             gray_box_listener (bool, optional): True if using a gray box approach.
+            with_record (bool, optional): True to also return the parsed engine output.
+            timelimit (float, optional): Time limit of the run, passed to engines that support timeouts.
+            plan_channel (PlanChannel, optional): Receives the plans of anytime planner runs as they are found.
 
         Returns:
-            object: Result from the configured engine run.
+            object: Feedback from the configured engine run, and its EngineRecord (None if the run failed) if with_record.
 
         Raises:
             ValueError: If an unsupported planning type is provided.
+            ConfigurationCrash: If the engine fails on the configuration itself.
 
         """
-        if plantype == 'OneshotPlanner':
-            config = self.transform_conf_from_ac(engine, config)
-            if gray_box_listener is not None:
-                with OneshotPlanner(name=engine,
-                                    params=config,
-                                    output_stream=gray_box_listener) as planner:
-                    try:
-                        result = planner.solve(problem)
-                        if (result.status ==
-                                up.engines.PlanGenerationResultStatus.
-                                SOLVED_SATISFICING):
-                            print("Result found.\n")
-                        else:
-                            print("No plan found.\n")
-                        feedback = self.get_feedback(engine, metric, result)
-                    except:
-                        print("No plan found.\n")
-                        feedback = None
-            else:
-                with OneshotPlanner(name=engine,
-                                    params=config) as planner:
-                    print(config)
-                    # result = planner.solve(problem)
-                    
-                    try:
-                        result = planner.solve(problem)
-                        print('RESULT', result)
-                        print(result.log_messages)
-                        if (result.status ==
-                                up.engines.PlanGenerationResultStatus.
-                                SOLVED_SATISFICING):
-                            print("Result found.\n")
-                        else:
-                            print("No plan found.\n")
-                        feedback = self.get_feedback(engine, metric, result)
-                    except:
-                        print("No plan found.\n")
-                        feedback = None
-
-        elif plantype == 'AnytimePlanner':
-            config = self.transform_conf_from_ac(engine, config)
-            if gray_box_listener is not None:
-                with AnytimePlanner(name=engine,
-                                    params=config,
-                                    output_stream=gray_box_listener) as planner:
-                    try:
-                        result = planner.solve(problem)
-                        if (result.status ==
-                                up.engines.PlanGenerationResultStatus.
-                                SOLVED_SATISFICING):
-                            print("Result found.\n")
-                        else:
-                            print("No plan found.\n")
-                        feedback = self.get_feedback(engine, metric, result)
-                    except:
-                        print("No plan found.\n")
-                        feedback = None
+        import warnings
+
+        from unified_planning.shortcuts import OneshotPlanner, AnytimePlanner
+        from unified_planning.engines import PlanGenerationResultStatus
+        from up_ac.utils.anytime import collect_solutions
+        from up_ac.utils.crash_classification import ConfigurationCrash, \
+            config_error_in_result, is_config_error
+
+        planners = {'OneshotPlanner': OneshotPlanner,
+                    'AnytimePlanner': AnytimePlanner}
+        if plantype not in planners:
+            raise ValueError(f'Planning type {plantype} is not supported.')
+
+        engine, config = self.split_joint_config(engine, config)
+        config = self.transform_conf_from_ac(engine, config)
+        planner_args = {'name': engine, 'params': config}
+        if gray_box_listener is not None:
+            planner_args['output_stream'] = gray_box_listener
+        try:
+            planner = planners[plantype](**planner_args)
+        except (TypeError, ValueError) as err:
+            # Engines reject unknown or malformed options on creation
+            raise ConfigurationCrash(
+                f'{engine} rejected its options: {err}') from err
+
+        curve = None
+        with planner:
+            try:
+                if plantype == 'AnytimePlanner':
+                    # Stream intermediate plans into a quality curve
+                    result, curve = collect_solutions(
+                        planner, problem, self.plan_evaluator, timelimit,
+                        plan_channel)
+                else:
+                    with warnings.catch_warnings():
+                        # Engines without timeouts are killed at the time
+                        # limit instead, see Configurator.run_engine
+                        warnings.filterwarnings(
+                            'ignore', '.*does not support timeout')
+                        result = planner.solve(problem, timeout=timelimit)
+            except Exception as err:
+                if is_config_error(err):
+                    raise ConfigurationCrash(
+                        f'{engine} rejected its options: {err}') from err
+                print("No plan found.\n")
+                return (None, None) if with_record else None
+
+            reason = config_error_in_result(result)
+            if reason is not None:
+                raise ConfigurationCrash(
+                    f'{engine} rejected its options: {reason}')
+            if curve is not None and curve.points:
+                print("Result found.\n")
+            elif (result is not None and result.status ==
+                    PlanGenerationResultStatus.SOLVED_SATISFICING):
+                print("Result found.\n")
             else:
-                with AnytimePlanner(name=engine,
-                                    params=config) as planner:
-                    try:
-                        result = planner.solve(problem)
-                        if (result.status ==
-                                up.engines.PlanGenerationResultStatus.
-                                SOLVED_SATISFICING):
-                            print("Result found.\n")
-                        else:
-                            print("No plan found.\n")
-                        feedback = self.get_feedback(engine, metric, result)
-                    except:
-                        print("No plan found.\n")
-                        feedback = None
+                print("No plan found.\n")
+            try:
+                record = parse_result(engine, result)
+                if curve is not None:
+                    record.curve = curve.points
+                    record.cost = curve.best()
+                    if 'runtime' in metric_objectives[metric]:
+                        # Anytime planners are timed to their first plan
+                        record.search_time = curve.first_solution_time()
+                elif 'quality' in metric_objectives[metric] and \
+                        (self.plan_quality or record.cost is None):
+                    # Engine logs without a cost line, e.g. fmap
+                    record.cost = self.plan_evaluator.plan_cost(
+                        problem, result.plan)
+                feedback = self.get_feedback(engine, metric, result, record)
+            except Exception:
+                record = None
+                feedback = None
+
+        if with_record:
+            return feedback, record
 
         return feedback
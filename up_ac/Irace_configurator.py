@@ -1,11 +1,10 @@
 """Functionalities for managing and calling configurators."""
-from irace import irace
 from unified_planning.exceptions import UPProblemDefinitionError, UPException
-from pebble import concurrent
-from concurrent.futures import TimeoutError
 
 from up_ac.AC_interface import *
 from up_ac.configurators import Configurator
+from up_ac.utils.ac_feedback import quality_crash_cost
+from up_ac.utils.crash_classification import ConfigurationCrash
 
 import timeit
 
@@ -25,7 +24,7 @@ class IraceConfigurator(Configurator):
         Parameters:
             gaci (object): AC interface object.
             engine (str): Name of the planning engine.
-            metric (str): Metric type, either 'runtime' or 'quality'.
+            metric (str): Metric type, 'runtime', 'quality' or 'runtime_quality'.
             mode (str): Type of planning mode.
             gray_box (bool, optional): True if using a gray box approach.
 
@@ -36,88 +35,64 @@ class IraceConfigurator(Configurator):
             ValueError: If the provided engine, metric, or mode is not supported.
 
         """
-        if engine in self.capabilities[metric][mode]:
+        if self.is_supported(gaci, engine, metric, mode):
             self.metric = metric
 
+            if self.trial_store is None:
+                self.set_trial_store()
+
             def planner_feedback(experiment, scenario):
+                # Benchmark the machine before the first run is timed
+                self.speed_factor()
                 start = timeit.default_timer()
                 instance_p = \
                     self.scenario['instances'][experiment['id.instance'] - 1]
+                config = dict(experiment['configuration'])
+                trial, cost = self.lookup_trial(gaci, engine, metric, mode,
+                                                config, instance_p)
+                if cost is not None:
+                    # Same engine invocation was evaluated before
+                    self.print_feedback(engine, instance_p, cost)
+                    return {'cost': self.scalarize(
+                                self.training_cost(instance_p, cost)),
+                            'time': timeit.default_timer() - start}
+
                 domain_path = instance_p.rsplit('/', 1)[0]
                 domain = f'{domain_path}/domain.pddl'
                 pddl_problem = self.reader.parse_problem(f'{domain}',
                                                          f'{instance_p}')
-                config = dict(experiment['configuration'])
 
-                '''
-                feedback = \
-                    gaci.run_engine_config(config,
-                                           metric,
-                                           engine,
-                                           mode,
-                                           pddl_problem)
-                '''
+                record = None
+                timelimit = self.timelimit_for(instance_p)
                 try:
-                    @concurrent.process(timeout=self.planner_timelimit)
-                    def solve(config, metric, engine,
-                              mode, pddl_problem):
-                        feedback = \
-                            gaci.run_engine_config(config,
-                                                   metric, engine,
-                                                   mode, pddl_problem)
-
-                        return feedback
-
-                    feedback = solve(config, metric, engine,
-                                     mode, pddl_problem)
-                    
-                    try:
-                        feedback = feedback.result()
-                    except TimeoutError:
-                        if metric == 'runtime':
-                            feedback = self.planner_timelimit
-                        elif metric == 'quality':
-                            feedback = self.crash_cost
-
+                    feedback, record = self.run_engine(
+                        gaci, config, metric, engine, mode, pddl_problem,
+                        self.run_timelimit(instance_p))
+                except ConfigurationCrash as err:
+                    self.quarantine_trial(trial, err)
+                    feedback = None
                 except (AssertionError, NotImplementedError,
                         UPProblemDefinitionError, UPException,
                         UnicodeDecodeError) as err:
                     print('\n** Error in planning engine!', err)
-                    if metric == 'runtime':
-                        feedback = self.planner_timelimit
-                    elif metric == 'quality':
-                        feedback = self.crash_cost
-
-                if feedback is not None:
-                    if metric == 'quality':
-                        self.print_feedback(engine, instance_p, feedback)
-                        runtime = timeit.default_timer() - start
-                        feedback = {'cost': -feedback, 'time': runtime}
-                        return feedback
-                    elif metric == 'runtime':
-                        if engine in ('tamer', 'pyperplan'):
-                            feedback = timeit.default_timer() - start
-                            self.print_feedback(engine, instance_p, feedback)
-                            feedback = {'cost': feedback, 'time': feedback}
-                        else:
-                            feedback = feedback
-                            self.print_feedback(engine, instance_p, feedback)
-                            feedback = {'cost': feedback, 'time': feedback}
-                        return feedback
+                    feedback = None
+
+                cost = self.resolve_feedback(engine, metric, feedback, start,
+                                             record, trial)
+                self.print_feedback(engine, instance_p, cost)
+                self.record_trial(trial, cost, record)
+                if metric == 'quality':
+                    runtime = timeit.default_timer() - start
                 else:
-                    # Penalizing failed runs
-                    if metric == 'runtime':
-                        # Penalty is max runtime in runtime scenario
-                        feedback = self.scenario['boundMax']
-                        self.print_feedback(engine, instance_p, feedback)
-                        feedback = {'cost': feedback, 'time': feedback}
-                    else:
-                        # Penalty is defined by user in quality scenario
-                        feedback = self.crash_cost
-                        self.print_feedback(engine, instance_p, feedback)
-                        feedback = {'cost': feedback, 'time': feedback}
-
-                    return feedback
+                    # PAR-k penalties are not spent time
+                    runtime = cost['runtime'] if isinstance(cost, dict) \
+                        else cost
+                    runtime = min(runtime, timelimit)
+
+                # Irace races on one cost, objectives are weighted
+                return {'cost': self.scalarize(
+                            self.training_cost(instance_p, cost)),
+                        'time': runtime}
 
             return planner_feedback
         else:
@@ -127,9 +102,13 @@ class IraceConfigurator(Configurator):
 
     def set_scenario(self, engine, param_space, gaci,
                      configuration_time=120,
-                     n_trials=400, min_budget=1, max_budget=3, crash_cost=0,
+                     n_trials=400, min_budget=1, max_budget=3,
+                     crash_cost=quality_crash_cost,
                      planner_timelimit=30, n_workers=1, instances=[],
-                     instance_features=None, metric='runtime'):
+                     instance_features=None, metric='runtime',
+                     par_k=1, runtime_statistic='mean',
+                     impute_censored=False, instance_weights=None,
+                     instance_order=None):
         """
         Set up the algorithm configuration scenario.
 
@@ -141,12 +120,17 @@ class IraceConfigurator(Configurator):
             n_trials (int, optional): Maximum number of engine evaluations.
             min_budget (int, optional): Minimum number of instances to use.
             max_budget (int, optional): Maximum number of instances to use.
-            crash_cost (int, optional): The cost to use if the engine fails.
+            crash_cost (float, optional): Quality cost of runs without a plan, worse than any plan cost.
             planner_timelimit (int, optional): Maximum runtime per evaluation.
             n_workers (int, optional): Number of cores to utilize.
             instances (list, optional): List of problem instance paths.
             instance_features (dict, optional): Dictionary containing instance names and lists of features.
-            metric (str, optional): Optimization metric, either 'runtime' or 'quality'.
+            metric (str, optional): Optimization metric, 'runtime', 'quality' or 'runtime_quality'. Irace minimizes the weighted objectives of 'runtime_quality', see set_objective_weights.
+            par_k (float, optional): Timeouts cost par_k times the planner time limit.
+            runtime_statistic (str or float, optional): 'mean', 'median' or a quantile to aggregate runtimes in evaluate.
+            impute_censored (bool, optional): Impute timed out runtimes from solved runs on the instance.
+            instance_weights (dict, optional): Instance paths and weights, e.g. of a representative subset. Costs are scaled so that training minimizes the weighted mean.
+            instance_order (str, optional): Race on instances by estimated hardness, 'cheapest' or 'stratified', see order_instances. Irace samples the instances if None.
 
         Raises:
             ValueError: If the provided metric is not supported.
@@ -156,9 +140,15 @@ class IraceConfigurator(Configurator):
             instances = self.train_set
         self.crash_cost = crash_cost
         self.planner_timelimit = planner_timelimit
-        default_conf, forbiddens = gaci.get_ps_irace(param_space)
-
-        if metric == 'quality':
+        self.set_runtime_aggregation(par_k, runtime_statistic,
+                                     impute_censored)
+        self.instance_weights = instance_weights
+        instances = self.order_instances(instances, instance_order, engine,
+                                         instance_features=instance_features)
+        default_conf, forbiddens = gaci.get_ps_irace(param_space,
+                                                     self.initial_configs)
+
+        if metric in ('quality', 'runtime_quality'):
             test_type = 'friedman'
             capping = False
         elif metric == 'runtime':
@@ -184,7 +174,9 @@ class IraceConfigurator(Configurator):
                 testType=test_type,
                 capping=capping,
                 boundMax=planner_timelimit,
-                firstTest=min_budget
+                firstTest=min_budget,
+                # Ordered instances are raced in their order
+                sampleInstances=self.instance_order is None
             )
         else:
             scenario = dict(
@@ -204,7 +196,9 @@ class IraceConfigurator(Configurator):
                 testType=test_type,
                 capping=capping,
                 boundMax=planner_timelimit,
-                firstTest=min_budget
+                firstTest=min_budget,
+                # Ordered instances are raced in their order
+                sampleInstances=self.instance_order is None
             )
 
         self.irace_param_space = gaci.irace_param_space
@@ -224,11 +218,13 @@ class IraceConfigurator(Configurator):
         Returns:
             tuple or None: A tuple containing:
                 - dict: The best configuration found.
+                - list or None: Pareto front of the configurations for 'runtime_quality'.
                 - None: If there is no feedback function.
 
         """
 
         if feedback_function is not None:
+            from irace import irace
 
             print('\nStarting Parameter optimization\n')
             ac = irace(self.scenario,
@@ -241,6 +237,10 @@ class IraceConfigurator(Configurator):
             print('\nBest Configuration found is:\n',
                   self.incumbent)
 
-            return self.incumbent, None
+            front = None
+            if self.metric == 'runtime_quality':
+                front = self.get_pareto_front()
+
+            return self.incumbent, front
         else:
             return None, None
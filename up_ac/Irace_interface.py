@@ -1,10 +1,5 @@
 """Irace algorithm configuration interface for unified planning."""
-import pandas as pd
-import rpy2.robjects as ro
-from rpy2.robjects import pandas2ri
-
 from up_ac.AC_interface import GenericACInterface
-from up_ac.utils.pcs_transform import transform_pcs
 
 from ConfigSpace.hyperparameters import (
     CategoricalHyperparameter,
@@ -25,138 +20,23 @@ class IraceInterface(GenericACInterface):
         """Initialize Irace interface."""
         GenericACInterface.__init__(self)
 
-    def transform_conf_from_ac(self, engine, configuration):
-        """
-        Transform configuration from algorithm configuration format to engine format.
-
-        This function takes a configuration in the algorithm configuration format, specific to the provided engine,
-        and transforms it into the corresponding format for the given engine.
-
-        Args:
-            engine (str): Name of the engine for which the configuration is being transformed.
-            configuration (dict): A dictionary containing parameter names with their values.
-
-        Returns:
-            dict: A dictionary containing the transformed configuration for the specified engine.
-
-        Raises:
-            ValueError: If the specified engine is not supported.
-
-        Note:
-            The transformation process varies based on the engine type and specific configurations.
-
-        """
-        config = transform_pcs(engine, configuration)
-        if engine == 'lpg':
-            del_list = []
-            add_list = []
-            for pname, pvalue in config.items():
-                if pname in self.engine_param_types['lpg']:
-                    if self.engine_param_types['lpg'][pname] == 'FLAGS':
-                        del_list.append(pname)
-                        flag_pname = pname + '=' + config[pname]
-                        add_list.append(flag_pname)
-                    elif self.engine_param_types['lpg'][pname] == 'FLAG':
-                        if config[pname] == '1':
-                            config[pname] = ''
-                        else:
-                            del_list.append(pname)
-
-            for dl in del_list:
-                del config[dl]
-
-            for al in add_list:
-                config[al] = ''
-
-        if engine == 'fast-downward' or engine == 'symk':
-
-            evals = ['eager_greedy', 'eager_wastar',
-                     'lazy_greedy', 'lazy_wastar']
-            open_eval = ['epsilon_greedy', 'single']
-            open_evals = ['pareto', 'tiebreaking',
-                          'type_based']
-            pruning = ['atom_centric_stubborn_sets']
-
-            if len(config) == 1:
-                pass
-            else:
-                search_option = config['fast_downward_search_config'] + '('                    
-                if 'evaluator' in config:
-                    if config['evaluator'] in evals:
-                        search_option += \
-                            '[' + str(config['evaluator']) + '()], '
-                    else:
-                        search_option += str(config['evaluator']) + '(), '
-
-                if 'open' in config:
-                    if config['open'] not in open_eval and \
-                            config['open'] not in open_evals:
-                        search_option += '[' + str(config['open']) + '()], '
-                    elif config['open'] in open_eval:
-                        search_option += \
-                            '[' + str(config['open']) + '(' + \
-                            str(config['open_list_evals']) + ')], '
-                    elif config['open'] in open_evals:
-                        search_option += '[' + str(config['open']) + '([]' + \
-                            str(config['open_list_evals']) + '])], '
-
-                if 'evaluator' in config:
-                    if config['evaluator'] == 'ehc':
-                        search_option += 'preferred_usage=' + \
-                            str(config['ehc_preferred_usage']) + ','
-
-                if 'reopen_closed' in config:
-                    search_option += 'reopen_closed=' + \
-                        str(config['reopen_closed']) + ','
-
-                if 'randomize_successors' in config:
-                    search_option += 'randomize_successors=' + \
-                        str(config['randomize_successors']) + ','
-
-                if 'pruning' in config:
-                    if config['pruning'] in pruning:
-                        search_option += 'pruning=' + \
-                            str(config['pruning'])  # + '(use_sibling_shortcut=' \
-                        '''
-                            + config[
-                                'atom_centric_stubborn_sets_use_sibling'] + \
-                            ',atom_selection_strategy=' + \
-                            config['atom_selection_strategy'] + '(), '
-                        '''
-                    else:
-                        search_option += \
-                            'pruning=' + str(config['pruning']) + '(),'
-
-                if 'cost_type' in config:
-                    search_option += 'cost_type=' + config['cost_type'] + ')'
-                else:
-                    search_option += ')'
-                search_option = search_option.replace(" ", "")
-
-                if engine == 'fast-downward':
-                    config = {'fast_downward_search_config': search_option}
-                else:
-                    config = {'symk_search_config': search_option}
-
-        else:
-            config = configuration
-
-        return config
-
-    def get_ps_irace(self, param_space):
+    def get_ps_irace(self, param_space, initial_configs=None):
         """
         Retrieve parameter space information for configuring irace.
 
         Parameters:
             param_space (ConfigSpace.ConfigurationSpace): The ConfigSpace object defining the parameter space.
+            initial_configs (list, optional): Configurations irace starts from next to the default.
 
         Returns:
             tuple: A tuple containing:
-                - dict: Default values for parameters.
+                - dict: Default values for parameters, then the initial configurations.
                 - bool: Indicates if there are forbidden parameter value combinations.
 
         """
-
+        import pandas as pd
+        import rpy2.robjects as ro
+        from rpy2.robjects import pandas2ri
 
         def set_conditional(c, parent, cond_params):
             """
@@ -217,7 +97,12 @@ class IraceInterface(GenericACInterface):
             names.append(param.name)
             values.append(param.default_value)
 
-        default_conf = pd.DataFrame([values], columns=names)
+        rows = [values]
+        for config in initial_configs or []:
+            # Inactive parameters keep their default, as in the default row
+            rows.append([config.get(name, value)
+                         for name, value in zip(names, values)])
+        default_conf = pd.DataFrame(rows, columns=names)
 
         with (ro.default_converter + pandas2ri.converter).context():
             default_conf = ro.conversion.get_conversion().py2rpy(default_conf)
@@ -1,6 +1,7 @@
 """Functionalities for managing and calling configurators."""
 from up_ac.AC_interface import *
 from up_ac.configurators import Configurator
+from up_ac.utils.ac_feedback import quality_crash_cost
 
 import timeit
 import os
@@ -10,14 +11,16 @@ from queue import Queue
 import subprocess
 import dill 
 import shutil
-from unified_planning.exceptions import UPProblemDefinitionError
-from pebble import concurrent
-from concurrent.futures import TimeoutError
+from unified_planning.exceptions import UPProblemDefinitionError, UPException
+from up_ac.utils.crash_classification import ConfigurationCrash
 
 
 class OATConfigurator(Configurator):
     """Configurator functions."""
 
+    # The feedback function is passed to OAT in one shared file
+    parallel_campaigns = False
+
     def __init__(self):
         """Initialize OAT configurator."""
         Configurator.__init__(self)
@@ -50,16 +53,19 @@ class OATConfigurator(Configurator):
         Parameters:
             gaci: AC interface object.
             engine (str): Engine name.
-            metric (str): Optimization metric ('runtime' or 'quality').
+            metric (str): Optimization metric ('runtime', 'quality' or 'runtime_quality').
             mode (str): Type of planning.
             gray_box (bool): True if gray box to use.
 
         Returns:
             function: Planner feedback function.
         """
-        if engine in self.capabilities[metric][mode]:
+        if self.is_supported(gaci, engine, metric, mode):
             self.metric = metric
 
+            if self.trial_store is None:
+                self.set_trial_store()
+
             if gray_box:
                 class gb_out():
                     def __init__(self, q, res):
@@ -94,25 +100,40 @@ class OATConfigurator(Configurator):
                 sys.path.append(r"{}".format(path))
 
                 self.reader = reader 
-                
+
+                # Benchmark the machine before the first run is timed
+                self.speed_factor()
                 start = timeit.default_timer()
                 instance_p = f'{instance}'
+                trial, cost = self.lookup_trial(gaci, engine, metric, mode,
+                                                config, instance_p)
+                if cost is not None:
+                    # Same engine invocation was evaluated before
+                    self.print_feedback(engine, instance_p, cost)
+                    return self.scalarize(
+                        self.training_cost(instance_p, cost))
+
                 domain_path = instance_p.rsplit('/', 1)[0]
                 domain = f'{domain_path}/domain.pddl'
                 pddl_problem = self.reader.parse_problem(f'{domain}',
                                                          f'{instance_p}')
+                record = None
                 # gray box in OAT only works with runtime scenarios
                 if gray_box:
                     def planner_thread(gb_out, problem, res,
                                        config, metric, engine, mode, 
                                        pddl_problem):
-                        res.put(
-                            gaci.run_engine_config(config,
-                                                   metric,
-                                                   engine,
-                                                   mode,
-                                                   pddl_problem,
-                                                   gb_out))
+                        try:
+                            res.put(
+                                gaci.run_engine_config(config,
+                                                       metric,
+                                                       engine,
+                                                       mode,
+                                                       pddl_problem,
+                                                       gb_out))
+                        except UPException as err:
+                            # Hand errors to the waiting configurator
+                            res.put(err)
 
                     thread = Thread(target=planner_thread,
                                     args=(gb_out, pddl_problem, res,
@@ -133,69 +154,31 @@ class OATConfigurator(Configurator):
                             thread.join()
 
                     feedback = res.get()
+                    if isinstance(feedback, ConfigurationCrash):
+                        self.quarantine_trial(trial, feedback)
+                    if isinstance(feedback, UPException):
+                        feedback = None
 
                 else:
-                    feedback = \
-                        gaci.run_engine_config(config,
-                                               metric,
-                                               engine,
-                                               mode,
-                                               pddl_problem)
-                                               
                     try:
-                        @concurrent.process(timeout=self.scenario['timelimit'])
-                        def solve(config, metric, engine,
-                                  mode, pddl_problem):
-                            feedback = \
-                                gaci.run_engine_config(config,
-                                                       metric, engine,
-                                                       mode, pddl_problem)
-
-                            return feedback
-
-                        feedback = solve(config, metric, engine,
-                                         mode, pddl_problem)
-                    
-                        try:
-                            feedback = feedback.result()
-                        except TimeoutError:
-                            if metric == 'runtime':
-                                feedback = self.planner_timelimit
-                            elif metric == 'quality':
-                                feedback = self.crash_cost
-
+                        feedback, record = self.run_engine(
+                            gaci, config, metric, engine, mode,
+                            pddl_problem, self.run_timelimit(instance_p))
+                    except ConfigurationCrash as err:
+                        self.quarantine_trial(trial, err)
+                        feedback = None
                     except (AssertionError, NotImplementedError,
-                            UPProblemDefinitionError):
+                            UPProblemDefinitionError, UPException):
                         print('\n** Error in planning engine!')
-                        if metric == 'runtime':
-                            feedback = self.planner_timelimit
-                        elif metric == 'quality':
-                            feedback = self.crash_cost
-
-                if feedback is not None:
-                    if metric == 'quality':
-                        self.print_feedback(engine, instance_p, feedback)
-                        return -feedback
-                    elif metric == 'runtime':
-                        if engine in ('tamer', 'pyperplan'):
-                            feedback = timeit.default_timer() - start
-                            self.print_feedback(engine, instance_p, feedback)
-                        else:
-                            feedback = feedback
-                            self.print_feedback(engine, instance_p, feedback)
-                        return feedback
-                else:
-                    # Penalizing failed runs
-                    if metric == 'runtime':
-                        # Penalty is max runtime in runtime scenario
-                        feedback = self.scenario['timelimit']
-                        self.print_feedback(engine, instance_p, feedback)
-                    else:
-                        # Penalty is defined by user in quality scenario
-                        feedback = self.crash_cost
-                        self.print_feedback(engine, instance_p, feedback)
-
-                    return feedback
+                        feedback = None
+
+                cost = self.resolve_feedback(engine, metric, feedback, start,
+                                             record, trial)
+                self.print_feedback(engine, instance_p, cost)
+                self.record_trial(trial, cost, record)
+
+                # OAT tunes for one value, objectives are weighted
+                return self.scalarize(self.training_cost(instance_p, cost))
 
             path_to_OAT = 'path_to_OAT'
 
@@ -214,9 +197,12 @@ class OATConfigurator(Configurator):
 
     def set_scenario(self, engine, param_space, gaci,
                      configuration_time=120, n_trials=400, min_budget=1,
-                     max_budget=3, crash_cost=0, planner_timelimit=30,
+                     max_budget=3, crash_cost=quality_crash_cost,
+                     planner_timelimit=30,
                      n_workers=1, instances=[], instance_features=None,
-                     metric='runtime', popSize=128, evlaLimit=2147483647):
+                     metric='runtime', popSize=128, evlaLimit=2147483647,
+                     par_k=1, runtime_statistic='mean', impute_censored=False,
+                     instance_weights=None, instance_order=None):
         """
         Set up algorithm configuration scenario.
 
@@ -228,18 +214,29 @@ class OATConfigurator(Configurator):
             n_trials (int): Maximum number of engine evaluations.
             min_budget (int): Minimum number of instances to use.
             max_budget (int): Maximum number of instances to use.
-            crash_cost (int): Cost to use if engine fails.
+            crash_cost (float): Quality cost of runs without a plan, worse than any plan cost.
             planner_timelimit (int): Maximum runtime per evaluation.
             n_workers (int): Number of cores to utilize.
             instances (list): Problem instance paths.
             instance_features: Dict of instance names and lists of features.
-            metric (str): Optimization metric.
+            metric (str): Optimization metric, for 'runtime_quality' OAT minimizes the weighted objectives, see set_objective_weights.
+            par_k (float): Timeouts cost par_k times the planner time limit.
+            runtime_statistic (str or float): 'mean', 'median' or a quantile to aggregate runtimes in evaluate.
+            impute_censored (bool): Impute timed out runtimes from solved runs on the instance.
+            instance_weights (dict): Instance paths and weights, e.g. of a representative subset. Costs are scaled so that training minimizes the weighted mean.
+            instance_order (str): Write the instance folder by estimated hardness, 'cheapest' or 'stratified', see order_instances.
             popSize (int): Population size of configs per generation (OAT).
             evlaLimit (int): Maximum number of evaluations (OAT).
         """
         if not instances:
             instances = self.train_set
         self.crash_cost = crash_cost
+        self.planner_timelimit = planner_timelimit
+        self.set_runtime_aggregation(par_k, runtime_statistic,
+                                     impute_censored)
+        self.instance_weights = instance_weights
+        instances = self.order_instances(instances, instance_order, engine,
+                                         instance_features=instance_features)
 
         param_file = gaci.get_ps_oat(param_space)
 
@@ -261,9 +258,11 @@ class OATConfigurator(Configurator):
             shutil.rmtree(inst_dir, ignore_errors=True)
 
         os.mkdir(inst_dir)
+        # Zero padded names keep the order of the instances when sorted
+        digits = len(str(len(instances)))
         file_name = 0
         for inst in instances:
-            with open(f'{inst_dir}/{file_name}.txt', 'w') as f:
+            with open(f'{inst_dir}/{file_name:0{digits}d}.txt', 'w') as f:
                 f.write(f'{inst}')
             file_name += 1
 
@@ -292,13 +291,13 @@ class OATConfigurator(Configurator):
             gray_box (bool): True, if gray box usage.
         
         Returns:
-            tuple: Tuple containing the best configuration found and None.
+            tuple: Tuple containing the best configuration found and the Pareto front of the configurations for 'runtime_quality', else None.
         """
         if feedback_function is not None:
 
             print('\nStarting Parameter optimization\n')
 
-            if self.scenario['metric'] == 'quality':
+            if self.scenario['metric'] in ('quality', 'runtime_quality'):
                 tunefor = ' --byValue '
             elif self.scenario['metric'] == 'runtime':
                 tunefor = ' --enableRacing=true '
@@ -307,7 +306,9 @@ class OATConfigurator(Configurator):
             path_to_OAT = self.scenario['path_to_OAT']
             param_space = self.scenario['xml']
             instance_folder = self.scenario['instance_dir']
-            planner_timelimit = self.scenario['timelimit']
+            # OAT stops runs in wall-clock time of this machine
+            planner_timelimit = self.scenario['timelimit'] * \
+                self.speed_factor()
             min_budget = self.scenario['start_gen']
             max_budget = self.scenario['end_gen']
             evalLimit = self.scenario['evlaLimit']
@@ -342,6 +343,10 @@ class OATConfigurator(Configurator):
             print('\nBest Configuration found is:\n',
                   self.incumbent)
 
-            return self.incumbent, None
+            front = None
+            if self.scenario['metric'] == 'runtime_quality':
+                front = self.get_pareto_front()
+
+            return self.incumbent, front
         else:
             return None, None
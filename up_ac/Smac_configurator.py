@@ -1,18 +1,134 @@
 """Functionalities for managing and calling configurators."""
-from smac import Scenario
-from smac import AlgorithmConfigurationFacade
 from unified_planning.exceptions import UPProblemDefinitionError, UPException
 from pebble import concurrent
 import os
-import dill
-import sys
 from concurrent.futures import TimeoutError
 
 from up_ac.AC_interface import *
 from up_ac.configurators import Configurator
+from up_ac.utils.ac_feedback import quality_crash_cost
+from up_ac.utils.crash_classification import ConfigurationCrash
 
+import dataclasses
 import timeit
 
+# PDDL reader of the process, shared by its trials
+_reader = None
+# Payload and feedback function last unpickled in the process
+_feedback = (None, None)
+
+
+def smac_target(config, instance, seed=0, data_to_scatter=None):
+    """
+    Target function of SMAC, running the feedback function of a campaign.
+
+    Module level, so that dask workers and the trial processes they spawn
+    import it instead of unpickling it. The feedback function, pickled with
+    cloudpickle, and the problem files come in data_to_scatter, which SMAC
+    scatters to the workers once per campaign. Trials the feedback function
+    records go back to the driver in the additional info, since stores of
+    workers on other nodes are not the store of the campaign.
+
+    Parameters:
+        config (ConfigSpace.Configuration): Configuration to evaluate.
+        instance (str): Path of the problem instance.
+        seed (int, optional): Seed of the trial.
+        data_to_scatter (dict): 'feedback' function as cloudpickle bytes, 'problems', domain and problem texts by instance path, and 'speed_factors' of the workers.
+
+    Returns:
+        tuple: Cost of the trial (float, dict or None) and additional info with the recorded 'trials', see trial_recorder.
+    """
+    import cloudpickle
+
+    from up_ac.utils.speed_calibration import add_speed_factors
+
+    global _reader, _feedback
+    if _reader is None:
+        from unified_planning.io import PDDLReader
+        _reader = PDDLReader()
+    # Workers benchmarked their machine before the first trial
+    add_speed_factors(data_to_scatter.get('speed_factors', {}))
+    payload = data_to_scatter['feedback']
+    if _feedback[0] != payload:
+        # Processes running several trials unpickle once per campaign
+        _feedback = (payload, cloudpickle.loads(payload))
+    trials = []
+    cost = _feedback[1](config, instance, seed, _reader,
+                        data_to_scatter['problems'], trials)
+
+    return cost, {'trials': trials}
+
+
+def trial_recorder(trial_store):
+    """
+    Smac callback recording the trials of the workers in the trial store.
+
+    Parameters:
+        trial_store (TrialStore): Trial store of the campaign.
+
+    Returns:
+        smac.Callback: Callback recording the 'trials' in the additional info of every trial.
+    """
+    from smac import Callback
+
+    class TrialRecorder(Callback):
+
+        def on_tell_end(self, smbo, info, value):
+            for trial in value.additional_info.get('trials', []):
+                trial_store.record(**trial)
+
+    return TrialRecorder()
+
+
+def problem_data(instances):
+    """
+    Read the domain and problem files of instances.
+
+    Parameters:
+        instances (list): Problem instance paths, with domain.pddl next to each.
+
+    Returns:
+        dict: Instance paths and (domain, problem) texts.
+    """
+    problems = {}
+    for instance in instances:
+        instance = f'{instance}'
+        with open(f'{instance.rsplit("/", 1)[0]}/domain.pddl') as f:
+            domain = f.read()
+        with open(instance) as f:
+            problems[instance] = (domain, f.read())
+
+    return problems
+
+
+def ordered_intensifier(scenario, instances):
+    """
+    Smac intensifier that runs configurations on instances in a fixed order.
+
+    The default intensifier shuffles the instances of every configuration,
+    so early comparisons may use the hardest instances.
+
+    Parameters:
+        scenario (smac.Scenario): Scenario of the campaign.
+        instances (list): Problem instance paths in the order to run them.
+
+    Returns:
+        smac.intensifier.intensifier.Intensifier: Intensifier with the defaults of the AlgorithmConfigurationFacade.
+    """
+    from smac.intensifier.intensifier import Intensifier
+
+    rank = {instance: r for r, instance in enumerate(instances)}
+
+    class OrderedIntensifier(Intensifier):
+
+        def _reorder_instance_seed_keys(self, instance_seed_keys, *,
+                                        seed=None):
+            return sorted(instance_seed_keys,
+                          key=lambda key: rank.get(key.instance, len(rank)))
+
+    return OrderedIntensifier(scenario=scenario, max_config_calls=2000,
+                              max_incumbents=10)
+
 
 class SmacConfigurator(Configurator):
     """Configurator functions."""
@@ -20,10 +136,28 @@ class SmacConfigurator(Configurator):
     def __init__(self):
         """Initialize Smac configurator."""
         Configurator.__init__(self)
-        self.crash_cost = 0
+        self.crash_cost = quality_crash_cost
         self.planner_timelimit = 0
         self.engine = None
         self.gaci = None 
+        self.dask_address = None
+        self.walltime_headroom = 5
+
+    def set_dask_cluster(self, address=None):
+        """
+        Run the trials of SMAC on a dask cluster.
+
+        Without an address, campaigns with more than one worker start a
+        LocalCluster of n_workers processes. The feedback function and the
+        problem files are sent to the workers in memory, so workers on other
+        nodes need no shared filesystem. Workers of a running cluster must
+        not be daemons, since trials run in subprocesses
+        (distributed.worker.daemon: False).
+
+        Parameters:
+            address (str, optional): Address of a running dask scheduler, e.g. 'tcp://10.0.0.1:8786', a LocalCluster if None.
+        """
+        self.dask_address = address
 
     def get_feedback_function(self, gaci, engine, metric, mode,
                               gray_box=False):
@@ -33,118 +167,69 @@ class SmacConfigurator(Configurator):
         Parameters:
             gaci (ACInterface): Algorithm Configuration Interface object.
             engine (str): Name of the planning engine.
-            metric (str): Metric to optimize, either 'runtime' or 'quality'.
+            metric (str): Metric to optimize, 'runtime', 'quality' or 'runtime_quality'.
             mode (str): Type of planning.
             gray_box (bool, optional): True if using a gray box, False otherwise.
 
         Returns:
-            function: A planner feedback function that takes configuration, instance, seed, and reader.
+            function: A planner feedback function that takes configuration, instance, seed, reader and optionally the problem texts by instance path.
 
         Raises:
             ValueError: If the provided engine is not supported for the given metric and mode.
 
         """
-        if engine in self.capabilities[metric][mode]:
+        if self.is_supported(gaci, engine, metric, mode):
             self.metric = metric
 
-            def planner_feedback(config, instance, seed, reader):
+            if self.trial_store is None:
+                self.set_trial_store()
+
+            def planner_feedback(config, instance, seed, reader,
+                                 problems=None, trials=None):
+                # Benchmark the machine before the first run is timed
+                self.speed_factor()
                 start = timeit.default_timer()
                 instance_p = f'{instance}'
-                domain_path = instance_p.rsplit('/', 1)[0]
-                domain = f'{domain_path}/domain.pddl'
-                pddl_problem = reader.parse_problem(f'{domain}',
-                                                    f'{instance_p}')
-
-                # Since Smac handles time limits itself,
-                # we do not use concurrent, as with other AC tools
+                trial, cost = self.lookup_trial(gaci, engine, metric, mode,
+                                                config, instance_p)
+                if cost is not None:
+                    # Same engine invocation was evaluated before
+                    self.print_feedback(engine, instance, cost)
+                    return self.training_cost(instance_p, cost)
+
+                if problems is not None and instance_p in problems:
+                    # Workers may not see the files of the driver
+                    pddl_problem = reader.parse_problem_string(
+                        *problems[instance_p])
+                else:
+                    domain_path = instance_p.rsplit('/', 1)[0]
+                    domain = f'{domain_path}/domain.pddl'
+                    pddl_problem = reader.parse_problem(f'{domain}',
+                                                        f'{instance_p}')
+
+                # Runs are killed at the time limit of the instance on
+                # this machine, Smac's wall limit is only a backstop
+                record = None
                 try:
-                    feedback = \
-                        gaci.run_engine_config(config,
-                                               metric,
-                                               engine,
-                                               mode,
-                                               pddl_problem)
+                    feedback, record = self.run_engine(
+                        gaci, config, metric, engine, mode, pddl_problem,
+                        self.run_timelimit(instance_p))
+                except ConfigurationCrash as err:
+                    self.quarantine_trial(trial, err)
+                    feedback = None
                 except (AssertionError, NotImplementedError,
                         UPProblemDefinitionError, UPException,
                         UnicodeDecodeError) as err:
                     print('\n** Error in planning engine!', err)
-                    if metric == 'runtime':
-                        feedback = self.planner_timelimit
-                    elif metric == 'quality':
-                        feedback = self.crash_cost
-                '''
+                    feedback = None
 
-                try:
-                    @concurrent.process(timeout=self.planner_timelimit)
-                    def solve(config, metric, engine,
-                              mode, pddl_problem):
-                        print('Running further\n')
-                        feedback = \
-                            gaci.run_engine_config(config,
-                                                   metric, engine,
-                                                   mode, pddl_problem)
-
-                        return feedback
-
-                    feedback = solve(config, metric, engine,
-                                     mode, pddl_problem)
-                    
-                    try:
-                        feedback = feedback.result()
-                    except TimeoutError:
-                        if metric == 'runtime':
-                            feedback = self.planner_timelimit
-                        elif metric == 'quality':
-                            feedback = self.crash_cost
+                # SMAC always minimizes
+                cost = self.resolve_feedback(engine, metric, feedback, start,
+                                             record, trial)
+                self.print_feedback(engine, instance, cost)
+                self.record_trial(trial, cost, record, trials)
 
-                except (AssertionError, NotImplementedError,
-                        UPProblemDefinitionError):
-                    print('\n** Error in planning engine!')
-                    if metric == 'runtime':
-                        feedback = self.planner_timelimit
-                    elif metric == 'quality':
-                        feedback = self.crash_cost
-                '''
-              
-                if feedback is not None:
-                    # SMAC always minimizes
-                    if metric == 'quality':
-                        self.print_feedback(engine, instance, feedback)
-                        return -feedback
-                    # Solving runtime optimization by passing
-                    # runtime as result, since smac minimizes it
-                    elif metric == 'runtime':
-                        if engine in ('tamer', 'pyperplan'):
-                            feedback = timeit.default_timer() - start
-                            self.print_feedback(engine, instance, feedback)
-                        else:
-                            feedback = feedback
-                            self.print_feedback(engine, instance, feedback)
-                        return feedback
-                else:
-                    # Penalizing failed runs
-                    if metric == 'runtime':
-                        # Penalty is max runtime in runtime scenario
-                        feedback = self.scenario.trial_walltime_limit
-                        self.print_feedback(engine, instance, feedback)
-                    else:
-                        # Penalty is defined by user in quality scenario
-                        feedback = self.crash_cost
-                        self.print_feedback(engine, instance, feedback)
-
-                    return feedback
-
-            path = os.getcwd().rsplit('up_ac', 1)[0]
-            if path[-1] != "/":
-                path += "/"
-            path += 'up_ac/utils'
-
-            self.feedback_path = path
-
-            dill.dump(
-                planner_feedback, open(
-                    f'{path}/feedback.pkl', 'wb'),
-                recurse=True)
+                return self.training_cost(instance_p, cost)
 
             return planner_feedback
         else:
@@ -154,9 +239,13 @@ class SmacConfigurator(Configurator):
 
     def set_scenario(self, engine, param_space, gaci,
                      configuration_time=120, n_trials=400, min_budget=1,
-                     max_budget=3, crash_cost=0, planner_timelimit=30,
+                     max_budget=3, crash_cost=quality_crash_cost,
+                     planner_timelimit=30,
                      n_workers=1, instances=[], instance_features=None,
-                     metric='runtime'):
+                     metric='runtime',
+                     par_k=1, runtime_statistic='mean', impute_censored=False,
+                     instance_weights=None, instance_order=None,
+                     walltime_headroom=5):
         """
         Set up the algorithm configuration scenario for SMAC (Sequential Model-based Algorithm Configuration).
 
@@ -168,21 +257,43 @@ class SmacConfigurator(Configurator):
             n_trials (int, optional): Maximum number of engine evaluations (default is 400).
             min_budget (int, optional): Minimum number of instances to use (default is 1).
             max_budget (int, optional): Maximum number of instances to use (default is 3).
-            crash_cost (int, optional): The cost to use if the engine fails (default is 0).
+            crash_cost (float, optional): Quality cost of runs without a plan, worse than any plan cost (default is 10 ** 6).
             planner_timelimit (int, optional): Maximum runtime per evaluation for the planner (default is 30).
             n_workers (int, optional): Number of cores to utilize (default is 1).
             instances (list, optional): List of problem instance paths (default is empty list, uses train_set).
             instance_features (dict, optional): Dictionary containing instance names and lists of features (default is None).
-            metric (str, optional): The optimization metric, either 'runtime' or 'quality' (default is 'runtime').
+            metric (str, optional): The optimization metric, 'runtime', 'quality' or 'runtime_quality' (default is 'runtime'). 'runtime_quality' optimizes both objectives with ParEGO.
+            par_k (float, optional): Timeouts cost par_k times the planner time limit (default is 1).
+            runtime_statistic (str or float, optional): 'mean', 'median' or a quantile to aggregate runtimes in evaluate (default is 'mean').
+            impute_censored (bool, optional): Impute timed out runtimes from solved runs on the instance for the model of SMAC (default is False).
+            instance_weights (dict, optional): Instance paths and weights, e.g. of a representative subset. Costs are scaled so that training minimizes the weighted mean (default is None).
+            instance_order (str, optional): Run instances by estimated hardness, 'cheapest' or 'stratified', see order_instances (default is None).
+            walltime_headroom (float, optional): Seconds Smac gives trials beyond the time limit, for parsing the problem, see trial_walltime_limit (default is 5).
 
         Raises:
             ValueError: If an unsupported metric is provided.
 
         """
+        from smac import Scenario
+
         if not instances:
             instances = self.train_set
         self.crash_cost = crash_cost
         self.planner_timelimit = planner_timelimit
+        self.walltime_headroom = walltime_headroom
+        self.set_runtime_aggregation(par_k, runtime_statistic,
+                                     impute_censored)
+        self.instance_weights = instance_weights
+        instances = self.order_instances(instances, instance_order, engine,
+                                         instance_features=instance_features)
+        objectives = 'cost'
+        if metric == 'runtime':
+            # Trials Smac stops at the time limit are timeouts
+            crash_cost = self.timeout_cost()
+        elif metric == 'runtime_quality':
+            objectives = ['runtime', 'quality']
+            crash_cost = [self.timeout_cost(), crash_cost]
+        self.metric = metric
         self.engine = engine
         self.gaci = gaci
         scenario = Scenario(
@@ -193,10 +304,12 @@ class SmacConfigurator(Configurator):
             min_budget=min_budget,  # Use min <min_budget> instance
             max_budget=max_budget,  # Use max <max_budget> instances
             deterministic=True,  # Not stochastic algorithm
+            objectives=objectives,  # Costs the feedback function returns
             # Cost of algorithm crashing -> AC metric to evaluate configuration
             crash_cost=crash_cost,  
-            # Max time for algorithm to run
-            trial_walltime_limit=planner_timelimit,  
+            # Backstop for trials, runs are killed at their time limit
+            trial_walltime_limit=self.trial_walltime_limit(
+                self.speed_factor()),
             use_default_config=True,  # include default config
             n_workers=n_workers,  # Number of parallel runs
             instances=instances,  # List of training instances
@@ -206,6 +319,47 @@ class SmacConfigurator(Configurator):
 
         self.scenario = scenario
 
+    def trial_walltime_limit(self, speed_factor):
+        """
+        Wall-clock limit after which Smac stops a trial.
+
+        Runs are killed at the time limit of their instance scaled by the
+        speed of the machine, see run_engine. Trials get the grace period
+        of anytime planners and walltime_headroom seconds for parsing on
+        top.
+
+        Parameters:
+            speed_factor (float): Speed factor of the slowest machine running trials.
+
+        Returns:
+            float: Wall-clock limit in seconds.
+        """
+        return self.planner_timelimit * speed_factor + \
+            self.anytime_grace + self.walltime_headroom
+
+    def dask_client(self):
+        """
+        Connect to the dask cluster of the campaign.
+
+        Returns:
+            tuple: dask Client (None if trials run in this process) and the LocalCluster started for it (None if not started).
+        """
+        if self.dask_address is None and self.scenario.n_workers <= 1:
+            return None, None
+
+        import dask
+        from dask.distributed import Client, LocalCluster
+
+        if self.dask_address is not None:
+            return Client(self.dask_address), None
+
+        # Trials run in subprocesses, which daemons cannot start
+        dask.config.set({'distributed.worker.daemon': False})
+        cluster = LocalCluster(n_workers=self.scenario.n_workers,
+                               threads_per_worker=1, processes=True)
+
+        return Client(cluster), cluster
+
     def optimize(self, feedback_function=None, gray_box=False):
         """
         Run the algorithm configuration optimization.
@@ -216,31 +370,103 @@ class SmacConfigurator(Configurator):
 
         Returns:
             tuple or None: A tuple containing the best configuration found and additional information (if available).
+                        For 'runtime_quality' the additional information is the Pareto front of configurations.
                         Returns None if feedback_function is not provided.
         """
         if feedback_function is not None:
-            # Import feedback function, since dask cannot pickle local objects            
-            path = os.getcwd().rsplit('up_ac', 1)[0]
-            if path[-1] != "/":
-                path += "/"
-            path += 'up_ac/utils'
-            sys.path.append(r"{}".format(path))
-            from load_smac_feedback import get_feedback
+            import cloudpickle
+            from ConfigSpace import Configuration
+            from smac import AlgorithmConfigurationFacade
+            from smac.multi_objective.parego import ParEGO
+
+            from up_ac.utils.speed_calibration import known_speed_factors
 
             print('\nStarting Parameter optimization\n')
  
-            ac = AlgorithmConfigurationFacade(
-                self.scenario,
-                get_feedback,
-                overwrite=True)
-
-            self.incumbent = ac.optimize()
+            multi_objective = self.metric == 'runtime_quality'
+            facade_args = {}
+            if multi_objective:
+                # Random scalarizations cover the whole Pareto front
+                facade_args['multi_objective_algorithm'] = \
+                    ParEGO(self.scenario)
+            if self.instance_order is not None:
+                facade_args['intensifier'] = ordered_intensifier(
+                    self.scenario, self.instance_order)
+            # Stores of workers on other nodes are not the campaign's
+            facade_args['callbacks'] = [trial_recorder(self.trial_store)]
+            if self.initial_configs:
+                # Continue from configurations found before
+                facade_args['initial_design'] = \
+                    AlgorithmConfigurationFacade.get_initial_design(
+                        self.scenario, additional_configs=[
+                            Configuration(self.scenario.configspace, c)
+                            for c in self.initial_configs])
+
+            # Trials may run in spawned processes, which cannot unpickle
+            # local functions with pickle
+            data = {'feedback': cloudpickle.dumps(feedback_function),
+                    'problems': problem_data(self.scenario.instances or [])}
+            client, cluster = self.dask_client()
+            if client is not None and self.speed_reference is not None:
+                # Every worker benchmarks its machine before the trials
+                data['speed_factors'] = {}
+                for factors in client.run(
+                        known_speed_factors, self.speed_reference,
+                        self.speed_engine).values():
+                    data['speed_factors'].update(factors)
+                # Time limits of the slowest worker
+                slowest = max(
+                    f for (_, reference, engine), f in
+                    data['speed_factors'].items()
+                    if reference == self.speed_reference and
+                    engine == self.speed_engine)
+                self.scenario = dataclasses.replace(
+                    self.scenario,
+                    trial_walltime_limit=self.trial_walltime_limit(slowest))
+            if client is None:
+                # Trials run in forks of this process
+                scattered = data
+
+                def target(config, instance, seed=0):
+                    return smac_target(config, instance, seed, scattered)
+
+                data = None
+            else:
+                target = smac_target
+                facade_args['dask_client'] = client
+
+            try:
+                ac = AlgorithmConfigurationFacade(
+                    self.scenario,
+                    target,
+                    overwrite=True,
+                    **facade_args)
+
+                # Workers get the feedback function and problems once
+                self.incumbent = ac.optimize(data_to_scatter=data)
+            finally:
+                if client is not None:
+                    client.close()
+                if cluster is not None:
+                    cluster.close()
+
+            front = None
+            if multi_objective:
+                # Smac returns the incumbents on the Pareto front
+                incumbents = self.incumbent
+                if not isinstance(incumbents, list):
+                    incumbents = [incumbents]
+                self.incumbent = min(
+                    incumbents, key=lambda c: self.scalarize(dict(zip(
+                        ['runtime', 'quality'],
+                        ac.runhistory.average_cost(c)))))
+                front = self.get_pareto_front(self.engine)
 
             self.incumbent = self.incumbent.get_dictionary()
 
             print('\nBest Configuration found is:\n',
                   self.incumbent)
 
-            return self.incumbent, None
+            return self.incumbent, front
         else:
             return None, None
@@ -1,4 +1,31 @@
-from .AC_interface import GenericACInterface
-from .configurators import Configurator
-from .Smac_configurator import SmacConfigurator
-from .Smac_interface import SmacInterface
+"""Algorithm configuration for the unified planning framework."""
+import importlib
+
+# Public classes are imported on first access, so that importing up_ac
+# does not pull in unified planning, ConfigSpace or any of the backends.
+_lazy_attributes = {
+    'GenericACInterface': 'up_ac.AC_interface',
+    'Configurator': 'up_ac.configurators',
+    'SmacConfigurator': 'up_ac.Smac_configurator',
+    'SmacInterface': 'up_ac.Smac_interface',
+    'Ablation': 'up_ac.ablation',
+    'CampaignBatch': 'up_ac.batch',
+    'EngineBandit': 'up_ac.engine_bandit',
+    'HydraPortfolio': 'up_ac.hydra',
+    'InstanceSelector': 'up_ac.selector',
+    'ISAC': 'up_ac.isac',
+    'ParameterImportance': 'up_ac.importance',
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        module = importlib.import_module(_lazy_attributes[name])
+        attribute = getattr(module, name)
+        globals()[name] = attribute
+
+        return attribute
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
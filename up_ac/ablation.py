@@ -0,0 +1,200 @@
+"""Ablation analysis between the default and an incumbent configuration."""
+from concurrent.futures import ProcessPoolExecutor
+
+
+def ablation_run(ac, gaci, engine, metric, mode, config, instance):
+    """
+    Cost of one run of an ablation, module level for worker processes.
+
+    Parameters:
+        ac (Configurator): Configurator with the planner time limit set.
+        gaci (ACInterface): AC interface object.
+        engine (str): Engine name or name of a joint space.
+        metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+        mode (str): Type of planning.
+        config (dict): Configuration to run.
+        instance (str): Path of the problem instance.
+
+    Returns:
+        float: Cost of the run, objectives of 'runtime_quality' weighted.
+    """
+    return ac.scalarize(ac.instance_cost(gaci, engine, metric, mode, config,
+                                         instance))
+
+
+class Ablation():
+    """Which parameter changes of an incumbent improve on the default.
+
+    Starting at the default, every step flips each remaining parameter to
+    its incumbent value and keeps the flip that improves most. Candidates
+    of a step race over the instances and are dropped once clearly worse
+    than the best. Runs go through the trial store of the configurator,
+    so configurations seen before, e.g. during optimize, are not rerun.
+    """
+
+    def __init__(self, ac, gaci, engine, metric, mode, instances, n_jobs=1,
+                 min_instances=2, race_tolerance=0.1):
+        """
+        Initialize the ablation.
+
+        Parameters:
+            ac (Configurator): Configurator with the planner time limit set, e.g. after optimize.
+            gaci (ACInterface): AC interface object with the pcs of the engine read.
+            engine (str): Engine name or name of a joint space.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+            instances (list): Problem instance paths.
+            n_jobs (int, optional): Number of runs in parallel processes.
+            min_instances (int, optional): Instances every candidate of a step runs on before racing drops it.
+            race_tolerance (float, optional): Candidates whose cost exceeds the best by this share are dropped.
+        """
+        self.ac = ac
+        self.gaci = gaci
+        self.engine = engine
+        self.metric = metric
+        self.mode = mode
+        self.instances = list(instances)
+        self.n_jobs = n_jobs
+        self.min_instances = min_instances
+        self.race_tolerance = race_tolerance
+        if self.ac.trial_store is None:
+            self.ac.set_trial_store()
+        self.path = []
+
+    def complete(self, values):
+        """
+        Valid configuration from values of all parameters.
+
+        Parameters:
+            values (dict): Value of every parameter of the space, active or not.
+
+        Returns:
+            dict or None: Values of the active parameters, None if forbidden.
+        """
+        from ConfigSpace.util import deactivate_inactive_hyperparameters
+
+        try:
+            config = deactivate_inactive_hyperparameters(
+                values, self.gaci.engine_param_spaces[self.engine])
+            config.is_valid_configuration()
+        except ValueError:
+            return None
+
+        return dict(config)
+
+    def costs(self, configs, instances):
+        """
+        Costs of configurations on instances, run in parallel.
+
+        Parameters:
+            configs (list): Configurations to run.
+            instances (list): Problem instance paths.
+
+        Returns:
+            list: One list of costs per configuration, in the order of the instances.
+        """
+        runs = [(config, instance) for config in configs
+                for instance in instances]
+        args = (self.ac, self.gaci, self.engine, self.metric, self.mode)
+        if self.n_jobs > 1 and len(runs) > 1:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+                futures = [pool.submit(ablation_run, *args, config,
+                                       instance)
+                           for config, instance in runs]
+                results = [f.result() for f in futures]
+        else:
+            results = [ablation_run(*args, config, instance)
+                       for config, instance in runs]
+
+        return [results[i * len(instances):(i + 1) * len(instances)]
+                for i in range(len(configs))]
+
+    def race(self, candidates):
+        """
+        Race candidates over the instances.
+
+        All candidates run on the first min_instances instances, then on
+        one instance after the other. A candidate is dropped when its
+        total cost exceeds the best total by more than race_tolerance.
+
+        Parameters:
+            candidates (dict): Parameter names and the configurations flipping them.
+
+        Returns:
+            tuple: Parameter of the best candidate and its mean cost on all instances.
+        """
+        alive = list(candidates)
+        totals = {p: 0 for p in alive}
+        start = 0
+        step = max(1, self.min_instances)
+        while start < len(self.instances):
+            batch = self.instances[start:start + step]
+            for p, costs in zip(alive, self.costs(
+                    [candidates[p] for p in alive], batch)):
+                totals[p] += sum(costs)
+            start += len(batch)
+            step = 1
+            best = min(totals[p] for p in alive)
+            alive = [p for p in alive if totals[p] <= best +
+                     self.race_tolerance * abs(best)]
+        best = min(alive, key=lambda p: totals[p])
+
+        return best, totals[best] / len(self.instances)
+
+    def run(self, incumbent, default=None):
+        """
+        Walk from the default to the incumbent one parameter at a time.
+
+        Parameters:
+            incumbent (dict): Configuration found by optimize.
+            default (dict, optional): Start of the path, default configuration of the space if None.
+
+        Returns:
+            list: One dict per step with the 'parameter' flipped, its 'value', the mean 'cost' after the step and the 'contribution', i.e. the decrease in cost.
+        """
+        space = self.gaci.engine_param_spaces[self.engine]
+        if default is None:
+            default = dict(space.get_default_configuration())
+        start = {name: default.get(name, hp.default_value)
+                 for name, hp in space.items()}
+        target = {name: incumbent.get(name, start[name])
+                  for name in space}
+        current = start
+        config = self.complete(current)
+        cost = sum(self.costs([config], self.instances)[0]) / \
+            len(self.instances)
+        self.path = [{'parameter': None, 'value': None, 'cost': cost,
+                      'contribution': 0}]
+        remaining = [p for p in space if current[p] != target[p]]
+        while remaining:
+            candidates = {}
+            for p in remaining:
+                flipped = self.complete(dict(current, **{p: target[p]}))
+                # Flips of inactive parameters do not change the run
+                if flipped is not None and flipped != config:
+                    candidates[p] = flipped
+            if not candidates:
+                break
+            best, best_cost = self.race(candidates)
+            current = dict(current, **{best: target[best]})
+            config = candidates[best]
+            self.path.append({'parameter': best, 'value': target[best],
+                              'cost': best_cost,
+                              'contribution': cost - best_cost})
+            print(f'\nAblation step {len(self.path) - 1}: {best} = ' +
+                  f'{target[best]}, cost {best_cost}\n')
+            cost = best_cost
+            remaining = [p for p in space if current[p] != target[p]]
+
+        return self.path[1:]
+
+    def contributions(self):
+        """
+        Contribution of every flipped parameter, largest first.
+
+        Returns:
+            list: (parameter, contribution) pairs.
+        """
+        steps = [(s['parameter'], s['contribution']) for s in self.path[1:]]
+
+        return sorted(steps, key=lambda s: -s[1])
@@ -0,0 +1,171 @@
+"""Batches of configuration campaigns on one shared pool of cores."""
+import importlib
+import json
+import os
+
+from up_ac.utils.scheduler import CoreSlots, TrialScheduler, \
+    run_in_processes
+
+
+def run_campaign(campaign, gaci, trial_store, slots, scenario_args):
+    """
+    Run one campaign of a batch.
+
+    Module level, so that it can run in a separate process.
+
+    Parameters:
+        campaign (dict): Campaign with 'engine', 'metric', 'mode', 'configurator' (class) and 'configuration_time'.
+        gaci (ACInterface): AC interface object with the pcs of the engine read.
+        trial_store (str): Sqlite file shared by the campaigns.
+        slots (CoreSlots): Cores shared by the campaigns.
+        scenario_args (dict): Further arguments of set_scenario.
+
+    Returns:
+        dict or None: Incumbent of the campaign.
+    """
+    engine = campaign['engine']
+    ac = campaign['configurator']()
+    ac.set_trial_store(trial_store)
+    ac.set_scheduler(TrialScheduler(slots.n_slots, slots))
+    if scenario_args.get('instances'):
+        ac.set_training_instance_set(scenario_args['instances'])
+    ac.set_scenario(engine, gaci.engine_param_spaces[engine], gaci,
+                    configuration_time=campaign['configuration_time'],
+                    metric=campaign['metric'], **scenario_args)
+    feedback_function = ac.get_feedback_function(
+        gaci, engine, campaign['metric'], campaign['mode'])
+    if feedback_function is None:
+        return None
+    incumbent, _ = ac.optimize(feedback_function=feedback_function)
+
+    return incumbent
+
+
+def run_lane(campaigns, gaci, trial_store, slots, scenario_args):
+    """
+    Run campaigns one after another.
+
+    Parameters:
+        campaigns (list): Campaigns, see run_campaign.
+        gaci (ACInterface): AC interface object.
+        trial_store (str): Sqlite file shared by the campaigns.
+        slots (CoreSlots): Cores shared by the campaigns.
+        scenario_args (dict): Further arguments of set_scenario.
+
+    Returns:
+        list: Incumbent per campaign.
+    """
+    return [run_campaign(c, gaci, trial_store, slots, scenario_args)
+            for c in campaigns]
+
+
+class CampaignBatch():
+    """Run many configuration campaigns concurrently.
+
+    Campaigns are (engine, metric, mode, backend, configuration_time)
+    tuples. They run in parallel processes and every planner run takes
+    one of n_cores shared slots, so the batch never uses more cores than
+    its budget. Campaigns of backends that pass the feedback function
+    through shared files run one after another, next to the others.
+    All campaigns share one trial store in the output directory, and the
+    incumbents are written to incumbents.json there.
+    """
+
+    # Backends by name, classes or 'module:class' imported on use
+    backends = {'smac': 'up_ac.Smac_configurator:SmacConfigurator',
+                'irace': 'up_ac.Irace_configurator:IraceConfigurator',
+                'oat': 'up_ac.OAT_configurator:OATConfigurator'}
+
+    def __init__(self, gaci, output_dir, n_cores=None):
+        """
+        Initialize the batch.
+
+        Parameters:
+            gaci (ACInterface): AC interface object with the pcs of all engines read.
+            output_dir (str): Folder for the trial store, the core slots and incumbents.json.
+            n_cores (int, optional): Cores for all campaigns together, all cores if None.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.gaci = gaci
+        self.output_dir = output_dir
+        self.slots = CoreSlots(n_cores, os.path.join(output_dir, 'slots'))
+        self.trial_store = os.path.join(output_dir, 'trials.sqlite')
+        self.results = {}
+
+    def configurator(self, backend):
+        """
+        Configurator class of a backend.
+
+        Parameters:
+            backend (str): Name of the backend, see backends.
+
+        Returns:
+            type: Configurator class.
+        """
+        if backend not in self.backends:
+            raise ValueError(f'Backend {backend} is not supported.')
+        configurator = self.backends[backend]
+        if isinstance(configurator, str):
+            module, name = configurator.split(':')
+            configurator = getattr(importlib.import_module(module), name)
+
+        return configurator
+
+    def write_results(self):
+        """Write the incumbents of the finished campaigns."""
+        with open(os.path.join(self.output_dir, 'incumbents.json'),
+                  'w') as f:
+            json.dump(self.results, f, indent=2, default=str)
+
+    def run(self, campaigns, **scenario_args):
+        """
+        Run all campaigns.
+
+        Parameters:
+            campaigns (list): (engine, metric, mode, backend, configuration_time) tuples.
+            scenario_args: Further arguments of set_scenario for all campaigns, e.g. instances or planner_timelimit.
+
+        Returns:
+            dict: Campaign names and results with the campaign and its 'incumbent' (None if not found). Repeats of a campaign get the suffix _2, _3 and so on.
+        """
+        lanes = {}
+        names = {}
+        for engine, metric, mode, backend, budget in campaigns:
+            name = f'{engine}_{metric}_{mode}_{backend}'
+            # Repeated campaigns are numbered, so none overwrites another
+            names[name] = names.get(name, 0) + 1
+            if names[name] > 1:
+                name += f'_{names[name]}'
+            campaign = {'name': name, 'engine': engine, 'metric': metric,
+                        'mode': mode, 'backend': backend,
+                        'configuration_time': budget,
+                        'configurator': self.configurator(backend)}
+            if getattr(campaign['configurator'], 'parallel_campaigns',
+                       False):
+                lanes[name] = [campaign]
+            else:
+                lanes.setdefault(backend, []).append(campaign)
+
+        def finished(name, future):
+            lane = lanes[name]
+            try:
+                incumbents = future.result()
+            except Exception as err:
+                print(f'\n** Campaigns {[c["name"] for c in lane]} ' +
+                      f'failed: {err}\n')
+                incumbents = [None] * len(lane)
+            for campaign, incumbent in zip(lane, incumbents):
+                result = {k: v for k, v in campaign.items()
+                          if k != 'configurator'}
+                result['incumbent'] = incumbent
+                self.results[campaign['name']] = result
+            self.write_results()
+
+        # Campaigns only wait for cores, so every lane gets a process
+        run_in_processes({name: (run_lane, (lane, self.gaci,
+                                            self.trial_store, self.slots,
+                                            scenario_args))
+                          for name, lane in lanes.items()},
+                         callback=finished)
+
+        return self.results
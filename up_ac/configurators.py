@@ -1,16 +1,41 @@
 """Functionalities for managing and calling configurators."""
+# Scripts access up.shortcuts after importing a configurator
+import unified_planning.shortcuts  # noqa: F401
 from unified_planning.io import PDDLReader
-from unified_planning.exceptions import UPProblemDefinitionError
+from unified_planning.exceptions import UPProblemDefinitionError, UPException
 
 from up_ac.AC_interface import *
+from up_ac.utils.ac_feedback import metric_objectives, quality_crash_cost
+from up_ac.utils.crash_classification import ConfigurationCrash
+from up_ac.utils.runtime_aggregation import RuntimeAggregation
 
 import json
 import timeit
 
 
+def min_cost(cost_a, cost_b):
+    """
+    Lower of two costs, per objective for costs of several objectives.
+
+    Parameters:
+        cost_a (float or dict): Cost to compare.
+        cost_b (float or dict): Cost to compare.
+
+    Returns:
+        float or dict: Lower cost.
+    """
+    if isinstance(cost_a, dict):
+        return {m: min(cost_a[m], cost_b[m]) for m in cost_a}
+
+    return min(cost_a, cost_b)
+
+
 class Configurator():
     """Configurator functions."""
 
+    # Campaigns of this configurator can run in parallel processes
+    parallel_campaigns = True
+
     def __init__(self):
         """Initialize generic interface."""
         self.capabilities = {'quality': {
@@ -21,6 +46,10 @@ class Configurator():
                              'OneshotPlanner':
                              ['lpg', 'fast-downward', 'enhsp', 'symk',
                               'tamer', 'pyperplan', 'fmap'],
+                             'AnytimePlanner': ['fast-downward', 'symk']},
+                             'runtime_quality': {
+                             'OneshotPlanner':
+                             ['lpg', 'fast-downward', 'enhsp', 'symk'],
                              'AnytimePlanner': ['fast-downward', 'symk']}
                              }
         self.incumbent = None
@@ -29,9 +58,46 @@ class Configurator():
         self.test_set = {}
         self.reader = PDDLReader()
         self.metric = None
-        self.crash_cost = 0
+        self.crash_cost = quality_crash_cost
+        self.planner_timelimit = 0
+        self.trial_store = None
+        self.runtime_aggregation = RuntimeAggregation()
+        self.anytime_objective = 'final'
+        self.anytime_checkpoints = None
+        self.anytime_penalty = None
+        self.anytime_grace = 2
+        self.objective_weights = {'runtime': 0.5, 'quality': 0.5}
+        # Best cost per instance of a portfolio, see marginal_cost
+        self.portfolio_costs = None
+        # Weights of the training instances, see training_cost
+        self.instance_weights = None
+        # Training instances in the order to run them, see order_instances
+        self.instance_order = None
+        # Time limits per instance below planner_timelimit, see
+        # calibrate_timelimits
+        self.instance_timelimits = None
+        # Benchmark time of the reference machine, see set_speed_reference
+        self.speed_reference = None
+        self.speed_engine = 'tamer'
+        # Shared pool of planner runs, see set_scheduler
+        self.scheduler = None
+        self.priority = 0
+        # Configurations optimize evaluates first, see set_initial_configs
+        self.initial_configs = []
         self.ac = None
 
+    def __getstate__(self):
+        # Problems parsed by an unpickled reader fail the type checks of
+        # up, so every process builds its own reader
+        state = self.__dict__.copy()
+        state['reader'] = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.reader = PDDLReader()
+
     def print_feedback(self, engine, instance, feedback):
         """
         Print feedback from the engine.
@@ -44,6 +110,673 @@ class Configurator():
         print(f'** Feedback of {engine} on instance\n**' +
               f' {instance}\n** is {feedback}\n\n')
 
+    def set_trial_store(self, path=None):
+        """
+        Set the store in which trial results are cached.
+
+        Configurators sharing a store file reuse each other's evaluations.
+
+        Parameters:
+            path (str, optional): Sqlite file of the store, temporary file if None.
+        """
+        from up_ac.utils.trial_store import TrialStore
+        self.trial_store = TrialStore(path)
+
+    def lookup_trial(self, gaci, engine, metric, mode, config, instance):
+        """
+        Look up the cost of the engine invocation a configuration produces.
+
+        Parameters:
+            gaci (ACInterface): Algorithm Configuration interface object.
+            engine (str): Engine name.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+            config (dict): Configuration to evaluate.
+            instance (str): Path of the problem instance.
+
+        Returns:
+            tuple: Trial key (None if the configuration is invalid) and cost (None if not evaluated yet).
+        """
+        if self.trial_store is None:
+            self.set_trial_store()
+        try:
+            config_hash, canonical = gaci.canonicalize(engine, config)
+        except UPException as err:
+            # Invalid options fail on every instance, no need to run
+            print('\n** Invalid configuration!', err)
+            return None, self.resolve_feedback(engine, metric, None, 0)
+
+        trial = {'engine': engine, 'metric': metric, 'mode': mode,
+                 'config_hash': config_hash, 'instance': instance,
+                 'timelimit': self.timelimit_for(instance),
+                 'settings': self.cost_settings()}
+        if self.trial_store.quarantined(engine, mode, config_hash):
+            print('\n** Configuration is quarantined!')
+            return trial, self.resolve_feedback(engine, metric, None, 0)
+        cost = self.trial_store.lookup(**trial)
+        trial['config'] = canonical
+
+        return trial, cost
+
+    def cost_settings(self):
+        """
+        Settings that define the cost of a run, part of the trial key.
+
+        Returns:
+            str: Settings as json.
+        """
+        aggregation = self.runtime_aggregation
+
+        return json.dumps({
+            'par_k': aggregation.par_k, 'impute': aggregation.impute,
+            'crash_cost': self.crash_cost,
+            'anytime': [self.anytime_objective, self.anytime_checkpoints,
+                        self.anytime_penalty],
+            'speed_reference': [self.speed_reference, self.speed_engine]},
+            sort_keys=True)
+
+    def record_trial(self, trial, cost, record=None, log=None):
+        """
+        Record the cost of a trial in the trial store.
+
+        Parameters:
+            trial (dict): Trial key from lookup_trial.
+            cost (float): Cost of the trial.
+            record (EngineRecord, optional): Parsed output of the engine run.
+            log (list, optional): Collects the arguments of TrialStore.record, e.g. to record the trial in another process as well.
+        """
+        if trial is not None:
+            info = None if record is None else record.as_dict()
+            self.trial_store.record(cost=cost, info=info, **trial)
+            if log is not None:
+                log.append(dict(trial, cost=cost, info=info))
+
+    def quarantine_trial(self, trial, err):
+        """
+        Quarantine the configuration of a trial that crashed on its options.
+
+        The configuration is charged the failure cost on all remaining
+        instances without running the engine.
+
+        Parameters:
+            trial (dict): Trial key from lookup_trial.
+            err (Exception): Configuration level error of the engine.
+        """
+        print('\n** Configuration rejected by planning engine!', err)
+        if trial is not None:
+            self.trial_store.quarantine(trial['engine'], trial['mode'],
+                                        trial['config_hash'], str(err))
+
+    def set_scheduler(self, scheduler=None, priority=0):
+        """
+        Run planner runs on a shared TrialScheduler.
+
+        Campaigns and evaluations sharing a scheduler, or the core slots
+        of schedulers in other processes, share the cores of the machine.
+
+        Parameters:
+            scheduler (TrialScheduler, optional): Scheduler of the runs, a process per run without a scheduler if None.
+            priority (int, optional): Runs of higher priority start first.
+        """
+        self.scheduler = scheduler
+        self.priority = priority
+
+    def set_initial_configs(self, configs=None):
+        """
+        Start the next optimize from known configurations.
+
+        Parameters:
+            configs (list, optional): Configurations to evaluate next to the default, e.g. from best_recorded_configs.
+        """
+        self.initial_configs = list(configs or [])
+
+    def best_recorded_configs(self, engine, metric, mode, n=1):
+        """
+        Configurations with the lowest mean cost in the trial store.
+
+        Only configurations evaluated on the most instances are compared,
+        so that racing configurators do not favour configurations dropped
+        after few instances.
+
+        Parameters:
+            engine (str): Engine name.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+            n (int, optional): Number of configurations.
+
+        Returns:
+            list: Configurations, best first.
+        """
+        if self.trial_store is None:
+            return []
+        runs = {}
+        for trial in self.trial_store.trials(engine=engine, metric=metric,
+                                             mode=mode):
+            runs.setdefault(trial['config_hash'], []).append(trial)
+        if not runs:
+            return []
+        most = max(len(trials) for trials in runs.values())
+        ranked = sorted(
+            ((sum(self.scalarize(t['cost']) for t in trials) / len(trials),
+              trials[0]['config'])
+             for trials in runs.values() if len(trials) == most
+             and trials[0]['config'] is not None), key=lambda r: r[0])
+
+        return [config for _, config in ranked[:n]]
+
+    def set_anytime_objective(self, objective='auc', checkpoints=None,
+                              penalty=None, grace=2):
+        """
+        Set how quality is scored in AnytimePlanner mode.
+
+        Parameters:
+            objective (str, optional): 'final' for the best plan, 'auc' for the mean best cost over the run, 'checkpoints' for the mean best cost at the checkpoints.
+            checkpoints (list, optional): Seconds into the run, quarters of the planner time limit if None.
+            penalty (float, optional): Cost before the first plan, worst plan cost of the run if None.
+            grace (float, optional): Seconds anytime planners get after the time limit to report their plans.
+        """
+        if objective not in ('final', 'auc', 'checkpoints'):
+            raise ValueError(
+                f'Anytime objective {objective} is not supported.')
+        self.anytime_objective = objective
+        self.anytime_checkpoints = checkpoints
+        self.anytime_penalty = penalty
+        self.anytime_grace = grace
+
+    def anytime_feedback(self, curve, timelimit=None):
+        """
+        Score the quality over time of an anytime planner run.
+
+        Parameters:
+            curve (list): Seconds and cost of the plans found.
+            timelimit (float, optional): Length of the run, planner time limit if None.
+
+        Returns:
+            float or None: Score of the run, None if no plan was found.
+        """
+        from up_ac.utils.anytime import QualityCurve
+
+        if timelimit is None:
+            timelimit = self.planner_timelimit
+        curve = QualityCurve(curve)
+        if self.anytime_objective == 'auc':
+            return curve.auc(timelimit, self.anytime_penalty)
+        elif self.anytime_objective == 'checkpoints':
+            checkpoints = self.anytime_checkpoints
+            if checkpoints is None:
+                checkpoints = [timelimit * q for q in (0.25, 0.5, 0.75, 1)]
+            return curve.checkpoint_cost(checkpoints, self.anytime_penalty)
+
+        return curve.best()
+
+    def run_engine(self, gaci, config, metric, engine, mode, problem,
+                   timelimit=None):
+        """
+        Run an engine in a separate process under a time limit.
+
+        Anytime planners are stopped at the time limit and get a grace
+        period to report their last plan. If the process has to be
+        killed, the plans it found until then are still scored. Runs go
+        through the scheduler if one is set, see set_scheduler.
+
+        Parameters:
+            gaci (ACInterface): Algorithm Configuration interface object.
+            config (dict): Configuration to run.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            engine (str): Engine name.
+            mode (str): Type of planning.
+            problem (up.model.Problem): Planning problem.
+            timelimit (float, optional): Time limit, planner time limit if None.
+
+        Returns:
+            tuple: Feedback of the run (None if it failed) and its EngineRecord (None if no record).
+        """
+        import multiprocessing
+        from pebble import concurrent
+        from concurrent.futures import CancelledError, TimeoutError
+        from up_ac.utils.anytime import PlanChannel, QualityCurve
+        from up_ac.utils.log_parsers import EngineRecord
+
+        if timelimit is None:
+            timelimit = self.planner_timelimit
+        channel = None
+        hard_timelimit = timelimit
+        if mode == 'AnytimePlanner':
+            channel = PlanChannel()
+            hard_timelimit = timelimit + self.anytime_grace
+
+        def solve(config, metric, engine, mode, problem):
+            return gaci.run_engine_config(
+                config, metric, engine, mode, problem, with_record=True,
+                timelimit=timelimit, plan_channel=channel)
+
+        if self.scheduler is not None:
+            future = self.scheduler.submit(
+                solve, config, metric, engine, mode, problem,
+                priority=self.priority, timeout=hard_timelimit,
+                owner=id(self))
+        else:
+            # Fork, so that runs work in spawned campaign processes too
+            future = concurrent.process(
+                timeout=hard_timelimit,
+                context=multiprocessing.get_context('fork'))(solve)(
+                    config, metric, engine, mode, problem)
+        try:
+            return future.result()
+        except CancelledError:
+            # Cancelled runs count as failed
+            return None, None
+        except TimeoutError:
+            if channel is None:
+                return None, None
+            # Score the plans found before the planner was killed
+            curve = QualityCurve(channel.drain())
+            if not curve.points:
+                return None, None
+            record = EngineRecord(cost=curve.best(), curve=curve.points,
+                                  status='TIMEOUT')
+            feedback = {'runtime': curve.first_solution_time(),
+                        'quality': record.cost}
+            if metric in feedback:
+                return feedback[metric], record
+            return feedback, record
+
+    def set_runtime_aggregation(self, par_k=1, statistic='mean',
+                                impute_censored=False):
+        """
+        Set how timed out runs are charged and runtimes are aggregated.
+
+        Parameters:
+            par_k (float, optional): Timeouts cost par_k times the planner time limit (PAR-k).
+            statistic (str or float, optional): 'mean', 'median' or a quantile in (0, 1) to aggregate runtimes over instances in evaluate.
+            impute_censored (bool, optional): Impute timed out runtimes from the solved runs on the same instance.
+        """
+        self.runtime_aggregation = RuntimeAggregation(par_k, statistic,
+                                                      impute_censored)
+
+    def timeout_cost(self, trial=None, timelimit=None):
+        """
+        Cost of a run that timed out or failed in a runtime scenario.
+
+        Parameters:
+            trial (dict, optional): Trial key from lookup_trial, needed to impute censored runtimes.
+            timelimit (float, optional): Time limit of the run, time limit of the trial or planner time limit if None.
+
+        Returns:
+            float: Cost of the run.
+        """
+        if timelimit is None:
+            timelimit = self.planner_timelimit if trial is None \
+                else trial['timelimit']
+        aggregation = self.runtime_aggregation
+        if not aggregation.impute or trial is None or \
+                self.trial_store is None:
+            return aggregation.timeout_cost(timelimit)
+        runs = self.trial_store.trials(
+            engine=trial['engine'], metric='runtime', mode=trial['mode'],
+            instance=trial['instance'], timelimit=trial['timelimit'])
+        observed = [r['cost'] for r in runs if r['cost'] < timelimit]
+
+        return aggregation.censored_cost(timelimit, observed,
+                                         len(runs) - len(observed))
+
+    def timelimit_for(self, instance, instance_timelimits=None):
+        """
+        Time limit of the runs on an instance.
+
+        Parameters:
+            instance (str): Path of the problem instance.
+            instance_timelimits (dict, optional): Instance paths and time limits, instance_timelimits of the configurator if None.
+
+        Returns:
+            float: Calibrated time limit of the instance, at most the planner time limit.
+        """
+        if instance_timelimits is None:
+            instance_timelimits = self.instance_timelimits
+        if not instance_timelimits or instance not in instance_timelimits:
+            return self.planner_timelimit
+
+        return min(instance_timelimits[instance], self.planner_timelimit)
+
+    def set_speed_reference(self, reference_seconds=None, engine='tamer'):
+        """
+        Normalize runtimes to the speed of a reference machine.
+
+        Every machine runs a short benchmark on its first run, see
+        utils.speed_calibration. Runtimes are divided by its speed factor
+        and time limits multiplied by it, so runs on slower machines get
+        more time and report comparable runtimes.
+
+        Parameters:
+            reference_seconds (float, optional): Benchmark time on the reference machine, see utils.speed_calibration.benchmark. No normalization if None.
+            engine (str, optional): Engine of the benchmark.
+        """
+        self.speed_reference = reference_seconds
+        self.speed_engine = engine
+
+    def speed_factor(self):
+        """
+        How much slower this machine is than the reference machine.
+
+        Returns:
+            float: Speed factor, 1 without a reference.
+        """
+        if self.speed_reference is None:
+            return 1
+        from up_ac.utils.speed_calibration import speed_factor
+
+        return speed_factor(self.speed_reference, self.speed_engine)
+
+    def run_timelimit(self, instance):
+        """
+        Wall-clock time limit of a run on this machine.
+
+        Parameters:
+            instance (str): Path of the problem instance.
+
+        Returns:
+            float: Time limit of the instance scaled by the speed factor.
+        """
+        return self.timelimit_for(instance) * self.speed_factor()
+
+    def calibrate_timelimits(self, gaci, engine, mode, instances,
+                             max_timelimit=None, factor=3,
+                             min_timelimit=1):
+        """
+        Set per-instance time limits from runs of the default configuration.
+
+        Every instance gets factor times the runtime of the default,
+        bounded by min_timelimit and max_timelimit. Instances the default
+        does not solve keep max_timelimit.
+
+        Parameters:
+            gaci (ACInterface): Algorithm Configuration interface object.
+            engine (str): Engine name or name of a joint space.
+            mode (str): Type of planning.
+            instances (list): Problem instance paths.
+            max_timelimit (float, optional): Global maximum time limit, planner time limit if None.
+            factor (float, optional): Multiple of the default runtime.
+            min_timelimit (float, optional): Lowest time limit.
+
+        Returns:
+            dict: Instance paths and time limits.
+        """
+        if max_timelimit is None:
+            max_timelimit = self.planner_timelimit
+        if not max_timelimit:
+            raise ValueError('Calibration needs a maximum time limit.')
+        planner_timelimit = self.planner_timelimit
+        self.planner_timelimit = max_timelimit
+        self.instance_timelimits = None
+        default = gaci.engine_param_spaces[engine].get_default_configuration()
+        timelimits = {}
+        for instance in instances:
+            runtime = self.instance_cost(gaci, engine, 'runtime', mode,
+                                         dict(default), instance)
+            if runtime >= max_timelimit:
+                timelimits[instance] = max_timelimit
+            else:
+                timelimits[instance] = min(max(factor * runtime,
+                                               min_timelimit),
+                                           max_timelimit)
+            print(f'\nTime limit on {instance}: {timelimits[instance]}\n')
+        if planner_timelimit:
+            self.planner_timelimit = planner_timelimit
+        self.instance_timelimits = timelimits
+
+        return timelimits
+
+    def resolve_feedback(self, engine, metric, feedback, start, record=None,
+                         trial=None, timelimit=None):
+        """
+        Turn the feedback of an engine run into the cost to minimize.
+
+        Parameters:
+            engine (str): Engine name.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            feedback: Feedback of the run, None if it failed. Quality feedback is the plan cost, lower is better.
+            start (float): Timer value at the start of the run.
+            record (EngineRecord, optional): Parsed output of the run.
+            trial (dict, optional): Trial key from lookup_trial.
+            timelimit (float, optional): Time limit of the run, time limit of the trial or planner time limit if None.
+
+        Returns:
+            float: Cost of the run, a dict of costs by objective for 'runtime_quality'.
+        """
+        if timelimit is None:
+            timelimit = self.planner_timelimit if trial is None \
+                else trial['timelimit']
+        if len(metric_objectives[metric]) > 1:
+            # Resolve each objective of the same run
+            return {m: self.resolve_feedback(
+                        engine, m, None if feedback is None else feedback[m],
+                        start, record, None, timelimit)
+                    for m in metric_objectives[metric]}
+        if feedback is not None and metric == 'quality' and \
+                record is not None and record.curve:
+            feedback = self.anytime_feedback(
+                record.curve, timelimit * self.speed_factor())
+        if feedback == 'measure':
+            # Engine does not report its runtime
+            feedback = timeit.default_timer() - start
+        if metric == 'runtime' and feedback is not None:
+            # Runtime on the reference machine
+            feedback = feedback / self.speed_factor()
+        if metric == 'runtime' and feedback is not None and \
+                0 < timelimit <= feedback:
+            # Run was censored at the time limit
+            feedback = None
+        if feedback is None:
+            # Penalizing failed runs
+            if metric == 'runtime':
+                # Penalty is PAR-k of max runtime in runtime scenario
+                return self.timeout_cost(trial, timelimit)
+            else:
+                # Penalty is defined by user in quality scenario
+                return self.crash_cost
+
+        # Quality feedback is a plan cost, so configurators minimize it
+        return feedback
+
+    def marginal_cost(self, instance, cost):
+        """
+        Cost of a run as contribution to the portfolio in portfolio_costs.
+
+        A configuration is only rewarded where it beats the portfolio,
+        elsewhere it gets the portfolio's cost on the instance.
+
+        Parameters:
+            instance (str): Path of the problem instance.
+            cost (float or dict): Cost of the run.
+
+        Returns:
+            float or dict: Cost of the portfolio extended by the configuration.
+        """
+        if not self.portfolio_costs or instance not in self.portfolio_costs:
+            return cost
+
+        return min_cost(cost, self.portfolio_costs[instance])
+
+    def training_cost(self, instance, cost):
+        """
+        Cost of a run as the configurator sees it during training.
+
+        Applies the marginal contribution to a portfolio and the weight
+        of the instance. Weights are scaled to a mean of 1, so the mean
+        cost over the instances is the weighted mean.
+
+        Parameters:
+            instance (str): Path of the problem instance.
+            cost (float or dict): Cost of the run.
+
+        Returns:
+            float or dict: Cost to report to the configurator.
+        """
+        cost = self.marginal_cost(instance, cost)
+        if not self.instance_weights or \
+                instance not in self.instance_weights:
+            return cost
+        weight = self.instance_weights[instance] * \
+            len(self.instance_weights) / sum(self.instance_weights.values())
+        if isinstance(cost, dict):
+            return {m: c * weight for m, c in cost.items()}
+
+        return cost * weight
+
+    def instance_cost(self, gaci, engine, metric, mode, config, instance):
+        """
+        Cost of a configuration on an instance, run only if not in the trial store.
+
+        Parameters:
+            gaci (ACInterface): Algorithm Configuration interface object.
+            engine (str): Engine name.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+            config (dict): Configuration to evaluate.
+            instance (str): Path of the problem instance.
+
+        Returns:
+            float or dict: Cost of the run.
+        """
+        # Benchmark the machine before the first run is timed
+        self.speed_factor()
+        start = timeit.default_timer()
+        trial, cost = self.lookup_trial(gaci, engine, metric, mode, config,
+                                        instance)
+        if cost is not None:
+            return cost
+
+        domain = f'{instance.rsplit("/", 1)[0]}/domain.pddl'
+        pddl_problem = self.reader.parse_problem(domain, instance)
+        record = None
+        try:
+            feedback, record = self.run_engine(gaci, config, metric, engine,
+                                               mode, pddl_problem,
+                                               self.run_timelimit(instance))
+        except ConfigurationCrash as err:
+            self.quarantine_trial(trial, err)
+            feedback = None
+        except (AssertionError, NotImplementedError,
+                UPProblemDefinitionError, UPException,
+                UnicodeDecodeError) as err:
+            print('\n** Error in planning engine!', err)
+            feedback = None
+
+        cost = self.resolve_feedback(engine, metric, feedback, start,
+                                     record, trial)
+        self.record_trial(trial, cost, record)
+
+        return cost
+
+    def order_instances(self, instances, strategy, engine=None, mode=None,
+                        instance_features=None):
+        """
+        Order the training instances by estimated hardness.
+
+        Hardness comes from the runs in the trial store and, for instances
+        without runs, from their features.
+
+        Parameters:
+            instances (list): Problem instance paths.
+            strategy (str or None): 'cheapest' or 'stratified', see utils.instance_ordering. None keeps the order.
+            engine (str, optional): Engine name, runs of all engines count if None.
+            mode (str, optional): Type of planning, runs of all modes count if None.
+            instance_features (dict, optional): Instance paths and lists of features, instance_features of the configurator if None.
+
+        Returns:
+            list: Problem instance paths in the order to run them.
+        """
+        from up_ac.utils.instance_ordering import estimate_hardness, \
+            order_instances
+
+        if strategy is None:
+            self.instance_order = None
+            return list(instances)
+        if instance_features is None:
+            instance_features = self.instance_features
+        hardness = estimate_hardness(instances, instance_features,
+                                     self.trial_store, engine, mode)
+        self.instance_order = order_instances(instances, hardness, strategy)
+
+        return list(self.instance_order)
+
+    def set_objective_weights(self, runtime=0.5, quality=0.5):
+        """
+        Set the weights of the objectives in 'runtime_quality' scenarios.
+
+        Configurators without multi-objective optimization minimize the
+        weighted sum of the costs, with runtimes relative to the planner
+        time limit.
+
+        Parameters:
+            runtime (float, optional): Weight of the runtime cost.
+            quality (float, optional): Weight of the quality cost.
+        """
+        self.objective_weights = {'runtime': runtime, 'quality': quality}
+
+    def scalarize(self, cost):
+        """
+        Weighted sum of the costs of a 'runtime_quality' run.
+
+        Parameters:
+            cost (float or dict): Cost of the run, costs by objective for 'runtime_quality'.
+
+        Returns:
+            float: Cost of the run as one number.
+        """
+        if not isinstance(cost, dict):
+            return cost
+        runtime = cost['runtime']
+        if self.planner_timelimit > 0:
+            runtime = runtime / self.planner_timelimit
+
+        return self.objective_weights['runtime'] * runtime + \
+            self.objective_weights['quality'] * cost['quality']
+
+    def get_pareto_front(self, engine=None, mode=None):
+        """
+        Pareto front of the configurations evaluated for 'runtime_quality'.
+
+        Costs are averaged over instances. Only configurations evaluated
+        on the most instances are compared, so that racing configurators
+        do not favour configurations dropped after few instances.
+
+        Parameters:
+            engine (str, optional): Engine name, all engines if None.
+            mode (str, optional): Type of planning, all modes if None.
+
+        Returns:
+            list: (configuration, {'runtime': mean cost, 'quality': mean cost}) pairs, sorted by runtime.
+        """
+        from up_ac.utils.pareto import pareto_front
+
+        if self.trial_store is None:
+            return []
+        filters = {'metric': 'runtime_quality'}
+        if engine is not None:
+            filters['engine'] = engine
+        if mode is not None:
+            filters['mode'] = mode
+        runs = {}
+        for trial in self.trial_store.trials(**filters):
+            if isinstance(trial['cost'], dict):
+                key = (trial['engine'], trial['config_hash'])
+                runs.setdefault(key, []).append(trial)
+        if not runs:
+            return []
+        most = max(len(trials) for trials in runs.values())
+        points = []
+        for trials in runs.values():
+            if len(trials) < most:
+                continue
+            costs = tuple(sum(t['cost'][m] for t in trials) / len(trials)
+                          for m in metric_objectives['runtime_quality'])
+            points.append((trials[0]['config'], costs))
+
+        return [(config, dict(zip(metric_objectives['runtime_quality'],
+                                  costs)))
+                for config, costs in pareto_front(points)]
+
     def get_instance_features(self, instance_features=None):
         """
         Save instance features.
@@ -74,6 +807,23 @@ class Configurator():
         self.test_set = test_set
         print('\nSetting testing instance set.\n')
 
+    def is_supported(self, gaci, engine, metric, mode):
+        """
+        Check if the configurator supports an engine or joint space.
+
+        Parameters:
+            gaci (ACInterface): Algorithm Configuration interface object.
+            engine (str): Engine name or name of a joint space.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+
+        Returns:
+            bool: True if all engines are supported.
+        """
+        engines = gaci.joint_engines.get(engine, [engine])
+
+        return all(e in self.capabilities[metric][mode] for e in engines)
+
     def get_feedback_function(self, gaci, engine, metric, mode,
                               gray_box=False):
         """
@@ -82,14 +832,14 @@ class Configurator():
         Parameters:
             gaci (ACInterface): Algorithm Configuration interface object.
             engine (str): Engine name.
-            metric (str): Metric, either 'runtime' or 'quality'.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
             mode (str): Type of planning.
             gray_box (bool, optional): True if gray box to be used.
 
         Returns:
             function or None: Planner feedback function or None if not supported.
         """
-        if engine in self.capabilities[metric][mode]:
+        if self.is_supported(gaci, engine, metric, mode):
             self.metric = metric
 
             planner_feedback = None
@@ -102,9 +852,12 @@ class Configurator():
 
     def set_scenario(self, engine, param_space, gaci,
                      configuration_time=120, n_trials=400, min_budget=1,
-                     max_budget=3, crash_cost=0, planner_timelimit=30,
+                     max_budget=3, crash_cost=quality_crash_cost,
+                     planner_timelimit=30,
                      n_workers=1, instances=[], instance_features=None,
-                     metric='runtime', popSize=128, evlaLimit=2147483647):
+                     metric='runtime', popSize=128, evlaLimit=2147483647,
+                     par_k=1, runtime_statistic='mean', impute_censored=False,
+                     instance_weights=None, instance_order=None):
         """
         Set up algorithm configuration scenario.
 
@@ -116,17 +869,27 @@ class Configurator():
             n_trials (int, optional): Maximum number of engine evaluations.
             min_budget (int, optional): Minimum number of instances to use.
             max_budget (int, optional): Maximum number of instances to use.
-            crash_cost (int, optional): Cost to use if the engine fails.
+            crash_cost (float, optional): Quality cost of runs without a plan, worse than any plan cost.
             planner_timelimit (int, optional): Maximum runtime per evaluation.
             n_workers (int, optional): Number of cores to utilize.
             instances (list, optional): Problem instance paths.
             instance_features (dict, optional): Instance names and lists of features.
             metric (str, optional): Optimization metric.
+            par_k (float, optional): Timeouts cost par_k times the planner time limit.
+            runtime_statistic (str or float, optional): 'mean', 'median' or a quantile to aggregate runtimes in evaluate.
+            impute_censored (bool, optional): Impute timed out runtimes from solved runs on the instance.
+            instance_weights (dict, optional): Instance paths and weights, e.g. of a representative subset. Costs are scaled so that training minimizes the weighted mean.
+            instance_order (str, optional): Run instances by estimated hardness, 'cheapest' or 'stratified', see order_instances.
             popSize (int, optional): Population size of configs per generation (OAT).
             evlaLimit (int, optional): Maximum number of evaluations (OAT).
 
         """
 
+        self.set_runtime_aggregation(par_k, runtime_statistic,
+                                     impute_censored)
+        self.instance_weights = instance_weights
+        instances = self.order_instances(instances, instance_order, engine,
+                                         instance_features=instance_features)
         scenario = None
 
         self.scenario = scenario
@@ -147,7 +910,8 @@ class Configurator():
             return self.incumbent
 
     def evaluate(self, metric, engine, mode, incumbent, gaci,
-                 planner_timelimit=10, crash_cost=0, instances=[]):
+                 planner_timelimit=10, crash_cost=quality_crash_cost,
+                 instances=[], instance_timelimits=None):
         """
         Evaluate performance of found configuration on training set.
 
@@ -158,93 +922,87 @@ class Configurator():
             incumbent (dict): Parameter configuration to evaluate.
             gaci: AC interface object.
             planner_timelimit (int, optional): Max runtime per evaluation.
-            crash_cost (int, optional): Cost if engine fails.
+            crash_cost (float, optional): Quality cost of runs without a plan, worse than any plan cost.
             instances (list, optional): Instance paths.
+            instance_timelimits (dict, optional): Instance paths and time limits below planner_timelimit, e.g. from calibrate_timelimits.
 
         Returns:
-            float: Average performance on the instances.
+            float: Average performance on the instances, runtimes are aggregated by the runtime statistic. A dict of the performance by objective for 'runtime_quality'.
         """
         if incumbent is not None:
             if not instances:
                 instances = self.test_set
             nr_inst = len(instances)
-            avg_f = 0
+            objectives = metric_objectives[metric]
+            costs = {m: [] for m in objectives}
+            # Benchmark the machine before the first run is timed
+            speed_factor = self.speed_factor()
             for inst in instances:
-                if metric == 'runtime':
-                    from pebble import concurrent
-                    from concurrent.futures import TimeoutError
-                    start = timeit.default_timer()
+                start = timeit.default_timer()
 
                 instance_p = f'{inst}'
+                timelimit = planner_timelimit
+                if instance_timelimits and instance_p in instance_timelimits:
+                    timelimit = min(instance_timelimits[instance_p],
+                                    planner_timelimit)
                 domain_path = instance_p.rsplit('/', 1)[0]
                 domain = f'{domain_path}/domain.pddl'
                 pddl_problem = self.reader.parse_problem(f'{domain}',
                                                          f'{instance_p}')
 
+                # One run per instance scores all objectives
                 try:
-                    if metric == 'runtime':
-                        @concurrent.process(timeout=planner_timelimit)
-                        def solve(incumbent, metric, engine,
-                                  mode, pddl_problem):
-                            f = \
-                                gaci.run_engine_config(incumbent,
-                                                       metric, engine,
-                                                       mode, pddl_problem)
-
-                            return f
-
-                        f = solve(incumbent, metric, engine,
-                                  mode, pddl_problem)
-                        
-                        try:
-                            f = f.result()
-                        except TimeoutError:
-                            f = planner_timelimit
-                    elif metric == 'quality':                    
-                        f = \
-                            gaci.run_engine_config(incumbent,
-                                                   metric, engine,
-                                                   mode, pddl_problem)
-
+                    feedback, record = self.run_engine(
+                        gaci, incumbent, metric, engine, mode, pddl_problem,
+                        timelimit * speed_factor)
                 except (AssertionError, NotImplementedError,
-                        UPProblemDefinitionError):
+                        UPProblemDefinitionError, UPException):
                     print('\n** Error in planning engine!')
-                    if metric == 'runtime':
-                        f = planner_timelimit
-                    elif metric == 'quality':
-                        f = crash_cost
+                    record = None
+                    feedback = {'runtime': timelimit * speed_factor,
+                                'quality': crash_cost}
+                    if metric in feedback:
+                        feedback = feedback[metric]
+
+                resolved = {}
+                for m in objectives:
+                    f = feedback
+                    if len(objectives) > 1 and feedback is not None:
+                        f = feedback[m]
+                    if m == 'quality' and f is not None and \
+                            record is not None and record.curve:
+                        f = self.anytime_feedback(record.curve,
+                                                  timelimit * speed_factor)
+                    if m == 'runtime':
+                        if f == 'measure':
+                            f = timeit.default_timer() - start
+                        if f is not None:
+                            f = f / speed_factor
+                        if f is None or f >= timelimit:
+                            # Timeouts are charged PAR-k
+                            f = self.runtime_aggregation.timeout_cost(
+                                timelimit)
 
-                if metric == 'runtime':
                     if f is None:
-                        f = planner_timelimit
-                    elif f == 'measure':
-                        f = timeit.default_timer() - start
-                        if f > planner_timelimit:
-                            f = planner_timelimit
-
-                if f is not None and self.metric == 'quality':
-                    f = -f
-                if f is not None: 
-                    avg_f += f
-                else:
-                    avg_f += self.crash_cost
-                if metric == 'runtime':
-                    print(f'\nFeedback on instance {inst}:\n\n', f, '\n')
-                elif metric == 'quality':
-                    if f is not None:
-                        print(f'\nFeedback on instance {inst}:\n\n', -f, '\n')
-                    else:
-                        print(f'\nFeedback on instance {inst}:\n\n', None,
-                              '\n')
+                        f = crash_cost
+                    costs[m].append(f)
+                    resolved[m] = f
+                print(f'\nFeedback on instance {inst}:\n\n',
+                      resolved[metric] if metric in resolved else resolved,
+                      '\n')
             if nr_inst != 0:
-                avg_f = avg_f / nr_inst
-                if metric == 'runtime':
+                performance = {}
+                for m in objectives:
+                    if m == 'runtime':
+                        avg_f = self.runtime_aggregation.aggregate(costs[m])
+                    else:
+                        avg_f = sum(costs[m]) / nr_inst
                     print(f'\nAverage performance on {nr_inst} instances:',
                           avg_f, '\n')
-                if metric == 'quality':
-                    print(f'\nAverage performance on {nr_inst} instances:',
-                          -avg_f, '\n')
-                return avg_f
+                    performance[m] = avg_f
+                if len(objectives) == 1:
+                    return performance[metric]
+                return performance
             else:
                 print('\nPerformance could not be evaluated. No plans found.')
                 return None
@@ -255,6 +1013,9 @@ class Configurator():
         """
         Save configuration in json file.
 
+        For a joint space, the file holds the chosen 'engine' and its
+        translated 'config'.
+
         Parameters:
             path (str): Path where to save.
             config (dict): Configuration to save.
@@ -262,7 +1023,10 @@ class Configurator():
             engine (str): Engine name.
         """
         if config is not None:
+            chosen, _ = gaci.split_joint_config(engine, config)
             config = gaci.transform_conf_from_ac(engine, config)
+            if engine in gaci.joint_engines:
+                config = {'engine': chosen, 'config': config}
             with open(f'{path}/incumbent_{engine}.json', 'w') as f:
                 json.dump(config, f)
             print('\nSaved best configuration in ' +
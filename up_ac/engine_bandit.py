@@ -0,0 +1,234 @@
+"""Budget allocation across engine-specific configuration campaigns."""
+import math
+
+from up_ac.utils.ac_feedback import quality_crash_cost
+from up_ac.utils.scheduler import run_in_processes
+from up_ac.utils.trial_store import TrialStore
+
+
+def run_engine_campaign(configurator_factory, gaci, engine, metric, mode,
+                        configuration_time, n_workers, trial_store,
+                        scenario_args):
+    """
+    Run the configuration campaign of one engine and score its incumbent.
+
+    Module level, so that it can run in a separate process. The campaign
+    starts from the best configuration earlier rounds recorded in the
+    trial store.
+
+    Parameters:
+        configurator_factory (callable): Returns a new Configurator.
+        gaci (ACInterface): AC interface object.
+        engine (str): Engine name.
+        metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+        mode (str): Type of planning.
+        configuration_time (float): Configuration time of the campaign.
+        n_workers (int): Number of cores of the campaign.
+        trial_store (str): Sqlite file shared by the campaigns.
+        scenario_args (dict): Further arguments of set_scenario.
+
+    Returns:
+        tuple: Incumbent (None if no configuration was found) and its score.
+    """
+    ac = configurator_factory()
+    ac.set_trial_store(trial_store)
+    ac.set_initial_configs(ac.best_recorded_configs(engine, metric, mode))
+    ac.set_scenario(engine, gaci.engine_param_spaces[engine], gaci,
+                    configuration_time=configuration_time,
+                    n_workers=n_workers, metric=metric, **scenario_args)
+    feedback_function = ac.get_feedback_function(gaci, engine, metric, mode)
+    if feedback_function is None:
+        return None, None
+    incumbent, _ = ac.optimize(feedback_function=feedback_function)
+    if incumbent is None:
+        return None, None
+    score = ac.evaluate(
+        metric, engine, mode, incumbent, gaci,
+        scenario_args.get('planner_timelimit', 30),
+        scenario_args.get('crash_cost', quality_crash_cost),
+        scenario_args.get('instances') or ac.train_set)
+    if isinstance(score, dict):
+        score = ac.scalarize(score)
+
+    return incumbent, score
+
+
+class EngineBandit():
+    """Successive halving over the campaigns of several engines.
+
+    Every round runs one configuration campaign per remaining engine and
+    scores its incumbent. Configurators with parallel_campaigns run the
+    campaigns of a round at the same time, each on its share of the
+    workers. The worse engines, and engines whose incumbent
+    stopped improving, are dropped. Their share of the configuration time
+    and workers goes to the remaining engines in the next round.
+    """
+
+    def __init__(self, configurator_factory, gaci, engines, metric, mode,
+                 eta=2, min_improvement=0.01):
+        """
+        Initialize the bandit.
+
+        Parameters:
+            configurator_factory (callable): Returns a new Configurator with instances and features set, e.g. SmacConfigurator.
+            gaci (ACInterface): AC interface object with the pcs of the engines read.
+            engines (list of str): Names of the engines.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+            eta (int, optional): Keep 1 / eta of the engines per round.
+            min_improvement (float, optional): Relative improvement of the incumbent score below which an engine stalls.
+        """
+        if eta < 2:
+            raise ValueError('Successive halving needs eta >= 2.')
+        self.configurator_factory = configurator_factory
+        self.gaci = gaci
+        self.engines = list(engines)
+        self.metric = metric
+        self.mode = mode
+        self.eta = eta
+        self.min_improvement = min_improvement
+        self.incumbents = {}
+        self.scores = {}
+        self.history = []
+
+    def n_rounds(self):
+        """
+        Number of rounds until one engine is left.
+
+        Returns:
+            int: Number of rounds.
+        """
+        return math.ceil(math.log(len(self.engines), self.eta)) + 1
+
+    def allocate(self, configuration_time, n_workers, alive, rounds_left,
+                 concurrent=False):
+        """
+        Split the remaining budget of a round among the remaining engines.
+
+        Parameters:
+            configuration_time (float): Configuration time left.
+            n_workers (int): Number of cores.
+            alive (list of str): Remaining engines.
+            rounds_left (int): Number of rounds left including this one.
+            concurrent (bool, optional): True if the campaigns of the round run at the same time.
+
+        Returns:
+            tuple: Configuration time and number of workers per engine.
+        """
+        budget = configuration_time / rounds_left
+        if not concurrent:
+            budget /= len(alive)
+        workers = max(1, n_workers // len(alive))
+
+        return budget, workers
+
+    def stalled(self, engine, score):
+        """
+        Check if the incumbent of an engine stopped improving.
+
+        Parameters:
+            engine (str): Engine name.
+            score (float): Score of the engine's incumbent in this round.
+
+        Returns:
+            bool: True if the score improved less than min_improvement.
+        """
+        if engine not in self.scores or score is None:
+            return score is None
+        previous = self.scores[engine]
+
+        return previous - score < self.min_improvement * abs(previous)
+
+    def select(self, scored):
+        """
+        Engines to keep after a round.
+
+        Parameters:
+            scored (dict): Incumbent score per engine, None if none found.
+
+        Returns:
+            list of str: Engines to keep, best first.
+        """
+        ranked = sorted((e for e in scored if scored[e] is not None),
+                        key=lambda e: scored[e])
+        if not ranked:
+            return []
+        keep = ranked[:max(1, math.ceil(len(scored) / self.eta))]
+        improving = [e for e in keep if not self.stalled(e, scored[e])]
+
+        # The best engine is never dropped for stalling
+        return improving if ranked[0] in improving else \
+            [ranked[0]] + [e for e in improving if e != ranked[0]]
+
+    def run(self, configuration_time, n_workers=1, trial_store=None,
+            **scenario_args):
+        """
+        Tune all engines and move the budget to the most promising ones.
+
+        Campaigns share a trial store, so an engine's campaign in a later
+        round starts from its best configuration so far and does not rerun
+        the evaluations of earlier rounds.
+
+        Parameters:
+            configuration_time (float): Overall configuration time budget.
+            n_workers (int, optional): Number of cores.
+            trial_store (str, optional): Sqlite file of the shared trial store, temporary file if None.
+            scenario_args: Further arguments of set_scenario, e.g. planner_timelimit or instances.
+
+        Returns:
+            tuple: Best engine and its incumbent, (None, None) if no engine found a configuration.
+        """
+        if trial_store is None:
+            trial_store = TrialStore().path
+        concurrent = getattr(self.configurator_factory,
+                             'parallel_campaigns', False)
+        alive = list(self.engines)
+        remaining = configuration_time
+        rounds = self.n_rounds()
+        for r in range(rounds):
+            # The last engine left gets the rest of the budget at once
+            rounds_left = 1 if len(alive) == 1 else rounds - r
+            budget, workers = self.allocate(remaining, n_workers, alive,
+                                            rounds_left, concurrent)
+            jobs = {engine: (self.configurator_factory, self.gaci, engine,
+                             self.metric, self.mode, budget, workers,
+                             trial_store, scenario_args)
+                    for engine in alive}
+            if concurrent:
+                # Every campaign gets a new process, backends keep state
+                futures = run_in_processes(
+                    {e: (run_engine_campaign, job) for e, job in jobs.items()},
+                    len(jobs))
+                results = {e: f.result() for e, f in futures.items()}
+                remaining -= budget
+            else:
+                results = {e: run_engine_campaign(*job)
+                           for e, job in jobs.items()}
+                remaining -= budget * len(jobs)
+            scored = {}
+            for engine in alive:
+                incumbent, score = results[engine]
+                self.history.append({'round': r, 'engine': engine,
+                                     'configuration_time': budget,
+                                     'n_workers': workers,
+                                     'incumbent': incumbent,
+                                     'score': score})
+                if incumbent is not None and \
+                        (engine not in self.scores or
+                         score < self.scores[engine]):
+                    self.incumbents[engine] = incumbent
+                scored[engine] = score
+            alive = self.select(scored)
+            for engine, score in scored.items():
+                if score is not None:
+                    self.scores[engine] = min(
+                        score, self.scores.get(engine, score))
+            print(f'\nEngines after round {r}: {alive}\n')
+            if rounds_left == 1 or not alive:
+                break
+
+        if not self.scores:
+            return None, None
+        best = min(self.scores, key=self.scores.get)
+
+        return best, self.incumbents[best]
@@ -41,7 +41,7 @@ if __name__ == '__main__':
         OAC.set_scenario(engine[0],
                          ogaci.engine_param_spaces[engine[0]], ogaci,
                          configuration_time=30, n_trials=30,
-                         crash_cost=0, planner_timelimit=15, n_workers=3,
+                         planner_timelimit=15, n_workers=3,
                          instance_features=None, popSize=5, metric=metric,
                          evlaLimit=1)
 
@@ -41,7 +41,7 @@ if __name__ == '__main__':
         IAC.set_scenario(engine[0],
                          igaci.engine_param_spaces[engine[0]], igaci,
                          configuration_time=300, n_trials=30,
-                         crash_cost=0, min_budget=2,
+                         min_budget=2,
                          planner_timelimit=5, n_workers=3,
                          instance_features=None)
 
@@ -56,7 +56,7 @@ if __name__ == '__main__':
         SAC.set_scenario(engine[0],
                          sgaci.engine_param_spaces[engine[0]],
                          sgaci, configuration_time=30, n_trials=30,
-                         min_budget=3, max_budget=5, crash_cost=0,
+                         min_budget=3, max_budget=5,
                          planner_timelimit=5, n_workers=3,
                          instance_features=SAC.instance_features)
 
@@ -0,0 +1,131 @@
+"""Hydra-style construction of configuration portfolios."""
+from up_ac.configurators import min_cost
+from up_ac.utils.trial_store import TrialStore
+
+
+class HydraPortfolio():
+    """Portfolio of configurations that complement each other.
+
+    Every iteration runs a configuration campaign in which a run only
+    counts where it beats the portfolio built so far, so the configurator
+    searches for the configuration with the largest marginal contribution.
+    The campaigns and the performance matrix share a trial store, so
+    members are only run on the instances the campaigns did not cover.
+    """
+
+    def __init__(self, configurator_factory, gaci, engine, metric, mode,
+                 instances, trial_store=None):
+        """
+        Initialize the portfolio builder.
+
+        Parameters:
+            configurator_factory (callable): Returns a new Configurator with instances and features set, e.g. SmacConfigurator.
+            gaci (ACInterface): AC interface object with the pcs of the engine read.
+            engine (str): Engine name or name of a joint space.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+            instances (list): Problem instance paths.
+            trial_store (str, optional): Sqlite file of the shared trial store, temporary file if None.
+        """
+        self.configurator_factory = configurator_factory
+        self.gaci = gaci
+        self.engine = engine
+        self.metric = metric
+        self.mode = mode
+        self.instances = list(instances)
+        if trial_store is None:
+            trial_store = TrialStore().path
+        self.trial_store = trial_store
+        self.portfolio = []
+        self.matrix = []
+
+    def best_costs(self):
+        """
+        Best cost of the portfolio per instance.
+
+        Returns:
+            dict or None: Instance paths and costs, None for an empty portfolio.
+        """
+        if not self.matrix:
+            return None
+        best = {}
+        for row in self.matrix:
+            for instance, cost in zip(self.instances, row):
+                best[instance] = cost if instance not in best else \
+                    min_cost(best[instance], cost)
+
+        return best
+
+    def performance_row(self, ac, config):
+        """
+        Costs of a configuration on all instances.
+
+        Parameters:
+            ac (Configurator): Configurator with the scenario set.
+            config (dict): Configuration to evaluate.
+
+        Returns:
+            list: Cost per instance, in the order of the instances.
+        """
+        return [ac.instance_cost(self.gaci, self.engine, self.metric,
+                                 self.mode, config, instance)
+                for instance in self.instances]
+
+    def portfolio_cost(self):
+        """
+        Mean cost of the portfolio over the instances.
+
+        Returns:
+            float or dict or None: Mean of the best cost per instance, None for an empty portfolio.
+        """
+        best = self.best_costs()
+        if best is None:
+            return None
+        costs = list(best.values())
+        if isinstance(costs[0], dict):
+            return {m: sum(c[m] for c in costs) / len(costs)
+                    for m in costs[0]}
+
+        return sum(costs) / len(costs)
+
+    def build(self, k, **scenario_args):
+        """
+        Add up to k configurations to the portfolio.
+
+        Stops early if a campaign returns a configuration that runs the
+        same engine invocation as a member.
+
+        Parameters:
+            k (int): Number of portfolio members.
+            scenario_args: Further arguments of set_scenario, e.g. configuration_time or planner_timelimit.
+
+        Returns:
+            tuple: List of configurations and performance matrix with one row of instance costs per configuration.
+        """
+        members = set()
+        for i in range(k):
+            ac = self.configurator_factory()
+            ac.set_trial_store(self.trial_store)
+            ac.portfolio_costs = self.best_costs()
+            ac.set_scenario(self.engine,
+                            self.gaci.engine_param_spaces[self.engine],
+                            self.gaci, metric=self.metric,
+                            instances=self.instances, **scenario_args)
+            feedback_function = ac.get_feedback_function(
+                self.gaci, self.engine, self.metric, self.mode)
+            if feedback_function is None:
+                break
+            incumbent, _ = ac.optimize(feedback_function=feedback_function)
+            if incumbent is None:
+                break
+            config_hash, _ = self.gaci.canonicalize(self.engine, incumbent)
+            if config_hash in members:
+                print('\nNo configuration improves the portfolio.\n')
+                break
+            members.add(config_hash)
+            self.portfolio.append(incumbent)
+            self.matrix.append(self.performance_row(ac, incumbent))
+            print(f'\nPortfolio of {i + 1} configurations costs',
+                  self.portfolio_cost(), '\n')
+
+        return self.portfolio, self.matrix
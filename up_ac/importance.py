@@ -0,0 +1,219 @@
+"""Parameter importance from recorded trials and pruning of pcs files."""
+
+
+class ParameterImportance():
+    """Importance of the parameters of an engine for its cost.
+
+    A random forest learns the mean cost of the configurations in a trial
+    store. The importance of a parameter is the variance of the forest's
+    marginal prediction over the values of the parameter, as a share of
+    the variance of all predictions. This is the main effect of the
+    parameter in a functional ANOVA of the forest.
+    """
+
+    def __init__(self, gaci, engine, n_estimators=50, grid_size=10, seed=0):
+        """
+        Initialize the analysis.
+
+        Parameters:
+            gaci (ACInterface): AC interface object with the pcs of the engine read.
+            engine (str): Engine name.
+            n_estimators (int, optional): Number of trees of the forest.
+            grid_size (int, optional): Number of values of numerical parameters for the marginal predictions.
+            seed (int, optional): Seed of the forest.
+        """
+        self.gaci = gaci
+        self.engine = engine
+        self.n_estimators = n_estimators
+        self.grid_size = grid_size
+        self.seed = seed
+        self.model = None
+        self.configs = []
+        self.costs = []
+        self.importances = {}
+
+    def encode(self, configs):
+        """
+        Configurations as vectors of the parameter space.
+
+        Parameters:
+            configs (list): Configurations as dicts.
+
+        Returns:
+            numpy.ndarray: One row per configuration, -1 for inactive parameters.
+        """
+        import numpy as np
+        from ConfigSpace import Configuration
+
+        space = self.gaci.engine_param_spaces[self.engine]
+        X = np.array([Configuration(space, values=config).get_array()
+                      for config in configs])
+
+        return np.nan_to_num(X, nan=-1)
+
+    def fit_from_store(self, trial_store, metric, mode, objective=None):
+        """
+        Train the forest on the mean cost of every configuration in a store.
+
+        Parameters:
+            trial_store (TrialStore): Store of the configuration runs.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+            objective (str, optional): Objective to analyze for 'runtime_quality'.
+
+        Returns:
+            dict: Parameter names and importances, largest first.
+        """
+        from sklearn.ensemble import RandomForestRegressor
+
+        space = self.gaci.engine_param_spaces[self.engine]
+        runs = {}
+        configs = {}
+        for trial in trial_store.trials(engine=self.engine, metric=metric,
+                                        mode=mode):
+            cost = trial['cost']
+            if isinstance(cost, dict):
+                if objective is None:
+                    raise ValueError('Select an objective for costs of ' +
+                                     'several objectives.')
+                cost = cost[objective]
+            runs.setdefault(trial['config_hash'], []).append(cost)
+            config = {n: v for n, v in trial['config'].items()
+                      if n in space}
+            configs[trial['config_hash']] = config
+        if len(runs) < 2:
+            raise ValueError('Importance needs trials of at least two ' +
+                             'configurations.')
+        self.configs = [configs[h] for h in runs]
+        self.costs = [sum(c) / len(c) for c in runs.values()]
+        self.model = RandomForestRegressor(n_estimators=self.n_estimators,
+                                           random_state=self.seed)
+        self.model.fit(self.encode(self.configs), self.costs)
+
+        return self.importance()
+
+    def importance(self):
+        """
+        Main effect of every parameter on the predicted cost.
+
+        Returns:
+            dict: Parameter names and shares of the variance, largest first.
+        """
+        import numpy as np
+        from ConfigSpace import CategoricalHyperparameter, \
+            OrdinalHyperparameter
+
+        if self.model is None:
+            raise ValueError('Importance is not fitted.')
+        space = self.gaci.engine_param_spaces[self.engine]
+        X = self.encode(self.configs)
+        total = np.var(self.model.predict(X))
+        importances = {}
+        for index, (name, hp) in enumerate(space.items()):
+            if isinstance(hp, CategoricalHyperparameter):
+                grid = range(len(hp.choices))
+            elif isinstance(hp, OrdinalHyperparameter):
+                grid = range(len(hp.sequence))
+            else:
+                grid = np.linspace(0, 1, self.grid_size)
+            marginal = []
+            for value in grid:
+                X_value = X.copy()
+                X_value[:, index] = value
+                marginal.append(self.model.predict(X_value).mean())
+            importances[name] = float(np.var(marginal) / total) \
+                if total > 0 else 0.0
+        self.importances = dict(sorted(importances.items(),
+                                       key=lambda i: -i[1]))
+
+        return self.importances
+
+    def best_config(self):
+        """
+        Recorded configuration with the lowest predicted cost.
+
+        Returns:
+            dict: Configuration.
+        """
+        import numpy as np
+
+        predicted = self.model.predict(self.encode(self.configs))
+
+        return self.configs[int(np.argmin(predicted))]
+
+    def frozen_values(self, keep=None, threshold=0.01):
+        """
+        Values of the parameters to freeze.
+
+        Unimportant parameters are frozen at their value in the best
+        recorded configuration, or at their default if inactive there.
+        Parameters that conditions or forbidden clauses refer to stay free,
+        so the reduced space keeps them consistent.
+
+        Parameters:
+            keep (int, optional): Number of most important parameters to keep free, by threshold if None.
+            threshold (float, optional): Parameters below this share of the variance are frozen.
+
+        Returns:
+            dict: Parameter names and frozen values.
+        """
+        space = self.gaci.engine_param_spaces[self.engine]
+        ranked = list(self.importances)
+        if keep is not None:
+            free = set(ranked[:keep])
+        else:
+            free = {n for n, i in self.importances.items() if i >= threshold}
+        for condition in space.get_conditions():
+            free.update(p.name for p in condition.get_parents())
+        for forbidden in space.get_forbiddens():
+            free.update(c.hyperparameter.name
+                        for c in forbidden.get_descendant_literal_clauses())
+        best = self.best_config()
+
+        return {n: best.get(n, space[n].default_value)
+                for n in space if n not in free}
+
+    def write_reduced_pcs(self, pcs_path, out_path, keep=None,
+                          threshold=0.01):
+        """
+        Write a pcs file with the unimportant parameters frozen.
+
+        Frozen parameters keep their line with a single value, so the
+        engine still gets them and comments like # FLAG are kept.
+        Numeric parameters are written as a range of one value, which
+        read_engine_pcs reads as a numeric choice of their type.
+
+        Parameters:
+            pcs_path (str): Pcs file of the engine.
+            out_path (str): Pcs file to write, name it <engine>.pcs to read it with read_engine_pcs.
+            keep (int, optional): Number of most important parameters to keep free, by threshold if None.
+            threshold (float, optional): Parameters below this share of the variance are frozen.
+
+        Returns:
+            dict: Parameter names and frozen values.
+        """
+        frozen = self.frozen_values(keep, threshold)
+        lines = []
+        with open(pcs_path, 'r') as f:
+            for line in f:
+                name = line.split(' ')[0].strip()
+                # Condition lines also start with the child's name
+                if name in frozen and '|' not in line and \
+                        (' {' in line or ' [' in line):
+                    comment = ''
+                    if '#' in line:
+                        comment = ' #' + line.split('#', 1)[1].rstrip('\n')
+                    value = frozen[name]
+                    if line.startswith(f'{name} ['):
+                        # Numeric parameters keep their type and flags
+                        flags = line.split('#', 1)[0].rsplit(']', 1)[1]
+                        line = f'{name} [{value}, {value}] [{value}]' + \
+                            f'{flags.strip()}{comment}\n'
+                    else:
+                        line = f'{name} {{{value}}} [{value}]{comment}\n'
+                lines.append(line)
+        with open(out_path, 'w') as f:
+            f.writelines(lines)
+        print(f'\nFroze {len(frozen)} parameters in {out_path}\n')
+
+        return frozen
@@ -0,0 +1,245 @@
+"""Instance-specific algorithm configuration by feature clustering."""
+from up_ac.utils.scheduler import run_in_processes
+from up_ac.utils.trial_store import TrialStore
+
+
+def run_cluster_campaign(configurator_factory, gaci, engine, metric, mode,
+                         instances, instance_features, trial_store,
+                         scenario_args):
+    """
+    Run the configuration campaign of one cluster.
+
+    Module level, so that it can run in a separate process.
+
+    Parameters:
+        configurator_factory (callable): Returns a new Configurator.
+        gaci (ACInterface): AC interface object.
+        engine (str): Engine name or name of a joint space.
+        metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+        mode (str): Type of planning.
+        instances (list): Problem instance paths of the cluster.
+        instance_features (dict): Instance paths and lists of features.
+        trial_store (str): Sqlite file shared by the campaigns.
+        scenario_args (dict): Further arguments of set_scenario.
+
+    Returns:
+        dict or None: Incumbent of the cluster.
+    """
+    ac = configurator_factory()
+    ac.set_trial_store(trial_store)
+    ac.set_training_instance_set(instances)
+    ac.get_instance_features(instance_features)
+    scenario_args = dict(scenario_args)
+    # Clusters may have fewer instances than the budget asks for
+    scenario_args['min_budget'] = min(scenario_args.get('min_budget', 1),
+                                      len(instances))
+    scenario_args['max_budget'] = min(scenario_args.get('max_budget', 3),
+                                      len(instances))
+    ac.set_scenario(engine, gaci.engine_param_spaces[engine], gaci,
+                    instances=instances, instance_features=instance_features,
+                    metric=metric, **scenario_args)
+    feedback_function = ac.get_feedback_function(gaci, engine, metric, mode)
+    if feedback_function is None:
+        return None
+    incumbent, _ = ac.optimize(feedback_function=feedback_function)
+
+    return incumbent
+
+
+class ISAC():
+    """Configure per cluster of instances with similar features.
+
+    Features are scaled linearly to [-1, 1] and the training instances
+    are clustered with k-means. Each cluster gets its own configuration
+    campaign, and new instances get the incumbent of the nearest cluster.
+    """
+
+    def __init__(self, configurator_factory, gaci, engine, metric, mode,
+                 n_clusters=None, max_clusters=10, seed=0):
+        """
+        Initialize ISAC.
+
+        Parameters:
+            configurator_factory (callable): Returns a new Configurator, e.g. SmacConfigurator.
+            gaci (ACInterface): AC interface object with the pcs of the engine read.
+            engine (str): Engine name or name of a joint space.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+            n_clusters (int, optional): Number of clusters, chosen by silhouette score if None.
+            max_clusters (int, optional): Largest number of clusters to try if n_clusters is None.
+            seed (int, optional): Seed of k-means.
+        """
+        self.configurator_factory = configurator_factory
+        self.gaci = gaci
+        self.engine = engine
+        self.metric = metric
+        self.mode = mode
+        self.n_clusters = n_clusters
+        self.max_clusters = max_clusters
+        self.seed = seed
+        self.lower = None
+        self.upper = None
+        self.kmeans = None
+        self.clusters = {}
+        self.incumbents = {}
+
+    def features(self, domain, problem):
+        """
+        Features of an instance.
+
+        Parameters:
+            domain (str): Path of the PDDL domain.
+            problem (str): Path of the PDDL problem.
+
+        Returns:
+            list: Instance features.
+        """
+        return self.gaci.compute_instance_features(domain, problem)
+
+    def normalize(self, features):
+        """
+        Scale features to [-1, 1] by the range on the training instances.
+
+        Parameters:
+            features (list): Lists of instance features.
+
+        Returns:
+            numpy.ndarray: Scaled features.
+        """
+        import numpy as np
+
+        features = np.asarray(features, dtype=float)
+        span = np.where(self.upper > self.lower, self.upper - self.lower, 1)
+
+        return 2 * (features - self.lower) / span - 1
+
+    def cluster(self, instances, instance_features=None):
+        """
+        Cluster the training instances by their features.
+
+        Parameters:
+            instances (list): Problem instance paths, domains are domain.pddl in the same folder.
+            instance_features (dict, optional): Instance paths and lists of features, computed if missing.
+
+        Returns:
+            dict: Cluster index and its instance paths.
+        """
+        import numpy as np
+        from sklearn.cluster import KMeans
+        from sklearn.metrics import silhouette_score
+
+        if instance_features is None:
+            instance_features = {}
+        instance_features = dict(instance_features)
+        for instance in instances:
+            if instance not in instance_features:
+                domain = f'{instance.rsplit("/", 1)[0]}/domain.pddl'
+                instance_features[instance] = self.features(domain, instance)
+        self.instance_features = instance_features
+        raw = np.asarray([instance_features[i] for i in instances],
+                         dtype=float)
+        self.lower = raw.min(axis=0)
+        self.upper = raw.max(axis=0)
+        X = self.normalize(raw)
+
+        n_distinct = len(np.unique(X, axis=0))
+        if self.n_clusters is not None:
+            candidates = [min(self.n_clusters, n_distinct)]
+        else:
+            candidates = list(range(2, min(self.max_clusters,
+                                           n_distinct - 1) + 1)) or \
+                [min(2, n_distinct)]
+        best = None
+        for k in candidates:
+            kmeans = KMeans(n_clusters=k, n_init=10,
+                            random_state=self.seed).fit(X)
+            score = silhouette_score(X, kmeans.labels_) \
+                if 1 < k < len(X) else 0
+            if best is None or score > best[0]:
+                best = (score, kmeans)
+        self.kmeans = best[1]
+
+        self.clusters = {}
+        for instance, label in zip(instances, self.kmeans.labels_):
+            self.clusters.setdefault(int(label), []).append(instance)
+
+        return self.clusters
+
+    def configure(self, instances, instance_features=None, n_parallel=None,
+                  trial_store=None, **scenario_args):
+        """
+        Cluster the instances and run one campaign per cluster.
+
+        Campaigns run in parallel processes if the configurator supports
+        it, and share a trial store.
+
+        Parameters:
+            instances (list): Problem instance paths.
+            instance_features (dict, optional): Instance paths and lists of features, computed if missing.
+            n_parallel (int, optional): Number of campaigns at once, all clusters if None.
+            trial_store (str, optional): Sqlite file of the shared trial store, temporary file if None.
+            scenario_args: Further arguments of set_scenario, e.g. configuration_time or planner_timelimit.
+
+        Returns:
+            dict: Cluster index and its incumbent (None if no configuration was found).
+        """
+        self.cluster(instances, instance_features)
+        if trial_store is None:
+            trial_store = TrialStore().path
+        jobs = {c: (self.configurator_factory, self.gaci, self.engine,
+                    self.metric, self.mode, members,
+                    {i: self.instance_features[i] for i in members},
+                    trial_store, scenario_args)
+                for c, members in self.clusters.items()}
+
+        if getattr(self.configurator_factory, 'parallel_campaigns', False):
+            # Every campaign gets a new process, backends keep state
+            futures = run_in_processes(
+                {c: (run_cluster_campaign, job) for c, job in jobs.items()},
+                n_parallel)
+            self.incumbents = {c: f.result() for c, f in futures.items()}
+        else:
+            self.incumbents = {c: run_cluster_campaign(*job)
+                               for c, job in jobs.items()}
+
+        return self.incumbents
+
+    def nearest_cluster(self, features):
+        """
+        Nearest cluster with an incumbent.
+
+        Parameters:
+            features (list): Instance features.
+
+        Returns:
+            int: Cluster index.
+        """
+        import numpy as np
+
+        if self.kmeans is None:
+            raise ValueError('Instances are not clustered.')
+        x = self.normalize([features])[0]
+        distances = np.linalg.norm(self.kmeans.cluster_centers_ - x, axis=1)
+        for c in np.argsort(distances):
+            if self.incumbents.get(int(c)) is not None:
+                return int(c)
+
+        return int(np.argmin(distances))
+
+    def select(self, domain, problem):
+        """
+        Incumbent of the cluster nearest to an instance.
+
+        Parameters:
+            domain (str): Path of the PDDL domain.
+            problem (str): Path of the PDDL problem.
+
+        Returns:
+            tuple: Engine name and configuration, split from joint spaces, None if no cluster has an incumbent.
+        """
+        cluster = self.nearest_cluster(self.features(domain, problem))
+        incumbent = self.incumbents.get(cluster)
+        if incumbent is None:
+            return self.engine, None
+
+        return self.gaci.split_joint_config(self.engine, incumbent)
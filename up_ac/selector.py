@@ -0,0 +1,182 @@
+"""Per-instance selection of engine configurations from instance features."""
+import pickle
+
+
+class InstanceSelector():
+    """Select the best (engine, configuration) pair for an instance.
+
+    A random forest predicts the cost of every candidate from the instance
+    features in a single call. Features are cached per instance, so
+    repeated requests only pay for the prediction.
+    """
+
+    def __init__(self, gaci, n_estimators=50, seed=0):
+        """
+        Initialize the selector.
+
+        Parameters:
+            gaci (ACInterface): AC interface object, computes instance features.
+            n_estimators (int, optional): Number of trees of the forest.
+            seed (int, optional): Seed of the forest.
+        """
+        self.gaci = gaci
+        self.n_estimators = n_estimators
+        self.seed = seed
+        self.candidates = []
+        self.model = None
+        self.feature_cache = {}
+
+    def features(self, domain, problem):
+        """
+        Cached instance features.
+
+        Parameters:
+            domain (str): Path of the PDDL domain.
+            problem (str): Path of the PDDL problem.
+
+        Returns:
+            list: Instance features.
+        """
+        key = (domain, problem)
+        if key not in self.feature_cache:
+            self.feature_cache[key] = \
+                self.gaci.compute_instance_features(domain, problem)
+
+        return self.feature_cache[key]
+
+    def fit(self, candidates, matrix, instances, instance_features=None):
+        """
+        Train the selector on a performance matrix.
+
+        Parameters:
+            candidates (list): (engine, configuration) pairs.
+            matrix (list): One row of costs per candidate, one column per instance, lower is better.
+            instances (list): Problem instance paths, domains are domain.pddl in the same folder.
+            instance_features (dict, optional): Instance paths and lists of features, computed if missing.
+        """
+        from sklearn.ensemble import RandomForestRegressor
+
+        if len(candidates) != len(matrix):
+            raise ValueError('Performance matrix needs one row per ' +
+                             'candidate.')
+        if instance_features is None:
+            instance_features = {}
+        X = []
+        for instance in instances:
+            domain = f'{instance.rsplit("/", 1)[0]}/domain.pddl'
+            if instance in instance_features:
+                self.feature_cache[(domain, instance)] = \
+                    list(instance_features[instance])
+            X.append(self.features(domain, instance))
+        # Costs of all candidates are predicted at once
+        y = [[row[i] for row in matrix] for i in range(len(instances))]
+        self.model = RandomForestRegressor(n_estimators=self.n_estimators,
+                                           random_state=self.seed)
+        self.model.fit(X, y)
+        self.candidates = list(candidates)
+
+    def fit_from_store(self, trial_store, metric, mode, instances,
+                       objective=None, instance_features=None):
+        """
+        Train the selector on the trials recorded in a trial store.
+
+        Candidates are the configurations evaluated on all instances.
+
+        Parameters:
+            trial_store (TrialStore): Store of the configuration runs.
+            metric (str): Metric: 'runtime', 'quality' or 'runtime_quality'.
+            mode (str): Type of planning.
+            instances (list): Problem instance paths.
+            objective (str, optional): Objective to select by for 'runtime_quality'.
+            instance_features (dict, optional): Instance paths and lists of features, computed if missing.
+        """
+        runs = {}
+        configs = {}
+        for trial in trial_store.trials(metric=metric, mode=mode):
+            if trial['instance'] not in instances:
+                continue
+            cost = trial['cost']
+            if isinstance(cost, dict):
+                if objective is None:
+                    raise ValueError('Select an objective for costs of ' +
+                                     'several objectives.')
+                cost = cost[objective]
+            key = (trial['engine'], trial['config_hash'])
+            runs.setdefault(key, {})[trial['instance']] = cost
+            configs[key] = self.gaci.split_joint_config(trial['engine'],
+                                                        trial['config'])
+        keys = [k for k in runs if len(runs[k]) == len(instances)]
+        if not keys:
+            raise ValueError('No configuration was evaluated on all ' +
+                             'instances.')
+        self.fit([configs[k] for k in keys],
+                 [[runs[k][i] for i in instances] for k in keys],
+                 instances, instance_features)
+
+    def predict(self, domain, problem):
+        """
+        Predicted cost of every candidate on an instance.
+
+        Parameters:
+            domain (str): Path of the PDDL domain.
+            problem (str): Path of the PDDL problem.
+
+        Returns:
+            list: Predicted cost per candidate.
+        """
+        if self.model is None:
+            raise ValueError('Selector is not trained.')
+        prediction = self.model.predict([self.features(domain, problem)])[0]
+        if len(self.candidates) == 1:
+            return [float(prediction)]
+
+        return [float(cost) for cost in prediction]
+
+    def select(self, domain, problem):
+        """
+        Best (engine, configuration) pair for an instance.
+
+        Parameters:
+            domain (str): Path of the PDDL domain.
+            problem (str): Path of the PDDL problem.
+
+        Returns:
+            tuple: Engine name and configuration.
+        """
+        costs = self.predict(domain, problem)
+
+        return self.candidates[costs.index(min(costs))]
+
+    def save(self, path):
+        """
+        Save the trained selector.
+
+        Parameters:
+            path (str): File to write.
+        """
+        with open(path, 'wb') as f:
+            pickle.dump({'n_estimators': self.n_estimators,
+                         'seed': self.seed, 'candidates': self.candidates,
+                         'model': self.model,
+                         'feature_cache': self.feature_cache}, f)
+
+    @classmethod
+    def load(cls, path, gaci):
+        """
+        Load a trained selector.
+
+        Parameters:
+            path (str): File written by save.
+            gaci (ACInterface): AC interface object, computes instance features.
+
+        Returns:
+            InstanceSelector: The trained selector.
+        """
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        selector = cls(gaci, state['n_estimators'], state['seed'])
+        selector.candidates = state['candidates']
+        selector.model = state['model']
+        selector.feature_cache = state['feature_cache']
+
+        return selector
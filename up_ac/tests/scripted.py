@@ -0,0 +1,51 @@
+"""Configurator with scripted campaigns and costs, shared by the tests."""
+from up_ac.configurators import Configurator
+
+
+class ScriptedConfigurator(Configurator):
+    """Configurator whose campaigns return scripted incumbents.
+
+    Campaigns keep the arguments of set_scenario and return
+    scripted_incumbent. Instance costs come from scripted_cost, the
+    engine runs if it returns None. Every instance cost is logged in runs
+    as (config, instance, time limit). Tests subclass it at module level,
+    so that campaigns in spawned processes keep the script.
+    """
+
+    def __init__(self):
+        Configurator.__init__(self)
+        self.engine = None
+        self.scenario = {}
+        self.runs = []
+
+    def set_scenario(self, engine, param_space, gaci, metric='runtime',
+                     planner_timelimit=30, **kwargs):
+        self.engine = engine
+        self.metric = metric
+        self.planner_timelimit = planner_timelimit
+        self.scenario = kwargs
+
+    def get_feedback_function(self, gaci, engine, metric, mode,
+                              gray_box=False):
+        return lambda *args: None
+
+    def optimize(self, feedback_function=None, gray_box=False):
+        return self.scripted_incumbent(), None
+
+    def scripted_incumbent(self):
+        """Incumbent of a campaign."""
+        return {'engine': self.engine}
+
+    def scripted_cost(self, config, instance):
+        """Cost of a configuration on an instance, None to run the engine."""
+        return None
+
+    def instance_cost(self, gaci, engine, metric, mode, config, instance):
+        self.runs.append((dict(config), instance,
+                          self.timelimit_for(instance)))
+        cost = self.scripted_cost(config, instance)
+        if cost is None:
+            return Configurator.instance_cost(self, gaci, engine, metric,
+                                              mode, config, instance)
+
+        return cost
@@ -0,0 +1,89 @@
+"""Test ablation between default and incumbent."""
+import sys
+import os
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from ConfigSpace import ConfigurationSpace, Categorical, EqualsCondition, \
+    ForbiddenAndConjunction, ForbiddenEqualsClause
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.ablation import Ablation
+from up_ac.tests.scripted import ScriptedConfigurator
+
+space = ConfigurationSpace()
+search = Categorical('search', ['astar', 'lazy'], default='astar')
+heuristic = Categorical('heuristic', ['ff', 'cg'], default='ff')
+boost = Categorical('boost', ['0', '100'], default='0')
+noise = Categorical('noise', ['off', 'on'], default='off')
+space.add_hyperparameters([search, heuristic, boost, noise])
+# Boosting only exists for lazy search
+space.add_condition(EqualsCondition(boost, search, 'lazy'))
+space.add_forbidden_clause(ForbiddenAndConjunction(
+    ForbiddenEqualsClause(heuristic, 'cg'),
+    ForbiddenEqualsClause(noise, 'on')))
+
+gaci = GenericACInterface()
+gaci.engine_param_spaces['toy'] = space
+instances = ['d/p1.pddl', 'd/p2.pddl', 'd/p3.pddl']
+
+
+class AblationConfigurator(ScriptedConfigurator):
+    """Configurator with runtimes scripted by parameter values."""
+
+    def scripted_cost(self, config, instance):
+        cost = 10
+        if config['search'] == 'lazy':
+            cost -= 1
+        if config.get('boost') == '100':
+            cost -= 5
+        if config['heuristic'] == 'cg':
+            cost -= 0.1
+        return cost
+
+
+class TestAblation(unittest.TestCase):
+
+    def test_path(self):
+        AC = AblationConfigurator()
+        ablation = Ablation(AC, gaci, 'toy', 'runtime', 'OneshotPlanner',
+                            instances)
+        steps = ablation.run({'search': 'lazy', 'heuristic': 'cg',
+                              'boost': '100', 'noise': 'off'})
+        # Boost is only flipped once lazy search activates it
+        self.assertEqual([s['parameter'] for s in steps],
+                         ['search', 'boost', 'heuristic'])
+        self.assertEqual([s['cost'] for s in steps], [9, 4, 3.9])
+        self.assertEqual(ablation.contributions()[0], ('boost', 5))
+        self.assertAlmostEqual(sum(s['contribution'] for s in steps), 6.1)
+
+    def test_racing_drops_bad_candidates(self):
+        AC = AblationConfigurator()
+        ablation = Ablation(AC, gaci, 'toy', 'runtime', 'OneshotPlanner',
+                            instances, min_instances=1, race_tolerance=0)
+        ablation.run({'search': 'lazy', 'heuristic': 'cg'})
+        # The heuristic flip loses to lazy search on the first instance
+        heuristic_runs = [r for r in AC.runs
+                          if r[0]['heuristic'] == 'cg' and
+                          r[0]['search'] == 'astar']
+        self.assertEqual(len(heuristic_runs), 1)
+
+    def test_forbidden_flips_are_skipped(self):
+        AC = AblationConfigurator()
+        ablation = Ablation(AC, gaci, 'toy', 'runtime', 'OneshotPlanner',
+                            instances, n_jobs=2)
+        steps = ablation.run({'search': 'astar', 'heuristic': 'cg',
+                              'noise': 'on'},
+                             default={'search': 'astar', 'heuristic': 'ff',
+                                      'noise': 'on'})
+        self.assertEqual(steps, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
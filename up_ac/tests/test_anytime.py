@@ -0,0 +1,81 @@
+"""Test quality over time of anytime planner runs."""
+import sys
+import os
+import time
+import unittest
+from types import SimpleNamespace
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.configurators import Configurator
+from up_ac.utils.anytime import QualityCurve, collect_solutions
+
+
+class SlowAnytimeInterface():
+    """Reports two plans, then ignores its time limit."""
+
+    def run_engine_config(self, config, metric, engine, mode, problem,
+                          with_record=False, timelimit=None,
+                          plan_channel=None):
+        plan_channel.put(0.1, 7.0)
+        plan_channel.put(0.2, 4.0)
+        time.sleep(30)
+
+
+class TestAnytime(unittest.TestCase):
+
+    def test_curve(self):
+        curve = QualityCurve([(2, 10), (4, 12), (6, 5)])
+        self.assertEqual(curve.best(), 5)
+        self.assertEqual(curve.first_solution_time(), 2)
+        self.assertIsNone(curve.quality_at(1))
+        self.assertEqual(curve.quality_at(5), 10)
+        # 2s at penalty 12, 4s at 10, 4s at 5
+        self.assertEqual(curve.auc(10), (24 + 40 + 20) / 10)
+        self.assertEqual(curve.auc(10, penalty=20), (40 + 40 + 20) / 10)
+        self.assertEqual(curve.checkpoint_cost([1, 5, 10]), (12 + 10 + 5) / 3)
+        self.assertIsNone(QualityCurve().auc(10))
+
+    def test_collect_solutions(self):
+        plans = ['a', 'b', None]
+        planner = SimpleNamespace(get_solutions=lambda problem, timeout: (
+            SimpleNamespace(plan=p) for p in plans))
+        evaluator = SimpleNamespace(plan_cost=lambda problem, plan:
+                                    {'a': 3.0, 'b': 2.0}[plan])
+        result, curve = collect_solutions(planner, None, evaluator, 5)
+        self.assertIsNone(result.plan)
+        self.assertEqual([c for _, c in curve.points], [3.0, 2.0])
+
+    def test_anytime_objective(self):
+        AC = Configurator()
+        AC.planner_timelimit = 10
+        record = SimpleNamespace(curve=[(2, 10), (4, 12), (6, 5)])
+        self.assertEqual(AC.resolve_feedback('fast-downward', 'quality', 5,
+                                             0, record), 5)
+        AC.set_anytime_objective('auc')
+        self.assertEqual(AC.resolve_feedback('fast-downward', 'quality', 5,
+                                             0, record), 8.4)
+        with self.assertRaises(ValueError):
+            AC.set_anytime_objective('area')
+
+    def test_grace_keeps_best_plan(self):
+        AC = Configurator()
+        AC.set_anytime_objective('final', grace=0.5)
+        start = time.time()
+        feedback, record = AC.run_engine(SlowAnytimeInterface(), {},
+                                         'quality', 'fast-downward',
+                                         'AnytimePlanner', None, 1)
+        self.assertLess(time.time() - start, 10)
+        self.assertEqual(feedback, 4.0)
+        self.assertEqual(record.status, 'TIMEOUT')
+        self.assertEqual(AC.resolve_feedback('fast-downward', 'quality',
+                                             feedback, 0, record), 4.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
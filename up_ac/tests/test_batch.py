@@ -0,0 +1,122 @@
+"""Test batches of campaigns on shared cores."""
+import sys
+import os
+import json
+import tempfile
+import time
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.batch import CampaignBatch
+from up_ac.tests.scripted import ScriptedConfigurator
+
+gaci = GenericACInterface()
+gaci.read_engine_pcs(['lpg', 'fast-downward'], f'{path}/engine_pcs')
+
+
+class ScriptedInterface():
+    """AC interface with a planner that sleeps."""
+
+    def run_engine_config(self, config, metric, engine, mode, problem,
+                          **kwargs):
+        start = time.time()
+        time.sleep(0.3)
+        return (start, time.time()), None
+
+
+class BatchConfigurator(ScriptedConfigurator):
+    """Configurator running two planner runs per campaign."""
+
+    def set_scenario(self, engine, param_space, gaci, metric='runtime',
+                     planner_timelimit=10, **kwargs):
+        ScriptedConfigurator.set_scenario(self, engine, param_space, gaci,
+                                          metric, planner_timelimit,
+                                          **kwargs)
+        self.trial_store.record(engine, metric, 'OneshotPlanner', 'h',
+                                'p1', planner_timelimit, 1)
+
+    def get_feedback_function(self, gaci, engine, metric, mode,
+                              gray_box=False):
+        return None if engine == 'fast-downward' else lambda *args: None
+
+    def scripted_incumbent(self):
+        spans = [self.run_engine(ScriptedInterface(), {}, 'runtime',
+                                 self.engine, 'OneshotPlanner', None)[0]
+                 for _ in range(2)]
+        return {'pid': os.getpid(), 'spans': spans}
+
+
+class SharedFileConfigurator(BatchConfigurator):
+    """Configurator whose campaigns cannot run at the same time."""
+
+    parallel_campaigns = False
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_batch(self):
+        output_dir = tempfile.mkdtemp()
+        CampaignBatch.backends['scripted'] = BatchConfigurator
+        CampaignBatch.backends['shared'] = SharedFileConfigurator
+        batch = CampaignBatch(gaci, output_dir, n_cores=1)
+        results = batch.run([('lpg', 'runtime', 'OneshotPlanner',
+                              'scripted', 10),
+                             ('lpg', 'quality', 'OneshotPlanner',
+                              'shared', 10),
+                             ('lpg', 'runtime', 'OneshotPlanner',
+                              'shared', 10),
+                             ('fast-downward', 'runtime', 'OneshotPlanner',
+                              'scripted', 10)],
+                            planner_timelimit=5)
+        self.assertEqual(len(results), 4)
+        self.assertIsNone(
+            results['fast-downward_runtime_OneshotPlanner_scripted']
+            ['incumbent'])
+        incumbents = [r['incumbent'] for r in results.values()
+                      if r['incumbent'] is not None]
+        # One core for all campaigns, so no two runs overlap
+        spans = sorted(tuple(s) for i in incumbents for s in i['spans'])
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            self.assertLessEqual(end, start + 0.01)
+        # Shared file campaigns run one after another in one process
+        self.assertEqual(
+            results['lpg_quality_OneshotPlanner_shared']['incumbent']['pid'],
+            results['lpg_runtime_OneshotPlanner_shared']['incumbent']['pid'])
+
+        with open(f'{output_dir}/incumbents.json') as f:
+            self.assertEqual(set(json.load(f)), set(results))
+        self.assertTrue(os.path.isfile(f'{output_dir}/trials.sqlite'))
+        del CampaignBatch.backends['scripted']
+        del CampaignBatch.backends['shared']
+
+    def test_repeated_campaigns(self):
+        output_dir = tempfile.mkdtemp()
+        CampaignBatch.backends['scripted'] = BatchConfigurator
+        batch = CampaignBatch(gaci, output_dir, n_cores=2)
+        campaign = ('lpg', 'runtime', 'OneshotPlanner', 'scripted')
+        results = batch.run([campaign + (10,), campaign + (20,),
+                             campaign + (10,)], planner_timelimit=5)
+        name = 'lpg_runtime_OneshotPlanner_scripted'
+        self.assertEqual(set(results), {name, f'{name}_2', f'{name}_3'})
+        self.assertEqual([results[n]['configuration_time']
+                          for n in (name, f'{name}_2', f'{name}_3')],
+                         [10, 20, 10])
+        self.assertTrue(all(r['incumbent'] is not None
+                            for r in results.values()))
+        del CampaignBatch.backends['scripted']
+
+    def test_unknown_backend(self):
+        batch = CampaignBatch(gaci, tempfile.mkdtemp())
+        with self.assertRaises(ValueError):
+            batch.configurator('paramils')
+
+
+if __name__ == '__main__':
+    unittest.main()
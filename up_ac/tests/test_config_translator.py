@@ -0,0 +1,96 @@
+"""Test the compiled configuration translators."""
+import sys
+import os
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.utils.config_translator import InvalidConfigurationError, \
+    check_fd_option
+
+gaci = GenericACInterface()
+gaci.read_engine_pcs(['fast-downward', 'lpg', 'tamer', 'symk'],
+                     f'{path}/engine_pcs')
+
+
+class TestConfigTranslator(unittest.TestCase):
+
+    def test_fast_downward_default(self):
+        default_config = \
+            gaci.engine_param_spaces['fast-downward'].get_default_configuration()
+        config = gaci.transform_conf_from_ac('fast-downward', default_config)
+        self.assertEqual(
+            config, {'fast_downward_search_config':
+                     'astar(blind(),pruning=null(),cost_type=normal)'})
+
+    def test_lpg_flags(self):
+        config = gaci.transform_conf_from_ac(
+            'lpg', {'avoid_best_action_cycles': '2', 'bestfirst': '1',
+                    'choose_min_numA_fact': '1'})
+        self.assertEqual(config, {'-avoid_best_action_cycles': '2',
+                                  '-bestfirst': '1',
+                                  '-choose_min_numA_fact': ''})
+        config = gaci.transform_conf_from_ac(
+            'lpg', {'bestfirst': '1', 'choose_min_numA_fact': '0'})
+        self.assertEqual(config, {'-bestfirst': '1'})
+
+    def test_string_values_are_cast(self):
+        # OAT passes all values as strings
+        config = gaci.transform_conf_from_ac(
+            'tamer', {'heuristic': 'hff', 'weight': '0.25'})
+        self.assertEqual(config, {'heuristic': 'hff', 'weight': 0.25})
+
+    def test_memoized(self):
+        translator = gaci.get_translator('tamer')
+        first = translator.translate({'heuristic': 'hff', 'weight': 0.5})
+        first['weight'] = 0.75
+        second = translator.translate({'weight': '0.5', 'heuristic': 'hff'})
+        self.assertEqual(second['weight'], 0.5)
+        self.assertEqual(len(translator.translations), 1)
+
+    def test_invalid_values(self):
+        with self.assertRaises(InvalidConfigurationError):
+            gaci.transform_conf_from_ac('tamer', {'weight': 3.0})
+        with self.assertRaises(InvalidConfigurationError):
+            gaci.transform_conf_from_ac('tamer', {'heuristic': 'unknown'})
+        with self.assertRaises(InvalidConfigurationError):
+            gaci.transform_conf_from_ac('tamer', {'depth': 3})
+
+    def test_fd_grammar(self):
+        engines = {'astar', 'eager'}
+        check_fd_option('eager([single(ff())],reopen_closed=true)', engines)
+        for option in ('astar(blind(),)', 'astar(blind()', 'ida(blind())',
+                       'astar(blind(),cost=one)', 'astar(blind())x'):
+            with self.assertRaises(InvalidConfigurationError):
+                check_fd_option(option, engines)
+
+    def test_inactive_parameters_are_dropped(self):
+        config = {'fast_downward_search_config': 'astar', 'evaluator': 'ff',
+                  'cost_type': 'one', 'pruning': 'null'}
+        inactive = dict(config, open='single', open_list_evals='cg',
+                        randomize_successors='true')
+        hash_a, canonical = gaci.canonicalize('symk', config)
+        hash_b, _ = gaci.canonicalize('symk', inactive)
+        self.assertEqual(hash_a, hash_b)
+        self.assertEqual(canonical, config)
+        _, canonical = gaci.canonicalize(
+            'symk', dict(config, fast_downward_search_config='lazy',
+                         open='single', open_list_evals='cg'))
+        self.assertNotIn('evaluator', canonical)
+        self.assertEqual(canonical['open_list_evals'], 'cg')
+
+    def test_ignored_values_share_invocation(self):
+        hash_a, _ = gaci.canonicalize(
+            'lpg', {'bestfirst': '1', 'choose_min_numA_fact': '0'})
+        hash_b, _ = gaci.canonicalize('lpg', {'bestfirst': '1'})
+        self.assertEqual(hash_a, hash_b)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Test fast-fail of configurations that crash on every instance."""
+import sys
+import os
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from unified_planning.exceptions import UPException
+from unified_planning.io import PDDLReader
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.Smac_configurator import SmacConfigurator
+from up_ac.utils.crash_classification import ConfigurationCrash, \
+    config_error_in_text, is_config_error
+from up_ac.utils.config_translator import InvalidConfigurationError
+
+instances = [f'{path}/test_problems/depot/problem.pddl',
+             f'{path}/test_problems/counters/problem.pddl']
+
+
+class TestCrashClassification(unittest.TestCase):
+
+    def test_classify_errors(self):
+        self.assertTrue(is_config_error(InvalidConfigurationError('x')))
+        self.assertTrue(is_config_error(
+            UPException('Could not parse search configuration')))
+        self.assertFalse(is_config_error(UPException('Out of memory')))
+        self.assertEqual(
+            config_error_in_text('translate\nusage: downward [OPTIONS]'),
+            'usage: downward [OPTIONS]')
+
+    def test_instance_errors_are_not_config_errors(self):
+        # A broken instance must not quarantine the configuration
+        for log in ('Could not parse domain file domain.pddl',
+                    'Parse error in problem.pddl, line 12: unexpected )',
+                    'Input error: undefined object truck9 in problem file',
+                    'translate: Error: Could not parse task'):
+            self.assertIsNone(config_error_in_text(log), log)
+            self.assertFalse(is_config_error(UPException(log)), log)
+        self.assertTrue(is_config_error(
+            UPException('Input error: unknown option --heurstic')))
+
+    def test_rejected_options_raise(self):
+        gaci = GenericACInterface()
+        problem = PDDLReader().parse_problem(
+            instances[0].rsplit('/', 1)[0] + '/domain.pddl', instances[0])
+        with self.assertRaises(ConfigurationCrash):
+            gaci.run_engine_config({'depth': 3}, 'runtime', 'pyperplan',
+                                   'OneshotPlanner', problem)
+
+    def test_quarantine(self):
+        gaci = GenericACInterface()
+        AC = SmacConfigurator()
+        AC.planner_timelimit = 5
+        feedback = AC.get_feedback_function(gaci, 'pyperplan', 'runtime',
+                                            'OneshotPlanner')
+        self.assertEqual(feedback({'depth': 3}, instances[0], 1,
+                                  PDDLReader()), 5)
+        trial, cost = AC.lookup_trial(gaci, 'pyperplan', 'runtime',
+                                      'OneshotPlanner', {'depth': 3},
+                                      instances[1])
+        self.assertEqual(cost, 5)
+        self.assertIsNotNone(AC.trial_store.quarantined(
+            'pyperplan', 'OneshotPlanner', trial['config_hash']))
+        os.remove(AC.trial_store.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Test budget allocation across engine campaigns."""
+import sys
+import os
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.engine_bandit import EngineBandit
+from up_ac.tests.scripted import ScriptedConfigurator
+from up_ac.utils.trial_store import TrialStore
+
+
+# Incumbent score per engine and round
+scores = {'a': [5, 3, 2], 'b': [4, 4, 4], 'c': [9], 'd': [8]}
+
+
+class BanditConfigurator(ScriptedConfigurator):
+    """Configurator whose incumbent scores follow a script per engine.
+
+    Campaigns may run in other processes, so rounds are counted in the
+    trial store.
+    """
+
+    def evaluate(self, metric, engine, mode, incumbent, gaci,
+                 planner_timelimit=10, crash_cost=0, instances=[]):
+        n = len(self.trial_store.trials(engine=engine))
+        self.trial_store.record(
+            engine, metric, mode, f'{engine}{n}', 'p.pddl', 10,
+            scores[engine][n], config={'engine': engine, 'round': n},
+            info={'initial': self.initial_configs, 'pid': os.getpid()})
+
+        return scores[engine][n]
+
+
+class SequentialConfigurator(BanditConfigurator):
+    parallel_campaigns = False
+
+
+class Spaces():
+    engine_param_spaces = {'a': None, 'b': None, 'c': None, 'd': None}
+    joint_engines = {}
+
+
+class TestEngineBandit(unittest.TestCase):
+
+    def run_bandit(self, factory):
+        bandit = EngineBandit(factory, Spaces(), ['a', 'b', 'c', 'd'],
+                              'runtime', 'OneshotPlanner')
+        self.assertEqual(bandit.n_rounds(), 3)
+        store = TrialStore()
+        engine, incumbent = bandit.run(120, n_workers=4,
+                                       trial_store=store.path)
+        self.assertEqual((engine, incumbent), ('a', {'engine': 'a'}))
+        # c and d are dropped after the first round, b stalls after the
+        # second and a gets the rest of the budget and all cores
+        self.assertEqual([h['engine'] for h in bandit.history],
+                         ['a', 'b', 'c', 'd', 'b', 'a', 'a'])
+        # Later rounds start from the best configuration so far
+        trials = {t['config_hash']: t['info']
+                  for t in store.trials(engine='a')}
+        self.assertEqual(trials['a0']['initial'], [])
+        self.assertEqual(trials['a2']['initial'],
+                         [{'engine': 'a', 'round': 1}])
+
+        return bandit, {t['info']['pid'] for t in store.trials()}
+
+    def test_halving(self):
+        bandit, pids = self.run_bandit(SequentialConfigurator)
+        budgets = [(h['configuration_time'], h['n_workers'])
+                   for h in bandit.history]
+        self.assertEqual(budgets[0], (10, 1))
+        self.assertEqual(budgets[4], (20, 2))
+        self.assertEqual(budgets[-1], (40, 4))
+        self.assertAlmostEqual(sum(b[0] for b in budgets), 120)
+        self.assertEqual(pids, {os.getpid()})
+
+    def test_concurrent_rounds(self):
+        bandit, pids = self.run_bandit(BanditConfigurator)
+        # Campaigns of a round share its time and split the cores
+        budgets = [(h['configuration_time'], h['n_workers'])
+                   for h in bandit.history]
+        self.assertEqual(budgets, [(40, 1)] * 4 + [(40, 2)] * 2 + [(40, 4)])
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual(len(pids), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -38,7 +38,7 @@ class TestIraceEnhspOnQuality(unittest.TestCase):
     IAC.set_scenario(engine[0],
                      igaci.engine_param_spaces[engine[0]], igaci,
                      configuration_time=300, n_trials=30,
-                     crash_cost=0, min_budget=3,
+                     min_budget=3,
                      planner_timelimit=5, n_workers=3,
                      instance_features=None)
     IAC_fb_func = IAC.get_feedback_function(igaci, engine[0],
@@ -90,7 +90,7 @@ class TestIraceEnhspOnRuntime(unittest.TestCase):
     IAC.set_scenario(engine[0],
                      igaci.engine_param_spaces[engine[0]], igaci,
                      configuration_time=300, n_trials=30,
-                     crash_cost=0, min_budget=3,
+                     min_budget=3,
                      planner_timelimit=5, n_workers=3,
                      instance_features=None)
     IAC_fb_func = IAC.get_feedback_function(igaci, engine[0],
@@ -52,7 +52,7 @@ class TestSmacFastDownwardOnQuality(unittest.TestCase):
     SAC.set_scenario(engine[0],
                      sgaci.engine_param_spaces[engine[0]],
                      sgaci, configuration_time=30, n_trials=30,
-                     min_budget=1, max_budget=3, crash_cost=0,
+                     min_budget=1, max_budget=3,
                      planner_timelimit=5, n_workers=2,
                      instance_features=SAC.instance_features)
 
@@ -117,7 +117,7 @@ class TestSmacFastDownwardOnRuntime(unittest.TestCase):
     SAC.set_scenario(engine[0],
                      sgaci.engine_param_spaces[engine[0]],
                      sgaci, configuration_time=30, n_trials=30,
-                     min_budget=1, max_budget=3, crash_cost=0,
+                     min_budget=1, max_budget=3,
                      planner_timelimit=5, n_workers=2,
                      instance_features=SAC.instance_features)
 
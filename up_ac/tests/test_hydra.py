@@ -0,0 +1,89 @@
+"""Test Hydra-style portfolio construction."""
+import sys
+import os
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.hydra import HydraPortfolio
+from up_ac.tests.scripted import ScriptedConfigurator
+from up_ac.utils.trial_store import TrialStore
+
+gaci = GenericACInterface()
+gaci.read_engine_pcs(['lpg'], f'{path}/engine_pcs')
+default = dict(gaci.engine_param_spaces['lpg'].get_default_configuration())
+configs = [dict(default, bestfirst='0'), dict(default, bestfirst='2'),
+           dict(default, bestfirst='2')]
+instances = ['d/p1.pddl', 'd/p2.pddl']
+
+
+class PortfolioConfigurator(ScriptedConfigurator):
+    """Configurator returning scripted incumbents."""
+
+    incumbents = []
+    portfolios = []
+
+    def scripted_incumbent(self):
+        self.portfolios.append(self.portfolio_costs)
+        return self.incumbents.pop(0)
+
+
+class TestHydra(unittest.TestCase):
+
+    def test_portfolio(self):
+        PortfolioConfigurator.incumbents = list(configs)
+        PortfolioConfigurator.portfolios = []
+        hydra = HydraPortfolio(PortfolioConfigurator, gaci, 'lpg', 'runtime',
+                               'OneshotPlanner', instances)
+        ac = PortfolioConfigurator()
+        ac.set_trial_store(hydra.trial_store)
+        ac.planner_timelimit = 10
+        # Costs the campaigns recorded, the matrix reuses them
+        for config, costs in zip(configs, [(1, 9), (8, 2)]):
+            for instance, cost in zip(instances, costs):
+                trial, _ = ac.lookup_trial(gaci, 'lpg', 'runtime',
+                                           'OneshotPlanner', config,
+                                           instance)
+                ac.record_trial(trial, cost)
+
+        portfolio, matrix = hydra.build(3, planner_timelimit=10)
+        # The third campaign finds a member again and stops
+        self.assertEqual(portfolio, configs[:2])
+        self.assertEqual(matrix, [[1, 9], [8, 2]])
+        self.assertEqual(PortfolioConfigurator.portfolios[1],
+                         {instances[0]: 1, instances[1]: 9})
+        self.assertEqual(hydra.portfolio_cost(), 1.5)
+        ac.portfolio_costs = hydra.best_costs()
+        self.assertEqual(ac.marginal_cost(instances[1], 5), 2)
+        self.assertEqual(ac.marginal_cost('d/p3.pddl', 5), 5)
+
+    def test_portfolio_of_real_engine(self):
+        tamer = GenericACInterface()
+        tamer.read_engine_pcs(['tamer'], f'{path}/engine_pcs')
+        default = dict(tamer.engine_param_spaces['tamer']
+                       .get_default_configuration())
+        PortfolioConfigurator.incumbents = [
+            default, dict(default, heuristic='hff'), default]
+        problems = [f'{path}/test_problems/{d}/problem.pddl'
+                    for d in ('counters', 'matchcellar')]
+        hydra = HydraPortfolio(PortfolioConfigurator, tamer, 'tamer',
+                               'runtime', 'OneshotPlanner', problems)
+        portfolio, matrix = hydra.build(3, planner_timelimit=10)
+        self.assertEqual(len(portfolio), 2)
+        # The matrix holds the runtimes tamer took on the problems
+        for row in matrix:
+            self.assertEqual(len(row), 2)
+            for runtime in row:
+                self.assertGreater(runtime, 0)
+                self.assertLess(runtime, 10)
+        self.assertEqual(len(TrialStore(hydra.trial_store).trials()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
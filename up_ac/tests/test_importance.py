@@ -0,0 +1,122 @@
+"""Test parameter importance and pcs pruning."""
+import sys
+import os
+import tempfile
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from unified_planning.io import PDDLReader
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.importance import ParameterImportance
+from up_ac.utils.trial_store import TrialStore
+
+engine = 'lpg_to_revise'
+gaci = GenericACInterface()
+gaci.read_engine_pcs([engine, 'tamer'], f'{path}/engine_pcs')
+
+
+def scripted_cost(config):
+    # Only the heuristic and the noise matter
+    return 10 * (config['heuristic'] != '6') + config['maxnoise'] / 10
+
+
+class TestImportance(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.store = TrialStore()
+        space = gaci.engine_param_spaces[engine]
+        space.seed(1)
+        for config in space.sample_configuration(60):
+            config_hash, canonical = gaci.canonicalize(engine, dict(config))
+            for instance in ('p1', 'p2'):
+                cls.store.record(engine, 'runtime', 'OneshotPlanner',
+                                 config_hash, instance, 30,
+                                 scripted_cost(canonical), canonical)
+        cls.analysis = ParameterImportance(gaci, engine)
+        cls.importances = cls.analysis.fit_from_store(
+            cls.store, 'runtime', 'OneshotPlanner')
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.store.path)
+
+    def test_ranking(self):
+        self.assertEqual(set(list(self.importances)[:2]),
+                         {'heuristic', 'maxnoise'})
+        self.assertGreater(self.importances['heuristic'],
+                           100 * list(self.importances.values())[2])
+
+    def test_reduced_pcs(self):
+        out_dir = tempfile.mkdtemp()
+        frozen = self.analysis.write_reduced_pcs(
+            f'{path}/engine_pcs/{engine}.pcs', f'{out_dir}/{engine}.pcs',
+            keep=2)
+        self.assertNotIn('heuristic', frozen)
+        # Parents of conditions and forbidden clauses stay free
+        for name in ('lagrange', 'bestfirst', 'numrestart',
+                     'searchcostx1stsol', 'onlysearchcostx1stsol'):
+            self.assertNotIn(name, frozen)
+        self.assertEqual(len(frozen), len(gaci.engine_param_spaces[engine])
+                         - 7)
+        with open(f'{out_dir}/{engine}.pcs') as f:
+            lines = {line.split(' ')[0]: line for line in f}
+        self.assertTrue(
+            lines['improve_reachability'].rstrip().endswith('# FLAG'))
+
+        reduced = GenericACInterface()
+        reduced.read_engine_pcs([engine], out_dir)
+        space = reduced.engine_param_spaces[engine]
+        self.assertEqual(len(space['improve_reachability'].choices), 1)
+        self.assertEqual(len(space['heuristic'].choices), 6)
+        self.assertEqual(
+            reduced.engine_param_types[engine]['-improve_reachability'],
+            'FLAG')
+        # Frozen values come from the best recorded configuration
+        best = self.analysis.best_config()
+        self.assertEqual(best['heuristic'], '6')
+        self.assertEqual(str(space['improve_reachability'].default_value),
+                         str(best['improve_reachability']))
+
+    def test_reduced_pcs_runs(self):
+        store = TrialStore()
+        space = gaci.engine_param_spaces['tamer']
+        space.seed(1)
+        for config in space.sample_configuration(20):
+            config_hash, canonical = gaci.canonicalize('tamer', dict(config))
+            store.record('tamer', 'runtime', 'OneshotPlanner', config_hash,
+                         'p1', 30, 10 * (canonical['heuristic'] != 'hadd'),
+                         canonical)
+        analysis = ParameterImportance(gaci, 'tamer')
+        analysis.fit_from_store(store, 'runtime', 'OneshotPlanner')
+        os.remove(store.path)
+        out_dir = tempfile.mkdtemp()
+        frozen = analysis.write_reduced_pcs(
+            f'{path}/engine_pcs/tamer.pcs', f'{out_dir}/tamer.pcs', keep=1)
+        self.assertEqual(list(frozen), ['weight'])
+
+        reduced = GenericACInterface()
+        reduced.read_engine_pcs(['tamer'], out_dir)
+        config = reduced.engine_param_spaces['tamer'] \
+            .get_default_configuration()
+        config_hash, canonical = reduced.canonicalize('tamer', dict(config))
+        self.assertIsInstance(canonical['weight'], float)
+        # The engine accepts the frozen values
+        problem = PDDLReader().parse_problem(
+            f'{path}/test_problems/counters/domain.pddl',
+            f'{path}/test_problems/counters/problem.pddl')
+        feedback = reduced.run_engine_config(dict(config), 'quality',
+                                             'tamer', 'OneshotPlanner',
+                                             problem)
+        self.assertIsNotNone(feedback)
+
+
+if __name__ == '__main__':
+    unittest.main()
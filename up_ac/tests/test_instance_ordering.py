@@ -0,0 +1,109 @@
+"""Test ordering of training instances by hardness."""
+import sys
+import os
+import unittest
+from collections import namedtuple
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.Irace_configurator import IraceConfigurator
+from up_ac.Smac_configurator import SmacConfigurator, ordered_intensifier
+from up_ac.utils.instance_ordering import estimate_hardness, \
+    order_instances
+from up_ac.utils.trial_store import TrialStore
+
+gaci = GenericACInterface()
+gaci.read_engine_pcs(['lpg'], f'{path}/engine_pcs')
+
+
+class IraceSpaces(GenericACInterface):
+    """Interface with the irace space stubbed, rpy2 may be missing."""
+
+    irace_param_space = 'parameters'
+
+    def get_ps_irace(self, param_space, initial_configs=None):
+        self.initial_configs = initial_configs
+        return 'defaults', False
+
+
+class TestInstanceOrdering(unittest.TestCase):
+
+    hardness = {'a': 5, 'b': 1, 'c': 9, 'd': 3, 'e': 7, 'f': 2}
+
+    def test_cheapest_first(self):
+        self.assertEqual(order_instances(list(self.hardness),
+                                         self.hardness),
+                         ['b', 'f', 'd', 'a', 'e', 'c'])
+
+    def test_stratified(self):
+        ordered = order_instances(list(self.hardness), self.hardness,
+                                  'stratified', n_strata=3)
+        # One instance of every stratum before the next round
+        self.assertEqual(ordered, ['b', 'd', 'e', 'f', 'a', 'c'])
+        with self.assertRaises(ValueError):
+            order_instances(['a'], self.hardness, 'hardest')
+
+    def test_hardness_from_runs_and_features(self):
+        store = TrialStore()
+        features = {'a': [1, 1], 'b': [2, 2], 'c': [3, 3], 'd': [4, 4]}
+        for instance, cost in (('a', 1), ('b', 2), ('c', 3)):
+            store.record('lpg', 'runtime', 'OneshotPlanner', 'h', instance,
+                         30, cost)
+        store.record('lpg', 'runtime_quality', 'OneshotPlanner', 'h', 'a',
+                     30, {'runtime': 3, 'quality': -10})
+        hardness = estimate_hardness(list(features), features, store)
+        self.assertEqual(hardness['a'], 2)
+        # Predicted from the features of instances with runs
+        self.assertGreater(hardness['d'], hardness['a'])
+        os.remove(store.path)
+
+    def test_hardness_from_size(self):
+        features = {'small': [1, 0, 2, 3], 'large': [9, 0, 200, 300]}
+        hardness = estimate_hardness(list(features), features)
+        self.assertGreater(hardness['large'], hardness['small'])
+        self.assertEqual(estimate_hardness(['x', 'y']), {'x': 0, 'y': 0})
+
+    def test_smac_runs_ordered_instances(self):
+        features = {'p1': [9, 0, 200, 300], 'p2': [1, 0, 2, 3],
+                    'p3': [4, 0, 20, 30]}
+        AC = SmacConfigurator()
+        AC.set_trial_store()
+        AC.set_scenario('lpg', gaci.engine_param_spaces['lpg'], gaci,
+                        instances=list(features),
+                        instance_features=features,
+                        instance_order='cheapest')
+        self.assertEqual(AC.scenario.instances, ['p2', 'p3', 'p1'])
+        intensifier = ordered_intensifier(AC.scenario, AC.instance_order)
+        Key = namedtuple('Key', ['instance', 'seed'])
+        keys = [Key('p1', 0), Key('p3', 0), Key('p2', 0)]
+        self.assertEqual(
+            [k.instance
+             for k in intensifier._reorder_instance_seed_keys(keys)],
+            ['p2', 'p3', 'p1'])
+        os.remove(AC.trial_store.path)
+
+    def test_irace_races_ordered_instances(self):
+        features = {'p1': [9, 0, 200, 300], 'p2': [1, 0, 2, 3],
+                    'p3': [4, 0, 20, 30]}
+        spaces = IraceSpaces()
+        AC = IraceConfigurator()
+        AC.set_trial_store()
+        AC.set_initial_configs([{'bestfirst': '2'}])
+        AC.set_scenario('lpg', None, spaces, instances=list(features),
+                        instance_features=features,
+                        instance_order='cheapest')
+        self.assertEqual(AC.scenario['instances'], ['p2', 'p3', 'p1'])
+        self.assertFalse(AC.scenario['sampleInstances'])
+        self.assertEqual(spaces.initial_configs, [{'bestfirst': '2'}])
+        AC.set_scenario('lpg', None, spaces, instances=list(features))
+        self.assertTrue(AC.scenario['sampleInstances'])
+
+
+if __name__ == '__main__':
+    unittest.main()
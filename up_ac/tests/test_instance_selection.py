@@ -0,0 +1,108 @@
+"""Test selection of representative training instances."""
+import sys
+import os
+import pickle
+import unittest
+
+import numpy as np
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.configurators import Configurator
+from up_ac.tests.scripted import ScriptedConfigurator
+from up_ac.utils.instance_selection import informative_instances, \
+    k_medoids, representative_subset, screen_instances
+
+gaci = GenericACInterface()
+gaci.read_engine_pcs(['lpg'], f'{path}/engine_pcs')
+
+
+class ScreeningConfigurator(ScriptedConfigurator):
+    """Configurator with scripted runtimes per instance."""
+
+    runtimes = {'easy': [0.01, 0.02, 0.01], 'mixed': [0.5, 20, 3],
+                'hard': [20, 20, 20]}
+
+    def scripted_cost(self, config, instance):
+        return self.runtimes[instance].pop(0)
+
+
+class TestInstanceSelection(unittest.TestCase):
+
+    def test_subset(self):
+        # Three near-duplicates and one outlier in feature space
+        features = {'a': [10, 1], 'b': [10, 1], 'c': [11, 1],
+                    'd': [50, 9]}
+        subset, weights = representative_subset(list(features), features,
+                                                2)
+        self.assertEqual(len(subset), 2)
+        self.assertIn('d', subset)
+        self.assertEqual(weights['d'], 0.25)
+        self.assertAlmostEqual(sum(weights.values()), 1)
+
+    def test_probe_costs_split_duplicates(self):
+        features = {'a': [1], 'b': [1], 'c': [1], 'd': [1]}
+        costs = {'a': 1, 'b': 1, 'c': 1, 'd': 30}
+        subset, weights = representative_subset(list(features), features,
+                                                2, costs)
+        self.assertIn('d', subset)
+        self.assertEqual(sorted(weights.values()), [0.25, 0.75])
+
+    def test_duplicate_features(self):
+        medoids, labels = k_medoids(np.zeros((3, 2)), 2)
+        self.assertEqual(len(medoids), 1)
+        self.assertEqual(list(labels), [0, 0, 0])
+        features = {'a': [1, 2], 'b': [1, 2], 'c': [1, 2], 'd': [5, 0]}
+        subset, weights = representative_subset(list(features), features,
+                                                3)
+        self.assertEqual(len(subset), 2)
+        self.assertEqual(sorted(weights.values()), [0.25, 0.75])
+
+    def test_weighted_training_cost(self):
+        AC = Configurator()
+        AC.instance_weights = {'a': 0.75, 'd': 0.25}
+        # Mean over the subset equals the weighted mean
+        self.assertEqual(AC.training_cost('a', 4), 6)
+        self.assertEqual(AC.training_cost('d', 4), 2)
+        self.assertEqual(AC.training_cost('x', 4), 4)
+        AC.portfolio_costs = {'a': 2}
+        self.assertEqual(AC.training_cost('a', 4), 3)
+
+    def test_screening(self):
+        AC = ScreeningConfigurator()
+        AC.planner_timelimit = 10
+        report = screen_instances(AC, gaci, 'lpg', 'OneshotPlanner',
+                                  ['easy', 'mixed', 'hard'], n_random=2)
+        self.assertEqual({i: e['status'] for i, e in report.items()},
+                         {'easy': 'trivial', 'mixed': 'informative',
+                          'hard': 'hopeless'})
+        self.assertEqual(report['mixed']['runtimes'], [0.5, None, 3])
+        self.assertIn('within 10s', report['hard']['reason'])
+        self.assertEqual(informative_instances(report), ['mixed'])
+
+    def test_screening_keeps_seed(self):
+        AC = ScreeningConfigurator()
+        AC.planner_timelimit = 10
+        AC.runtimes = {'hard': [20, 20, 20]}
+        space = gaci.engine_param_spaces['lpg']
+        space.seed(5)
+        expected = space.sample_configuration()
+        space.seed(5)
+        screen_instances(AC, gaci, 'lpg', 'OneshotPlanner', ['hard'],
+                         n_random=2)
+        # The random state of the shared space is untouched
+        self.assertEqual(space.sample_configuration(), expected)
+
+    def test_configurator_pickles(self):
+        AC = pickle.loads(pickle.dumps(Configurator()))
+        self.assertIsNotNone(AC.reader)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Test instance-specific configuration by feature clustering."""
+import sys
+import os
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.tests.scripted import ScriptedConfigurator
+from up_ac.isac import ISAC
+
+instances = [f'{path}/test_problems/{d}/problem.pddl'
+             for d in ('depot', 'miconic', 'citycar')]
+
+
+class ClusterConfigurator(ScriptedConfigurator):
+    """Configurator returning the first instance of its cluster."""
+
+    def scripted_incumbent(self):
+        return {'first': sorted(self.scenario['instances'])[0],
+                'max_budget': self.scenario['max_budget'],
+                'pid': os.getpid()}
+
+
+class SequentialConfigurator(ClusterConfigurator):
+    parallel_campaigns = False
+
+
+class Spaces():
+    engine_param_spaces = {'lpg': None}
+    joint_engines = {}
+
+    def split_joint_config(self, engine, config):
+        return engine, config
+
+
+class TestISAC(unittest.TestCase):
+
+    def test_clusters(self):
+        features = {'a': [0, 0], 'b': [1, 0], 'c': [100, 50],
+                    'd': [101, 50]}
+        for factory in (ClusterConfigurator, SequentialConfigurator):
+            isac = ISAC(factory, Spaces(), 'lpg', 'runtime',
+                        'OneshotPlanner')
+            incumbents = isac.configure(list(features), features,
+                                        max_budget=5)
+            self.assertEqual(sorted(sorted(c) for c in
+                                    isac.clusters.values()),
+                             [['a', 'b'], ['c', 'd']])
+            firsts = sorted(i['first'] for i in incumbents.values())
+            self.assertEqual(firsts, ['a', 'c'])
+            # Budgets are capped by the size of the cluster
+            self.assertEqual({i['max_budget'] for i in incumbents.values()},
+                             {2})
+            cluster = isac.nearest_cluster([99, 49])
+            self.assertEqual(incumbents[cluster]['first'], 'c')
+            pids = {i['pid'] for i in incumbents.values()}
+            if factory.parallel_campaigns:
+                self.assertNotIn(os.getpid(), pids)
+            else:
+                self.assertEqual(pids, {os.getpid()})
+
+    def test_select(self):
+        gaci = GenericACInterface()
+        gaci.read_engine_pcs(['lpg'], f'{path}/engine_pcs')
+        isac = ISAC(SequentialConfigurator, gaci, 'lpg', 'runtime',
+                    'OneshotPlanner', n_clusters=2)
+        isac.configure(instances)
+        domain = f'{path}/test_problems/citycar/domain.pddl'
+        engine, config = isac.select(domain, instances[2])
+        self.assertEqual(engine, 'lpg')
+        self.assertEqual(config['first'], instances[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
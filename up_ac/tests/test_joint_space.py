@@ -0,0 +1,75 @@
+"""Test joint engine selection and parameter configuration spaces."""
+import sys
+import os
+import json
+import re
+import tempfile
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.configurators import Configurator
+
+gaci = GenericACInterface()
+gaci.read_engine_pcs(['fast-downward', 'lpg', 'tamer'], f'{path}/engine_pcs')
+joint_space = gaci.build_joint_space(['fast-downward', 'lpg'])
+
+
+class TestJointSpace(unittest.TestCase):
+
+    def test_engine_conditions(self):
+        names = joint_space.get_hyperparameter_names()
+        self.assertIn('engine', names)
+        for name in names:
+            # Irace only accepts these parameter names
+            self.assertIsNotNone(re.fullmatch(r'[A-Za-z0-9_]+', name))
+        for config in joint_space.sample_configuration(20):
+            engine = config['engine']
+            prefix = engine.replace('-', '_') + '__'
+            for name in config.get_dictionary():
+                self.assertTrue(name == 'engine' or name.startswith(prefix))
+
+    def test_dispatch(self):
+        default = gaci.engine_param_spaces['lpg'].get_default_configuration()
+        joint_default = {'engine': 'lpg',
+                         **{f'lpg__{n}': v for n, v in default.items()}}
+        self.assertEqual(gaci.split_joint_config('joint', joint_default),
+                         ('lpg', dict(default)))
+        self.assertEqual(gaci.transform_conf_from_ac('joint', joint_default),
+                         gaci.transform_conf_from_ac('lpg', default))
+        config_hash, canonical = gaci.canonicalize('joint', joint_default)
+        self.assertEqual(config_hash, gaci.canonicalize('lpg', default)[0])
+        self.assertEqual(canonical['engine'], 'lpg')
+
+    def test_save_joint_config(self):
+        default = gaci.engine_param_spaces['lpg'].get_default_configuration()
+        joint_default = {'engine': 'lpg',
+                         **{f'lpg__{n}': v for n, v in default.items()}}
+        out_dir = tempfile.mkdtemp()
+        Configurator().save_config(out_dir, joint_default, gaci, 'joint')
+        with open(f'{out_dir}/incumbent_joint.json') as f:
+            saved = json.load(f)
+        self.assertEqual(saved['engine'], 'lpg')
+        self.assertEqual(saved['config'],
+                         json.loads(json.dumps(
+                             gaci.transform_conf_from_ac('lpg', default))))
+
+    def test_capabilities(self):
+        AC = Configurator()
+        self.assertTrue(AC.is_supported(gaci, 'joint', 'quality',
+                                        'OneshotPlanner'))
+        gaci.build_joint_space(['lpg', 'tamer'], name='with_tamer')
+        self.assertFalse(AC.is_supported(gaci, 'with_tamer', 'quality',
+                                         'OneshotPlanner'))
+        self.assertTrue(AC.is_supported(gaci, 'with_tamer', 'runtime',
+                                        'OneshotPlanner'))
+
+
+if __name__ == '__main__':
+    unittest.main()
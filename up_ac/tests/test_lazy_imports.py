@@ -0,0 +1,36 @@
+"""Test lazy loading of backends, engines and feature readers."""
+import sys
+import os
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.utils.import_benchmark import probe_import
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_package_import(self):
+        _, loaded = probe_import('up_ac')
+        self.assertEqual(loaded, [], f'import up_ac loaded {loaded}')
+
+    def test_backend_import(self):
+        _, loaded = probe_import('up_ac.Smac_configurator')
+        self.assertNotIn('smac', loaded)
+        self.assertNotIn('tarski', loaded)
+
+    def test_cached_engines(self):
+        from up_ac.AC_interface import GenericACInterface
+        gaci = GenericACInterface()
+        self.assertIsNone(gaci._treader)
+        engines = gaci.available_engines
+        self.assertIs(engines, GenericACInterface().available_engines)
+
+
+if __name__ == '__main__':
+    unittest.main()
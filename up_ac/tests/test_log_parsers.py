@@ -0,0 +1,89 @@
+"""Test parsing of engine output into records."""
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from unified_planning.engines import PlanGenerationResultStatus
+
+from up_ac.utils.ac_feedback import qaul_feedback, runtime_feedback
+from up_ac.utils.log_parsers import LogField, LogParser, parse_result
+
+fd_output = '''INFO     planner time limit: None
+[t=0.01s, 9876 KB] Solution found!
+[t=0.01s, 9876 KB] Plan length: 12 step(s).
+[t=0.01s, 9876 KB] Plan cost: 14
+[t=0.01s, 9876 KB] Expanded 143 state(s).
+[t=0.01s, 9876 KB] Expanded until last jump: 0 state(s).
+[t=0.01s, 9876 KB] Search time: 0.002s
+[t=0.01s, 9876 KB] Peak memory: 9876 KB
+INFO     Planner time: 0.35s
+'''
+
+enhsp_output = '''Problem Solved
+Plan-Length:6
+Metric (Search):7.0
+Planning Time (msec): 1250
+Heuristic Time (msec): 85
+Search Time (msec): 270
+Expanded Nodes:31
+'''
+
+
+def result(output):
+    return SimpleNamespace(
+        log_messages=[SimpleNamespace(message=output)],
+        status=PlanGenerationResultStatus.SOLVED_SATISFICING)
+
+
+class TestLogParsers(unittest.TestCase):
+
+    def test_fast_downward(self):
+        record = parse_result('fast-downward', result(fd_output))
+        self.assertEqual(record.cost, 14)
+        self.assertEqual(record.search_time, 0.35)
+        self.assertEqual(record.expansions, 143)
+        self.assertEqual(record.memory, 9876)
+        self.assertEqual(record.status, 'SOLVED_SATISFICING')
+        self.assertEqual(qaul_feedback('symk', result(fd_output)), 14)
+        self.assertEqual(runtime_feedback('fast-downward', result(fd_output)),
+                         0.35)
+
+    def test_enhsp(self):
+        record = parse_result('enhsp', result(enhsp_output))
+        self.assertEqual(record.cost, 7.0)
+        self.assertEqual(record.search_time, 1.25)
+        self.assertEqual(record.expansions, 31)
+
+    def test_lpg(self):
+        output = 'Plan quality: 10.000\nDuration: 0.5\n' + \
+            'Plan quality: 8.000\nDuration: 0.75\n'
+        record = parse_result('lpg', result(output))
+        self.assertEqual(record.cost, 8.0)
+        self.assertEqual(record.search_time, 0.75)
+
+    def test_first_occurrence(self):
+        parser = LogParser(
+            cost=LogField('Metric', r'Metric[^:]*:\s*(\S+)', last=False),
+            expansions=LogField('Expanded', r'Nodes:(\d+)', int))
+        record = parser.parse(enhsp_output + '\nMetric (Search):9.0',
+                              ['cost'])
+        self.assertEqual(record.cost, 7.0)
+        self.assertIsNone(record.expansions)
+
+    def test_measured_engines(self):
+        self.assertEqual(runtime_feedback('tamer', result('')), 'measure')
+        record = parse_result('tamer', result(''))
+        self.assertIsNone(record.cost)
+        self.assertEqual(record.as_dict()['status'], 'SOLVED_SATISFICING')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -43,7 +43,7 @@ class TestOatLpgOnQuality(unittest.TestCase):
     OAC.set_scenario(engine[0],
                      ogaci.engine_param_spaces[engine[0]], ogaci,
                      configuration_time=30, n_trials=30,
-                     crash_cost=0, planner_timelimit=15, n_workers=3,
+                     planner_timelimit=15, n_workers=3,
                      instance_features=None, popSize=5, metric=metric,
                      evlaLimit=1)
 
@@ -90,7 +90,7 @@ class TestOatLpgOnRuntime(unittest.TestCase):
     OAC.set_scenario(engine[0],
                      ogaci.engine_param_spaces[engine[0]], ogaci,
                      configuration_time=30, n_trials=30,
-                     crash_cost=0, planner_timelimit=15, n_workers=3,
+                     planner_timelimit=15, n_workers=3,
                      instance_features=None, popSize=5, metric=metric,
                      evlaLimit=1)
 
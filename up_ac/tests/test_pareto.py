@@ -0,0 +1,97 @@
+"""Test runtime and quality configuration with a Pareto front."""
+import sys
+import os
+import tempfile
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.configurators import Configurator
+from up_ac.utils.ac_feedback import record_feedback
+from up_ac.utils.log_parsers import EngineRecord
+from up_ac.utils.pareto import dominates, pareto_front
+
+instances = [f'{path}/test_problems/depot/problem.pddl',
+             f'{path}/test_problems/counters/problem.pddl']
+
+
+class CountingInterface():
+    """AC interface that counts its runs in a file."""
+
+    def __init__(self):
+        self.log = tempfile.mkstemp()[1]
+
+    def run_engine_config(self, config, metric, engine, mode, problem,
+                          **kwargs):
+        with open(self.log, 'a') as f:
+            f.write(f'{metric}\n')
+        return {'runtime': 1.5, 'quality': 7.0}, None
+
+
+class TestPareto(unittest.TestCase):
+
+    def test_front(self):
+        self.assertTrue(dominates((1, 2), (1, 3)))
+        self.assertFalse(dominates((1, 2), (1, 2)))
+        self.assertFalse(dominates((0, 3), (1, 2)))
+        points = [('a', (1, 5)), ('b', (2, 2)), ('c', (3, 3)),
+                  ('d', (2, 2)), ('e', (4, 1))]
+        self.assertEqual([p[0] for p in pareto_front(points)],
+                         ['a', 'b', 'e'])
+
+    def test_joint_feedback(self):
+        record = EngineRecord(cost=7, search_time=1.5)
+        self.assertEqual(record_feedback('lpg', 'runtime_quality', record),
+                         {'runtime': 1.5, 'quality': 7})
+        AC = Configurator()
+        AC.planner_timelimit = 10
+        AC.crash_cost = 100
+        cost = AC.resolve_feedback('lpg', 'runtime_quality',
+                                   {'runtime': 1.5, 'quality': 7}, 0)
+        self.assertEqual(cost, {'runtime': 1.5, 'quality': 7})
+        cost = AC.resolve_feedback('lpg', 'runtime_quality', None, 0)
+        self.assertEqual(cost, {'runtime': 10, 'quality': 100})
+        self.assertEqual(AC.scalarize({'runtime': 5, 'quality': -7}),
+                         0.5 * 0.5 + 0.5 * -7)
+
+    def test_evaluate_one_run_per_instance(self):
+        AC = Configurator()
+        gaci = CountingInterface()
+        performance = AC.evaluate('runtime_quality', 'lpg',
+                                  'OneshotPlanner', {}, gaci,
+                                  planner_timelimit=10, instances=instances)
+        self.assertEqual(performance, {'runtime': 1.5, 'quality': 7.0})
+        with open(gaci.log) as f:
+            self.assertEqual(f.read().split(), ['runtime_quality'] * 2)
+        os.remove(gaci.log)
+
+    def test_front_from_store(self):
+        AC = Configurator()
+        AC.set_trial_store()
+        trial = {'engine': 'lpg', 'metric': 'runtime_quality',
+                 'mode': 'OneshotPlanner', 'timelimit': 10}
+        costs = {'fast': [(1, -2), (1, -4)], 'good': [(5, -9), (7, -9)],
+                 'bad': [(6, -1), (8, -1)], 'raced': [(0, -10)]}
+        for config, runs in costs.items():
+            for i, (runtime, quality) in enumerate(runs):
+                AC.trial_store.record(
+                    config_hash=config, instance=f'p{i}',
+                    cost={'runtime': runtime, 'quality': quality},
+                    config={'name': config}, **trial)
+        self.assertEqual(AC.trial_store.lookup(
+            'lpg', 'runtime_quality', 'OneshotPlanner', 'fast', 'p0', 10),
+            {'runtime': 1, 'quality': -2})
+        front = AC.get_pareto_front('lpg')
+        self.assertEqual(front, [({'name': 'fast'},
+                                  {'runtime': 1, 'quality': -3}),
+                                 ({'name': 'good'},
+                                  {'runtime': 6, 'quality': -9})])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Test plan based quality feedback."""
+import sys
+import os
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from unified_planning.io import PDDLReader
+from unified_planning.model.metrics import MaximizeExpressionOnFinalState
+from unified_planning.plans import ActionInstance, SequentialPlan
+from unified_planning.shortcuts import BoolType, Fluent, IntType, \
+    InstantaneousAction, OneshotPlanner, Problem
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.configurators import Configurator
+from up_ac.utils.plan_metrics import PlanEvaluator
+
+domain = f'{path}/test_problems/depot/domain.pddl'
+instance = f'{path}/test_problems/depot/problem.pddl'
+
+
+class TestPlanMetrics(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.problem = PDDLReader().parse_problem(domain, instance)
+        with OneshotPlanner(name='pyperplan') as planner:
+            cls.plan = planner.solve(cls.problem).plan
+
+    def test_plan_cost(self):
+        evaluator = PlanEvaluator()
+        self.assertEqual(evaluator.plan_cost(self.problem, self.plan),
+                         len(self.plan.actions))
+        self.assertIsNone(evaluator.plan_cost(
+            self.problem, SequentialPlan(self.plan.actions[:-1])))
+        self.assertIsNone(evaluator.plan_cost(self.problem, None))
+
+    def test_simulator_cached(self):
+        evaluator = PlanEvaluator()
+        evaluator.plan_cost(self.problem, self.plan)
+        problem = PDDLReader().parse_problem(domain, instance)
+        simulator = evaluator.get_simulator(problem)
+        self.assertIs(simulator, evaluator.get_simulator(self.problem))
+        self.assertEqual(len(evaluator.simulators), 1)
+
+    def test_maximized_metric(self):
+        score = Fluent('score', IntType(0, 10))
+        done = Fluent('done', BoolType())
+        work = InstantaneousAction('work')
+        work.add_increase_effect(score, 1)
+        finish = InstantaneousAction('finish')
+        finish.add_effect(done, True)
+        problem = Problem('score')
+        problem.add_fluent(score, default_initial_value=0)
+        problem.add_fluent(done, default_initial_value=False)
+        problem.add_actions([work, finish])
+        problem.add_goal(done)
+        problem.add_quality_metric(MaximizeExpressionOnFinalState(score))
+
+        evaluator = PlanEvaluator()
+        AC = Configurator()
+        costs = [AC.resolve_feedback('pyperplan', 'quality',
+                                     evaluator.plan_cost(problem, plan), 0)
+                 for plan in (
+                     SequentialPlan([ActionInstance(work),
+                                     ActionInstance(finish)]),
+                     SequentialPlan([ActionInstance(work),
+                                     ActionInstance(work),
+                                     ActionInstance(finish)]))]
+        # The plan with the higher score costs less
+        self.assertEqual(costs, [-1, -2])
+
+    def test_quality_without_cost_line(self):
+        gaci = GenericACInterface()
+        feedback = gaci.run_engine_config({}, 'quality', 'pyperplan',
+                                          'OneshotPlanner', self.problem)
+        self.assertEqual(feedback, len(self.plan.actions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Test penalization and aggregation of censored runtimes."""
+import sys
+import os
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.configurators import Configurator
+from up_ac.utils.runtime_aggregation import RuntimeAggregation, \
+    impute_censored, quantile
+
+
+class TestRuntimeAggregation(unittest.TestCase):
+
+    def test_statistics(self):
+        costs = [1, 2, 3, 100]
+        self.assertEqual(RuntimeAggregation().aggregate(costs), 26.5)
+        self.assertEqual(RuntimeAggregation(statistic='median')
+                         .aggregate(costs), 2.5)
+        self.assertEqual(quantile(costs, 0.5), 2.5)
+        self.assertEqual(quantile(costs, 1 / 3), 2)
+        with self.assertRaises(ValueError):
+            RuntimeAggregation(statistic='max')
+        with self.assertRaises(ValueError):
+            RuntimeAggregation(par_k=0.5)
+
+    def test_imputation(self):
+        # Rate 2 / (1 + 3 + 10): censored mean is 10 + 7
+        self.assertEqual(impute_censored(10, [1, 3], 1), 17)
+        self.assertEqual(impute_censored(10, [1, 3], 1, cap=15), 15)
+        self.assertIsNone(impute_censored(10, [], 3))
+
+    def test_par_k(self):
+        AC = Configurator()
+        AC.planner_timelimit = 10
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', None, 0), 10)
+        AC.set_runtime_aggregation(par_k=10)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', None, 0), 100)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 12.0, 0), 100)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 2.0, 0), 2.0)
+
+    def test_imputed_timeouts(self):
+        AC = Configurator()
+        AC.planner_timelimit = 10
+        AC.set_runtime_aggregation(par_k=10, impute_censored=True)
+        AC.set_trial_store()
+        trial = {'engine': 'lpg', 'metric': 'runtime',
+                 'mode': 'OneshotPlanner', 'instance': 'p.pddl',
+                 'timelimit': 10}
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', None, 0,
+                                             trial=trial), 100)
+        for config_hash, cost in (('a', 1.0), ('b', 3.0)):
+            AC.record_trial(dict(trial, config_hash=config_hash), cost)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', None, 0,
+                                             trial=trial), 17)
+        os.remove(AC.trial_store.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
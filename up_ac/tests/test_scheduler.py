@@ -0,0 +1,145 @@
+"""Test the local scheduler of planner runs."""
+import sys
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import CancelledError, TimeoutError
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.configurators import Configurator
+from up_ac.utils.scheduler import CoreSlots, TrialScheduler, \
+    run_in_processes
+
+
+def run(seconds, value=None):
+    start = time.time()
+    time.sleep(seconds)
+    return start, time.time(), value
+
+
+class ScriptedInterface():
+    """AC interface with a planner that sleeps."""
+
+    def run_engine_config(self, config, metric, engine, mode, problem,
+                          **kwargs):
+        time.sleep(config['sleep'])
+        return config['sleep'], None
+
+
+def pid_span(seconds):
+    start = time.time()
+    time.sleep(seconds)
+    return os.getpid(), start, time.time()
+
+
+def scheduler(n_workers, n_slots=None):
+    return TrialScheduler(n_workers,
+                          CoreSlots(n_slots or n_workers, tempfile.mkdtemp()))
+
+
+class TestScheduler(unittest.TestCase):
+
+    def test_result_and_timeout(self):
+        pool = scheduler(2)
+        self.assertEqual(pool.submit(run, 0, value=3).result()[2], 3)
+        with self.assertRaises(TimeoutError):
+            pool.submit(run, 5, timeout=0.5).result()
+        pool.shutdown()
+
+    def test_priority(self):
+        pool = scheduler(1)
+        pool.submit(run, 0.5)
+        low = pool.submit(run, 0, priority=0)
+        high = pool.submit(run, 0, priority=1)
+        self.assertLess(high.result()[0], low.result()[0])
+        pool.shutdown()
+
+    def test_fair_share_between_owners(self):
+        pool = scheduler(2)
+        a = [pool.submit(run, 0.3, owner='a') for _ in range(4)]
+        b = pool.submit(run, 0.3, owner='b')
+        # b gets the second core instead of waiting for all runs of a
+        self.assertLess(b.result()[0], a[2].result()[0])
+        pool.shutdown()
+
+    def test_cancel(self):
+        pool = scheduler(1)
+        running = pool.submit(run, 5)
+        queued = pool.submit(run, 0)
+        self.assertTrue(pool.cancel(queued))
+        self.assertTrue(queued.cancelled())
+        time.sleep(0.5)
+        self.assertTrue(pool.cancel(running))
+        with self.assertRaises(CancelledError):
+            running.result(timeout=5)
+        self.assertEqual(pool.pending(), 0)
+        pool.shutdown()
+
+    def test_cancel_while_waiting_for_slot(self):
+        slots = CoreSlots(1, tempfile.mkdtemp())
+        held = slots.acquire()
+        pool = TrialScheduler(1, slots)
+        waiting = pool.submit(run, 0)
+        # The job left the queue and waits for the held slot
+        time.sleep(0.3)
+        self.assertEqual(pool.pending(), 0)
+        self.assertTrue(pool.cancel(waiting))
+        slots.release(held)
+        with self.assertRaises(CancelledError):
+            waiting.result(timeout=5)
+        # The slot is free again
+        self.assertEqual(pool.submit(run, 0, value=1).result()[2], 1)
+        pool.shutdown()
+
+    def test_default_slots_per_user_and_size(self):
+        self.assertNotEqual(CoreSlots(2).directory, CoreSlots(4).directory)
+        self.assertIn(str(os.getuid()), CoreSlots(2).directory)
+
+    def test_slots_shared_between_schedulers(self):
+        slots = CoreSlots(1, tempfile.mkdtemp())
+        pools = [TrialScheduler(2, slots), TrialScheduler(2, slots)]
+        futures = [p.submit(run, 0.2) for p in pools for _ in range(2)]
+        spans = sorted(f.result()[:2] for f in futures)
+        # One slot, so runs never overlap
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            self.assertLessEqual(end, start + 0.01)
+        for p in pools:
+            p.shutdown()
+
+    def test_configurator_runs_on_scheduler(self):
+        pool = scheduler(2)
+        AC = Configurator()
+        AC.planner_timelimit = 1
+        AC.set_scheduler(pool, priority=2)
+        self.assertEqual(AC.run_engine(ScriptedInterface(), {'sleep': 0},
+                                       'runtime', 'lpg', 'OneshotPlanner',
+                                       None), (0, None))
+        # Killed at the time limit
+        self.assertEqual(AC.run_engine(ScriptedInterface(), {'sleep': 5},
+                                       'runtime', 'lpg', 'OneshotPlanner',
+                                       None), (None, None))
+        pool.shutdown()
+
+    def test_run_in_processes(self):
+        finished = []
+        futures = run_in_processes({i: (pid_span, (0.3,)) for i in range(3)},
+                                   n_parallel=2,
+                                   callback=lambda k, f: finished.append(k))
+        results = [futures[i].result() for i in range(3)]
+        # Every call has its own process, at most two run at once
+        self.assertEqual(len({r[0] for r in results}), 3)
+        self.assertNotIn(os.getpid(), {r[0] for r in results})
+        self.assertGreaterEqual(results[2][1], min(results[0][2],
+                                                   results[1][2]) - 0.01)
+        self.assertEqual(sorted(finished), [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
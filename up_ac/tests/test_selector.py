@@ -0,0 +1,73 @@
+"""Test per-instance selection of engine configurations."""
+import sys
+import os
+import tempfile
+import time
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.selector import InstanceSelector
+from up_ac.utils.trial_store import TrialStore
+
+instances = [f'{path}/test_problems/{d}/problem.pddl'
+             for d in ('depot', 'miconic', 'citycar')]
+candidates = [('lpg', {'bestfirst': '1'}), ('fast-downward', {})]
+# lpg is best on depot and miconic, fast-downward on citycar
+matrix = [[1, 2, 9], [5, 6, 1]]
+
+
+def domain_of(instance):
+    return f'{instance.rsplit("/", 1)[0]}/domain.pddl'
+
+
+class TestSelector(unittest.TestCase):
+
+    def test_features_differ(self):
+        gaci = GenericACInterface()
+        features = [gaci.compute_instance_features(domain_of(i), i)
+                    for i in instances]
+        self.assertNotEqual(features[1], features[2])
+        self.assertNotEqual(features[2], [0] * 10)
+
+    def test_select(self):
+        selector = InstanceSelector(GenericACInterface())
+        selector.fit(candidates, matrix, instances)
+        for instance, best in zip(instances, [0, 0, 1]):
+            self.assertEqual(selector.select(domain_of(instance), instance),
+                             candidates[best])
+        with tempfile.TemporaryDirectory() as tmp:
+            selector.save(f'{tmp}/selector.pkl')
+            loaded = InstanceSelector.load(f'{tmp}/selector.pkl',
+                                           GenericACInterface())
+        start = time.perf_counter()
+        choice = loaded.select(domain_of(instances[2]), instances[2])
+        # Features are cached with the model
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(choice, candidates[1])
+
+    def test_fit_from_store(self):
+        store = TrialStore()
+        for (engine, config), row in zip(candidates, matrix):
+            for instance, cost in zip(instances, row):
+                store.record(engine, 'runtime', 'OneshotPlanner',
+                             engine, instance, 10, cost, config=config)
+        store.record('enhsp', 'runtime', 'OneshotPlanner', 'partial',
+                     instances[0], 10, 0, config={})
+        selector = InstanceSelector(GenericACInterface())
+        selector.fit_from_store(store, 'runtime', 'OneshotPlanner',
+                                instances)
+        self.assertEqual(sorted(c[0] for c in selector.candidates),
+                         ['fast-downward', 'lpg'])
+        self.assertEqual(selector.select(domain_of(instances[2]),
+                                         instances[2]), candidates[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
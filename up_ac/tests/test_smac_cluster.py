@@ -0,0 +1,88 @@
+"""Test SMAC campaigns on a dask cluster."""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import cloudpickle
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac import Smac_configurator as smac_module
+from up_ac.Smac_configurator import SmacConfigurator, problem_data, \
+    smac_target, trial_recorder
+from up_ac.Smac_interface import SmacInterface
+from up_ac.utils.trial_store import TrialStore
+
+engine = 'tamer'
+instances = [f'{path}/test_problems/depot/problem.pddl',
+             f'{path}/test_problems/counters/problem.pddl']
+sgaci = SmacInterface()
+sgaci.read_engine_pcs([engine], f'{path}/engine_pcs')
+
+
+def configurator(n_workers):
+    SAC = SmacConfigurator()
+    SAC.set_training_instance_set(instances)
+    SAC.set_scenario(engine, sgaci.engine_param_spaces[engine], sgaci,
+                     configuration_time=30, n_trials=4, planner_timelimit=5,
+                     n_workers=n_workers)
+
+    return SAC
+
+
+class TestSmacCluster(unittest.TestCase):
+
+    def test_problems_in_memory(self):
+        SAC = configurator(1)
+        # The worker sees neither the files of the instance nor the store
+        folder = tempfile.mkdtemp()
+        SAC.set_trial_store(f'{folder}/driver/trials.sqlite')
+        feedback = SAC.get_feedback_function(sgaci, engine, 'runtime',
+                                             'OneshotPlanner')
+        payload = cloudpickle.dumps(feedback)
+        shutil.rmtree(folder)
+        problems = {'/elsewhere/depot/problem.pddl':
+                    problem_data(instances[:1])[instances[0]]}
+        config = sgaci.engine_param_spaces[engine].get_default_configuration()
+        cost, info = smac_target(config, '/elsewhere/depot/problem.pddl',
+                                 data_to_scatter={'feedback': payload,
+                                                  'problems': problems})
+        self.assertLess(cost, 5)
+        # The driver records the trials of the worker
+        [trial] = info['trials']
+        self.assertEqual(trial['instance'], '/elsewhere/depot/problem.pddl')
+        store = TrialStore()
+        trial_recorder(store).on_tell_end(
+            None, None, SimpleNamespace(additional_info=info))
+        self.assertEqual(store.trials()[0]['cost'], cost)
+        # The feedback function is unpickled once per process
+        cached = smac_module._feedback[1]
+        smac_target(config, '/elsewhere/depot/problem.pddl',
+                    data_to_scatter={'feedback': payload,
+                                     'problems': problems})
+        self.assertIs(smac_module._feedback[1], cached)
+
+    def test_local_cluster(self):
+        SAC = configurator(2)
+        self.assertTrue(SAC.parallel_campaigns)
+        feedback = SAC.get_feedback_function(sgaci, engine, 'runtime',
+                                             'OneshotPlanner')
+        incumbent, _ = SAC.optimize(feedback_function=feedback)
+        self.assertIsInstance(incumbent, dict)
+        # Trials ran on the workers and reached the shared trial store
+        trials = SAC.trial_store.connection.execute(
+            'SELECT COUNT(*) FROM trials').fetchone()[0]
+        self.assertGreater(trials, 0)
+        self.assertFalse(os.path.isfile(f'{path}/utils/feedback.pkl'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""Test runtime normalization across machines."""
+import sys
+import os
+import socket
+import unittest
+
+import cloudpickle
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.configurators import Configurator
+from up_ac.Smac_configurator import SmacConfigurator, smac_target
+from up_ac.utils import speed_calibration
+
+gaci = GenericACInterface()
+gaci.read_engine_pcs(['lpg'], f'{path}/engine_pcs')
+
+depot = f'{path}/test_problems/depot/problem.pddl'
+
+
+class SlowConfigurator(Configurator):
+    """Configurator whose engine takes 10 seconds on this machine."""
+
+    def run_engine(self, gaci, config, metric, engine, mode, problem,
+                   timelimit=None):
+        self.timelimits.append(timelimit)
+        return 10, None
+
+
+class SlowSmacConfigurator(SmacConfigurator):
+    """Smac configurator whose engine takes 10 seconds on this machine."""
+
+    run_engine = SlowConfigurator.run_engine
+
+
+class TestSpeedCalibration(unittest.TestCase):
+
+    def setUp(self):
+        # This machine runs the benchmark in twice the reference time
+        speed_calibration._speed_factors[
+            (socket.gethostname(), 0.5, 'tamer')] = 2
+
+    def test_benchmark(self):
+        seconds = speed_calibration.benchmark(repeats=1)
+        self.assertGreater(seconds, 0)
+        factor = speed_calibration.speed_factor(seconds, repeats=1)
+        self.assertGreater(factor, 0)
+        # Benchmarks run once per machine
+        self.assertIs(speed_calibration.speed_factor(seconds), factor)
+
+    def test_normalized_feedback(self):
+        AC = Configurator()
+        AC.planner_timelimit = 30
+        self.assertEqual(AC.speed_factor(), 1)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 10, 0), 10)
+        AC.set_speed_reference(0.5)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 10, 0), 5)
+        # A run of 40 seconds here takes 20 on the reference machine
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 40, 0), 20)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 70, 0), 30)
+        self.assertEqual(AC.resolve_feedback('lpg', 'quality', 10, 0), 10)
+        self.assertEqual(AC.run_timelimit(depot), 60)
+
+    def test_evaluate(self):
+        AC = SlowConfigurator()
+        AC.timelimits = []
+        AC.set_speed_reference(0.5)
+        config = dict(gaci.engine_param_spaces['lpg']
+                      .get_default_configuration())
+        cost = AC.evaluate('runtime', 'lpg', 'OneshotPlanner', config, gaci,
+                           planner_timelimit=8, instances=[depot])
+        self.assertEqual(AC.timelimits, [16])
+        self.assertEqual(cost, 5)
+
+    def test_workers_reuse_factors(self):
+        AC = Configurator()
+        AC.set_speed_reference(0.5)
+        factors = speed_calibration.known_speed_factors()
+        key = (socket.gethostname(), 0.5, 'tamer')
+        self.assertEqual(factors[key], 2)
+        # Trials in fresh processes get the factor of their worker
+        del speed_calibration._speed_factors[key]
+        feedback = cloudpickle.dumps(lambda *args: AC.speed_factor())
+        self.assertEqual(smac_target(None, depot, data_to_scatter={
+            'feedback': feedback, 'problems': {},
+            'speed_factors': factors})[0], 2)
+
+    def test_smac_walltime_headroom(self):
+        AC = SmacConfigurator()
+        AC.set_speed_reference(0.5)
+        AC.set_scenario('lpg', gaci.engine_param_spaces['lpg'], gaci,
+                        instances=[depot], planner_timelimit=5)
+        # Scaled time limit, anytime grace and seconds for parsing
+        self.assertEqual(AC.scenario.trial_walltime_limit, 5 * 2 + 2 + 5)
+
+    def test_smac_runs_capped(self):
+        AC = SlowSmacConfigurator()
+        AC.timelimits = []
+        AC.set_speed_reference(0.5)
+        AC.set_scenario('lpg', gaci.engine_param_spaces['lpg'], gaci,
+                        instances=[depot], planner_timelimit=8)
+        feedback = AC.get_feedback_function(gaci, 'lpg', 'runtime',
+                                            'OneshotPlanner')
+        config = dict(gaci.engine_param_spaces['lpg']
+                      .get_default_configuration())
+        self.assertEqual(feedback(config, depot, 0, AC.reader), 5)
+        # The run is killed at the scaled time limit, not Smac's limit
+        self.assertEqual(AC.timelimits, [16])
+
+if __name__ == '__main__':
+    unittest.main()
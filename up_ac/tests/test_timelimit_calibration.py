@@ -0,0 +1,103 @@
+"""Test calibration of per-instance time limits."""
+import sys
+import os
+import time
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.configurators import Configurator
+from up_ac.Smac_configurator import SmacConfigurator
+from up_ac.tests.scripted import ScriptedConfigurator
+
+gaci = GenericACInterface()
+gaci.read_engine_pcs(['lpg', 'tamer'], f'{path}/engine_pcs')
+
+depot = f'{path}/test_problems/depot/problem.pddl'
+counters = f'{path}/test_problems/counters/problem.pddl'
+
+
+class CappedConfigurator(ScriptedConfigurator):
+    """Configurator with scripted runtimes per instance."""
+
+    runtimes = {'easy': 0.2, 'medium': 4, 'hard': 60, depot: 5,
+                counters: 5}
+
+    def scripted_cost(self, config, instance):
+        runtime = self.runtimes[instance]
+        return runtime if runtime < self.planner_timelimit else \
+            self.timeout_cost(timelimit=self.planner_timelimit)
+
+    def run_engine(self, gaci, config, metric, engine, mode, problem,
+                   timelimit=None):
+        self.runs.append((config, problem.name, timelimit))
+        return self.runtimes[depot], None
+
+
+class TestTimelimitCalibration(unittest.TestCase):
+
+    def test_calibrate(self):
+        AC = CappedConfigurator()
+        timelimits = AC.calibrate_timelimits(
+            gaci, 'lpg', 'OneshotPlanner', ['easy', 'medium', 'hard'],
+            max_timelimit=30, factor=3, min_timelimit=1)
+        self.assertEqual(timelimits, {'easy': 1, 'medium': 12, 'hard': 30})
+        # Default runs use the global maximum
+        self.assertEqual([r[2] for r in AC.runs], [30, 30, 30])
+        self.assertEqual(AC.planner_timelimit, 30)
+        self.assertEqual(AC.timelimit_for('medium'), 12)
+        self.assertEqual(AC.timelimit_for('unknown'), 30)
+        # Caps never exceed the planner time limit of the scenario
+        AC.planner_timelimit = 10
+        self.assertEqual(AC.timelimit_for('medium'), 10)
+
+    def test_timeouts_at_instance_cap(self):
+        AC = Configurator()
+        AC.planner_timelimit = 30
+        AC.set_runtime_aggregation(par_k=10)
+        trial = {'engine': 'lpg', 'metric': 'runtime',
+                 'mode': 'OneshotPlanner', 'config_hash': 'h',
+                 'instance': 'medium', 'timelimit': 12}
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 13, 0,
+                                             trial=trial), 120)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 11, 0,
+                                             trial=trial), 11)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 13, 0), 13)
+
+    def test_evaluate_with_caps(self):
+        AC = CappedConfigurator()
+        config = dict(gaci.engine_param_spaces['lpg']
+                      .get_default_configuration())
+        cost = AC.evaluate('runtime', 'lpg', 'OneshotPlanner', config, gaci,
+                           planner_timelimit=30, instances=[depot, counters],
+                           instance_timelimits={depot: 2})
+        self.assertEqual([r[2] for r in AC.runs], [2, 30])
+        # Runtime of 5 exceeds the cap of 2 on depot
+        self.assertEqual(cost, (2 + 5) / 2)
+
+    def test_smac_runs_capped(self):
+        AC = SmacConfigurator()
+        AC.set_scenario('tamer', gaci.engine_param_spaces['tamer'], gaci,
+                        instances=[depot], planner_timelimit=60)
+        AC.instance_timelimits = {depot: 2}
+        feedback = AC.get_feedback_function(gaci, 'tamer', 'runtime',
+                                            'OneshotPlanner')
+        config = dict(gaci.engine_param_spaces['tamer']
+                      .get_default_configuration())
+        # Tamer with hff does not solve depot within the cap
+        config['heuristic'] = 'hff'
+        start = time.time()
+        cost = feedback(config, depot, 0, AC.reader)
+        # The run is killed at the cap of the instance
+        self.assertLess(time.time() - start, 30)
+        self.assertEqual(cost, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
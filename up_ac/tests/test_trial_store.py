@@ -0,0 +1,153 @@
+"""Test caching of trials by canonical configuration."""
+import sys
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+# make sure test can be run from anywhere
+path = os.getcwd().rsplit('up_ac', 1)[0]
+path += '/up_ac'
+if not os.path.isfile(sys.path[0] + '/configurators.py') and \
+        'up_ac' in sys.path[0]:
+    sys.path.insert(0, sys.path[0].rsplit('up_ac', 1)[0] + '/up_ac')
+
+from up_ac.AC_interface import GenericACInterface
+from up_ac.configurators import Configurator
+
+gaci = GenericACInterface()
+gaci.read_engine_pcs(['tamer'], f'{path}/engine_pcs')
+instance = f'{path}/test_problems/depot/problem.pddl'
+
+
+class TestTrialStore(unittest.TestCase):
+
+    def test_lookup_and_record(self):
+        AC = Configurator()
+        AC.set_trial_store()
+        trial, cost = AC.lookup_trial(gaci, 'tamer', 'runtime',
+                                      'OneshotPlanner',
+                                      {'heuristic': 'hff', 'weight': 0.5},
+                                      instance)
+        self.assertIsNone(cost)
+        AC.record_trial(trial, 1.5)
+        _, cost = AC.lookup_trial(gaci, 'tamer', 'runtime',
+                                  'OneshotPlanner',
+                                  {'heuristic': 'hff', 'weight': '0.5'},
+                                  instance)
+        self.assertEqual(cost, 1.5)
+        trials = AC.trial_store.trials(engine='tamer')
+        self.assertEqual(trials[0]['config'],
+                         {'heuristic': 'hff', 'weight': 0.5})
+        os.remove(AC.trial_store.path)
+
+    def test_settings_in_key(self):
+        AC = Configurator()
+        AC.set_trial_store()
+        config = {'heuristic': 'hff'}
+        trial, _ = AC.lookup_trial(gaci, 'tamer', 'runtime',
+                                   'OneshotPlanner', config, instance)
+        AC.record_trial(trial, 30)
+        # Timeouts cost more with another PAR-k penalty
+        other = Configurator()
+        other.trial_store = AC.trial_store
+        other.set_runtime_aggregation(par_k=10)
+        trial, cost = other.lookup_trial(gaci, 'tamer', 'runtime',
+                                         'OneshotPlanner', config, instance)
+        self.assertIsNone(cost)
+        other.record_trial(trial, 300)
+        _, cost = AC.lookup_trial(gaci, 'tamer', 'runtime',
+                                  'OneshotPlanner', config, instance)
+        self.assertEqual(cost, 30)
+        other.crash_cost = 10
+        _, cost = other.lookup_trial(gaci, 'tamer', 'runtime',
+                                     'OneshotPlanner', config, instance)
+        self.assertIsNone(cost)
+        os.remove(AC.trial_store.path)
+
+    def test_invalid_config_fails_fast(self):
+        AC = Configurator()
+        AC.planner_timelimit = 10
+        trial, cost = AC.lookup_trial(gaci, 'tamer', 'runtime',
+                                      'OneshotPlanner', {'weight': 2.0},
+                                      instance)
+        self.assertIsNone(trial)
+        self.assertEqual(cost, 10)
+        os.remove(AC.trial_store.path)
+
+    def test_store_shared_by_copies(self):
+        AC = Configurator()
+        AC.set_trial_store()
+        trial, _ = AC.lookup_trial(gaci, 'tamer', 'quality',
+                                   'OneshotPlanner', {'heuristic': 'hadd'},
+                                   instance)
+        copy = pickle.loads(pickle.dumps(AC.trial_store))
+        copy.record(cost=-3.0, **trial)
+        self.assertEqual(AC.trial_store.lookup(
+            **{k: v for k, v in trial.items() if k != 'config'}), -3.0)
+        os.remove(AC.trial_store.path)
+
+    def test_temporary_store_removed(self):
+        from up_ac.utils.trial_store import TrialStore
+
+        store = TrialStore()
+        copy = pickle.loads(pickle.dumps(store))
+        # Copies in other processes leave the file alone
+        copy._owner = -1
+        copy.remove()
+        self.assertTrue(os.path.isfile(store.path))
+        store.remove()
+        self.assertFalse(os.path.isfile(store.path))
+
+        kept = TrialStore(f'{store.path}.kept')
+        kept.remove()
+        self.assertTrue(os.path.isfile(kept.path))
+        os.remove(kept.path)
+
+    def test_copy_without_file(self):
+        from up_ac.utils.trial_store import TrialStore
+
+        folder = tempfile.mkdtemp()
+        store = TrialStore(f'{folder}/campaign/trials.sqlite')
+        copy = pickle.loads(pickle.dumps(store))
+        # Workers on other nodes do not see the file of the store
+        shutil.rmtree(folder)
+        copy.record('tamer', 'runtime', 'OneshotPlanner', 'h', instance, 30,
+                    2.0)
+        self.assertEqual(copy.lookup('tamer', 'runtime', 'OneshotPlanner',
+                                     'h', instance, 30), 2.0)
+        shutil.rmtree(folder)
+
+    def test_resolve_feedback(self):
+        AC = Configurator()
+        AC.planner_timelimit = 10
+        AC.crash_cost = 100
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', None, 0), 10)
+        self.assertEqual(AC.resolve_feedback('lpg', 'quality', None, 0), 100)
+        self.assertEqual(AC.resolve_feedback('lpg', 'quality', 4.0, 0), 4.0)
+        self.assertEqual(AC.resolve_feedback('lpg', 'runtime', 2.0, 0), 2.0)
+
+    def test_crash_never_beats_plan(self):
+        AC = Configurator()
+        AC.planner_timelimit = 10
+        crashed = AC.resolve_feedback('lpg', 'quality', None, 0)
+        self.assertGreater(crashed, AC.resolve_feedback('lpg', 'quality',
+                                                        12.0, 0))
+        # Quarantined configurations cost as much as crashes
+        AC.set_trial_store()
+        config = {'heuristic': 'hadd'}
+        config_hash, _ = gaci.canonicalize('tamer', config)
+        AC.trial_store.quarantine('tamer', 'OneshotPlanner', config_hash,
+                                  'bad option')
+        _, cost = AC.lookup_trial(gaci, 'tamer', 'quality',
+                                  'OneshotPlanner', config, instance)
+        self.assertEqual(cost, crashed)
+        cost = AC.resolve_feedback('lpg', 'runtime_quality', None, 0)
+        self.assertGreater(AC.scalarize(cost), AC.scalarize(
+            AC.resolve_feedback('lpg', 'runtime_quality',
+                                {'runtime': 10, 'quality': 500.0}, 0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
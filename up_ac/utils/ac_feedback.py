@@ -1,85 +1,60 @@
 """Functions to transform feedback from engines."""
+from up_ac.utils.log_parsers import parse_result
 
+# Objectives of each metric, 'runtime_quality' scores one run on both
+metric_objectives = {'quality': ('quality',),
+                     'runtime': ('runtime',),
+                     'runtime_quality': ('runtime', 'quality')}
 
-def qaul_feedback(engine, result):
-    """Transform/parse specific solution quality engine output.
+# Quality cost of runs without a plan, worse than any plan cost. Finite,
+# since the models of SMAC and irace need finite costs
+quality_crash_cost = 10 ** 6
 
-    parameter engine: str, name of engine.
-    parameter result: object, planning result.
-    """
-    feedback = None
-    if engine == 'lpg':
-        output = result.log_messages[0].message
-        output = output.split('\n')
-        for line in output:
-            if 'Plan quality' in line:
-                line = line.split(' ')
-                for fb in line:
-                    if '.' in fb:
-                        feedback = float(fb)
 
-    elif engine == 'fast-downward':
-        output = result.log_messages[0].message
-        output = output.split('\n')
-        for line in output:
-            if 'Plan cost' in line:
-                line = line.split(' ')
-                feedback = float(line[5])
-
-    elif engine == 'enhsp':
-        output = result.log_messages[0].message.split('\n')
-        for line in output:
-            if 'Metric' in line:
-                line = line.split(':')
-                feedback = float(line[1])
+def record_feedback(engine, fbtype, record):
+    """Feedback of a specific engine from its parsed output.
+
+    parameter engine: str, name of engine.
+    parameter fbtype: str, 'quality', 'runtime' or 'runtime_quality'.
+    parameter record: EngineRecord, parsed engine output.
 
+    return feedback, dict of feedback by objective for 'runtime_quality'
+    """
+    if len(metric_objectives[fbtype]) > 1:
+        return {m: record_feedback(engine, m, record)
+                for m in metric_objectives[fbtype]}
+    if fbtype == 'quality':
+        return record.cost
     elif engine == 'fmap':
         # TODO
-        feedback = 1.0
+        return 1.0
+    elif engine in ('pyperplan', 'tamer'):
+        # Engines do not report their runtime
+        return 'measure'
 
-    return feedback
+    return record.search_time
 
 
-def runtime_feedback(engine, result):
+def qaul_feedback(engine, result):
     """Transform/parse specific solution quality engine output.
 
     parameter engine: str, name of engine.
     parameter result: object, planning result.
     """
-    feedback = None
-    if engine == 'lpg':
-        output = result.log_messages[0].message
-        output = output.split('\n')
-        for line in output:
-            if 'Duration:' in line:
-                line = line.split(' ')
-                feedback = float(line[-1])
+    record = parse_result(engine, result, ['cost'])
 
-    elif engine == 'fast-downward':
-        output = result.log_messages[0].message
-        output = output.split('\n')
-        for line in output:
-            if 'Planner time:' in line:
-                feedback = float(line.split(' ')[-1][:-1])
-
-    elif engine == 'pyperplan':
-        feedback = 'measure'
+    return record_feedback(engine, 'quality', record)
 
-    elif engine == 'tamer':
-        feedback = 'measure'
 
-    elif engine == 'enhsp':
-        output = result.log_messages[0].message.split('\n')
-        for line in output:
-            if 'Planning Time' in line:
-                line = line.split(':')
-                feedback = (float(line[1])) / 100
+def runtime_feedback(engine, result):
+    """Transform/parse specific runtime engine output.
 
-    elif engine == 'fmap':
-        # TODO -> get output from pyperplan
-        feedback = 1.0
+    parameter engine: str, name of engine.
+    parameter result: object, planning result.
+    """
+    record = parse_result(engine, result, ['search_time'])
 
-    return feedback
+    return record_feedback(engine, 'runtime', record)
 
 
 def gray_box_feedback(engine, result):
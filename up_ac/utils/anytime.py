@@ -0,0 +1,166 @@
+"""Quality over time of anytime planner runs."""
+import multiprocessing
+import timeit
+
+
+class QualityCurve():
+    """Costs of the plans an anytime planner found, by time found.
+
+    Costs are plan costs, lower is better. The curve is a step function
+    of the best cost found so far.
+    """
+
+    def __init__(self, points=None):
+        """Initialize curve.
+
+        parameter points: list, (seconds, cost) pairs in order found.
+        """
+        self.points = [tuple(p) for p in points or []]
+
+    def add(self, time, cost):
+        """Add a plan to the curve.
+
+        parameter time: float, seconds since the start of the run.
+        parameter cost: float, cost of the plan, None if invalid.
+        """
+        if cost is not None:
+            self.points.append((time, cost))
+
+    def best(self):
+        """Cost of the best plan.
+
+        return float or None (None if no plan was found)
+        """
+        if not self.points:
+            return None
+
+        return min(cost for _, cost in self.points)
+
+    def first_solution_time(self):
+        """Time to the first plan.
+
+        return float or None (None if no plan was found)
+        """
+        if not self.points:
+            return None
+
+        return self.points[0][0]
+
+    def quality_at(self, time):
+        """Best cost found until a point in time.
+
+        parameter time: float, seconds since the start of the run.
+
+        return float or None (None if no plan was found until then)
+        """
+        costs = [cost for t, cost in self.points if t <= time]
+        if not costs:
+            return None
+
+        return min(costs)
+
+    def auc(self, horizon, penalty=None):
+        """Area under the best cost over time, divided by the horizon.
+
+        This is the mean best cost over the run, so finding good plans
+        early scores lower than finding them late.
+
+        parameter horizon: float, length of the run in seconds.
+        parameter penalty: float, cost before the first plan, worst
+            plan cost if None.
+
+        return float or None (None if no plan was found)
+        """
+        if not self.points or horizon <= 0:
+            return None
+        if penalty is None:
+            penalty = max(cost for _, cost in self.points)
+        area = 0
+        last_time, best = 0, penalty
+        for time, cost in sorted(self.points):
+            time = min(time, horizon)
+            area += (time - last_time) * best
+            last_time, best = time, min(best, cost)
+        area += (horizon - last_time) * best
+
+        return area / horizon
+
+    def checkpoint_cost(self, checkpoints, penalty=None):
+        """Mean best cost at fixed points in time.
+
+        parameter checkpoints: list, seconds since the start of the run.
+        parameter penalty: float, cost before the first plan, worst
+            plan cost if None.
+
+        return float or None (None if no plan was found)
+        """
+        if not self.points or not checkpoints:
+            return None
+        if penalty is None:
+            penalty = max(cost for _, cost in self.points)
+        costs = []
+        for time in checkpoints:
+            cost = self.quality_at(time)
+            costs.append(penalty if cost is None else cost)
+
+        return sum(costs) / len(costs)
+
+
+class PlanChannel():
+    """Pipe for the plans of a run in a process that may be killed.
+
+    Points are written as soon as a plan is found, so the parent keeps
+    the plans found before a hard timeout.
+    """
+
+    def __init__(self):
+        """Open the channel."""
+        self.queue = multiprocessing.SimpleQueue()
+
+    def put(self, time, cost):
+        """Send a plan.
+
+        parameter time: float, seconds since the start of the run.
+        parameter cost: float, cost of the plan.
+        """
+        self.queue.put((time, cost))
+
+    def drain(self):
+        """Receive all plans sent so far.
+
+        return list of (seconds, cost) pairs
+        """
+        points = []
+        while not self.queue.empty():
+            points.append(self.queue.get())
+
+        return points
+
+
+def collect_solutions(planner, problem, evaluator, timeout=None,
+                      channel=None):
+    """Stream the plans of an anytime planner into a quality curve.
+
+    The planner is stopped at the timeout and reports its last result,
+    so the plans found until then are kept.
+
+    parameter planner: AnytimePlanner engine.
+    parameter problem: up.model.Problem, planning problem.
+    parameter evaluator: PlanEvaluator, computes plan costs.
+    parameter timeout: float, time limit of the run in seconds.
+    parameter channel: PlanChannel, also receives every plan found.
+
+    return PlanGenerationResult (last result or None), QualityCurve
+    """
+    curve = QualityCurve()
+    result = None
+    start = timeit.default_timer()
+    for result in planner.get_solutions(problem, timeout=timeout):
+        if result.plan is not None:
+            time = timeit.default_timer() - start
+            cost = evaluator.plan_cost(problem, result.plan)
+            curve.add(time, cost)
+            if channel is not None and cost is not None:
+                channel.put(time, cost)
+
+    return result, curve
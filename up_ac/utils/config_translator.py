@@ -0,0 +1,398 @@
+"""Compiled translation of configurations to engine parameters."""
+import hashlib
+import json
+import math
+import re
+
+from ConfigSpace.conditions import AndConjunction
+from ConfigSpace.hyperparameters import (
+    CategoricalHyperparameter,
+    UniformFloatHyperparameter,
+    UniformIntegerHyperparameter,
+)
+from unified_planning.exceptions import UPValueError
+
+
+class InvalidConfigurationError(UPValueError):
+    """Configuration does not translate to valid engine options."""
+
+
+# Engines whose parameters are passed to up as strings
+string_engines = ('lpg', 'fast-downward', 'symk', 'pyperplan')
+
+# Fast Downward search option building blocks
+fd_evals = ('eager_greedy', 'eager_wastar', 'lazy_greedy', 'lazy_wastar')
+fd_open_eval = ('epsilon_greedy', 'single')
+fd_open_evals = ('pareto', 'tiebreaking', 'type_based')
+fd_keywords = ('preferred_usage', 'reopen_closed', 'randomize_successors',
+               'pruning', 'cost_type')
+
+_fd_token = re.compile(
+    r'\s*(?:(?P<name>[A-Za-z_][A-Za-z0-9_]*)|'
+    r'(?P<number>-?\d+(?:\.\d+)?(?:[eE]-?\d+)?)|(?P<symbol>[()\[\],=]))')
+
+
+def _tokenize_fd(option):
+    """Split a Fast Downward option string into tokens.
+
+    parameter option: str, search option.
+
+    return list of (kind, token) tuples
+    """
+    tokens = []
+    pos = 0
+    option = option.rstrip()
+    while pos < len(option):
+        match = _fd_token.match(option, pos)
+        if match is None:
+            raise InvalidConfigurationError(
+                f'Unexpected character in search option {option!r} ' +
+                f'at position {pos}')
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        pos = match.end()
+
+    return tokens
+
+
+def check_fd_option(option, search_engines):
+    """Check a Fast Downward search option against its grammar.
+
+    option  := name '(' [arg {',' arg}] ')'
+    arg     := keyword '=' value | value
+    value   := name ['(' [arg {',' arg}] ')'] | number
+               | '[' [value {',' value}] ']'
+
+    parameter option: str, search option.
+    parameter search_engines: collection, allowed search engine names.
+    """
+    tokens = _tokenize_fd(option)
+    pos = 0
+
+    def fail(reason):
+        raise InvalidConfigurationError(
+            f'Invalid search option {option!r}: {reason}')
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else (None, None)
+
+    def expect(symbol):
+        nonlocal pos
+        if peek() != ('symbol', symbol):
+            fail(f'expected {symbol!r} at token {pos}')
+        pos += 1
+
+    def parse_args(keywords=None):
+        nonlocal pos
+        expect('(')
+        if peek() == ('symbol', ')'):
+            pos += 1
+            return
+        while True:
+            kind, token = peek()
+            if kind == 'name' and pos + 1 < len(tokens) and \
+                    tokens[pos + 1] == ('symbol', '='):
+                if keywords is not None and token not in keywords:
+                    fail(f'unknown option {token!r}')
+                pos += 2
+            parse_value()
+            if peek() == ('symbol', ','):
+                pos += 1
+            else:
+                break
+        expect(')')
+
+    def parse_value():
+        nonlocal pos
+        kind, token = peek()
+        if kind == 'name':
+            pos += 1
+            if peek() == ('symbol', '('):
+                parse_args()
+        elif kind == 'number':
+            pos += 1
+        elif (kind, token) == ('symbol', '['):
+            pos += 1
+            if peek() != ('symbol', ']'):
+                parse_value()
+                while peek() == ('symbol', ','):
+                    pos += 1
+                    parse_value()
+            expect(']')
+        else:
+            fail(f'unexpected token {token!r}')
+
+    kind, token = peek()
+    if kind != 'name' or token not in search_engines:
+        fail(f'unknown search engine {token!r}')
+    pos += 1
+    parse_args(fd_keywords)
+    if pos != len(tokens):
+        fail('trailing characters')
+
+
+def fd_search_option(config):
+    """Build the Fast Downward search option of a configuration.
+
+    parameter config: dict, parameter names and string values.
+
+    return str (search option)
+    """
+    args = []
+    evaluator = config.get('evaluator')
+    if evaluator is not None:
+        if evaluator in fd_evals:
+            args.append(f'[{evaluator}()]')
+        else:
+            args.append(f'{evaluator}()')
+
+    open_list = config.get('open')
+    if open_list is not None:
+        if open_list in fd_open_eval or open_list in fd_open_evals:
+            if 'open_list_evals' not in config:
+                raise InvalidConfigurationError(
+                    f'Open list {open_list} needs open_list_evals')
+            if open_list in fd_open_eval:
+                args.append(f'[{open_list}({config["open_list_evals"]})]')
+            else:
+                args.append(
+                    f'[{open_list}([{config["open_list_evals"]}])]')
+        else:
+            args.append(f'[{open_list}()]')
+
+    if evaluator == 'ehc':
+        args.append(f'preferred_usage={config["ehc_preferred_usage"]}')
+
+    for keyword in ('reopen_closed', 'randomize_successors'):
+        if keyword in config:
+            args.append(f'{keyword}={config[keyword]}')
+
+    if 'pruning' in config:
+        args.append(f'pruning={config["pruning"]}()')
+
+    if 'cost_type' in config:
+        args.append(f'cost_type={config["cost_type"]}')
+
+    option = config['fast_downward_search_config'] + \
+        '(' + ','.join(args) + ')'
+
+    return option.replace(' ', '')
+
+
+class ConfigTranslator():
+    """Translate configurator configurations to engine parameters.
+
+    The parameter space of an engine is compiled once into casts,
+    checks and activity conditions per parameter. Configurations are
+    canonicalized by dropping inactive parameters, and translations
+    are memoized by the canonical form, so repeated configurations
+    cost a dictionary lookup.
+    """
+
+    def __init__(self, engine, param_space=None, param_types=None):
+        """Compile the translator of an engine.
+
+        parameter engine: str, name of engine.
+        parameter param_space: ConfigSpace, parameter space of the engine.
+        parameter param_types: dict, lpg flag types by '-' + name.
+        """
+        self.engine = engine
+        self.param_space = param_space
+        self.param_types = param_types or {}
+        self.casts = {}
+        self.checks = {}
+        self.conditions = {}
+        self.order = []
+        self.translations = {}
+
+        if param_space is not None:
+            for param in param_space.get_hyperparameters():
+                self.compile_param(param)
+            self.compile_conditions(param_space)
+
+        if engine in ('fast-downward', 'symk') and param_space is not None:
+            self.search_engines = set(
+                param_space['fast_downward_search_config'].choices)
+        else:
+            self.search_engines = None
+
+    def compile_param(self, param):
+        """Compile cast and range check of a parameter.
+
+        parameter param: ConfigSpace hyperparameter.
+        """
+        name = param.name
+        if isinstance(param, UniformIntegerHyperparameter):
+            # OAT and irace may pass integers as '3' or 3.0
+            cast = lambda v: int(float(v))
+        elif isinstance(param, UniformFloatHyperparameter):
+            cast = float
+        elif isinstance(param, CategoricalHyperparameter) and \
+                isinstance(param.choices[0], int):
+            # Frozen numeric parameter of a reduced pcs
+            cast = lambda v: int(float(v))
+        elif isinstance(param, CategoricalHyperparameter) and \
+                isinstance(param.choices[0], float):
+            cast = float
+        else:
+            cast = str
+        if self.engine in string_engines:
+            self.casts[name] = lambda v, cast=cast: str(cast(v))
+        else:
+            self.casts[name] = cast
+
+        if isinstance(param, CategoricalHyperparameter):
+            choices = {str(c) for c in param.choices}
+            self.checks[name] = lambda v, choices=choices: \
+                str(v) in choices
+        elif isinstance(param, (UniformIntegerHyperparameter,
+                                UniformFloatHyperparameter)):
+            lower, upper = param.lower, param.upper
+            self.checks[name] = lambda v, lower=lower, upper=upper: \
+                lower <= float(v) <= upper
+
+    def compile_conditions(self, param_space):
+        """Compile the activity conditions of a parameter space.
+
+        parameter param_space: ConfigSpace, parameter space of the engine.
+        """
+        # ConfigSpace keeps parents before their children
+        self.order = param_space.get_hyperparameter_names()
+        for condition in param_space.get_conditions():
+            if isinstance(condition, AndConjunction):
+                components = condition.components
+            else:
+                components = [condition]
+            for c in components:
+                if hasattr(c, 'values'):
+                    values = {str(v) for v in c.values}
+                else:
+                    values = {str(c.value)}
+                self.conditions.setdefault(c.child.name, []).append(
+                    (c.parent.name, values))
+
+    def deactivate(self, config):
+        """Drop parameters whose conditions are not met.
+
+        parameter config: dict, cast configuration.
+
+        return dict (configuration with active parameters only)
+        """
+        for name in self.order:
+            if name in config and name in self.conditions:
+                for parent, values in self.conditions[name]:
+                    if parent not in config or \
+                            str(config[parent]) not in values:
+                        del config[name]
+                        break
+
+        return config
+
+    def cast(self, configuration):
+        """Cast and check the active values of a configuration.
+
+        parameter configuration: dict or Configuration.
+
+        return dict (parameter names with cast values)
+        """
+        config = {}
+        for name in configuration.keys():
+            value = configuration[name]
+            if value is None or \
+                    (isinstance(value, float) and math.isnan(value)):
+                # Inactive parameter
+                continue
+            if self.param_space is None:
+                if self.engine in string_engines:
+                    value = str(value)
+                config[name] = value
+                continue
+            if name not in self.casts:
+                raise InvalidConfigurationError(
+                    f'Unknown parameter {name} for {self.engine}')
+            try:
+                value = self.casts[name](value)
+            except ValueError:
+                raise InvalidConfigurationError(
+                    f'Invalid value {value!r} of {name} for {self.engine}')
+            if not self.checks[name](value):
+                raise InvalidConfigurationError(
+                    f'Value {value!r} of {name} out of range ' +
+                    f'for {self.engine}')
+            config[name] = value
+
+        return self.deactivate(config)
+
+    def canonical_key(self, config):
+        """Hashable key of a cast configuration.
+
+        parameter config: dict, cast configuration.
+
+        return tuple
+        """
+        return tuple(sorted(config.items()))
+
+    def translate(self, configuration):
+        """Translate a configuration to engine parameters.
+
+        parameter configuration: dict or Configuration.
+
+        return dict (engine parameters)
+        """
+        config = self.cast(configuration)
+        key = self.canonical_key(config)
+        if key not in self.translations:
+            self.translations[key] = self.build(config)
+
+        return dict(self.translations[key])
+
+    def invocation_hash(self, configuration):
+        """Hash of the engine invocation a configuration produces.
+
+        Configurations that differ only in inactive or ignored values
+        produce the same engine parameters and share their hash.
+
+        parameter configuration: dict or Configuration.
+
+        return str (hex digest)
+        """
+        params = self.translate(configuration)
+        invocation = json.dumps([self.engine, sorted(params.items())])
+
+        return hashlib.sha1(invocation.encode()).hexdigest()
+
+    def build(self, config):
+        """Build and check the engine parameters of a cast configuration.
+
+        parameter config: dict, cast configuration.
+
+        return dict (engine parameters)
+        """
+        if self.engine == 'lpg':
+            params = {}
+            for name, value in config.items():
+                flag = f'-{name}'
+                kind = self.param_types.get(flag)
+                if kind == 'FLAGS':
+                    params[f'{flag}={value}'] = ''
+                elif kind == 'FLAG':
+                    if str(value) == '1':
+                        params[flag] = ''
+                else:
+                    params[flag] = str(value)
+
+        elif self.engine in ('fast-downward', 'symk'):
+            if len(config) in (0, 1):
+                params = {n: str(v) for n, v in config.items()}
+            else:
+                option = fd_search_option(config)
+                if self.search_engines is not None:
+                    check_fd_option(option, self.search_engines)
+                if self.engine == 'fast-downward':
+                    params = {'fast_downward_search_config': option}
+                else:
+                    params = {'symk_search_config': option}
+
+        else:
+            params = dict(config)
+
+        return params
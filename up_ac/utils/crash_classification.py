@@ -0,0 +1,81 @@
+"""Classification of engine crashes into config and instance level."""
+import re
+
+from unified_planning.exceptions import UPException
+
+
+class ConfigurationCrash(UPException):
+    """Engine fails on a configuration regardless of the instance."""
+
+
+# Engine output that reports unusable options rather than a failed search.
+# Parse and input errors count only if they name the command line, since
+# engines report broken PDDL instances with the same words.
+config_error_patterns = [re.compile(p, re.IGNORECASE) for p in (
+    r'usage:',
+    r'unrecognized argument',
+    r'unknown option',
+    r'invalid option',
+    r'invalid argument',
+    r'argument error',
+    r'could not parse (the )?(search|option|argument|configuration|'
+    r'command)',
+    r'parse error.*\b(option|argument|command line)',
+    r'(option|argument)s? parse error',
+    r'input error.*\b(option|argument|plugin|search)',
+    r'unknown plugin',
+    r'missing argument',
+)]
+
+
+def config_error_in_text(text):
+    """Find a report of unusable options in engine output.
+
+    parameter text: str, engine output or error message.
+
+    return str or None (first matching line)
+    """
+    for line in str(text).splitlines():
+        for pattern in config_error_patterns:
+            if pattern.search(line):
+                return line.strip()
+
+    return None
+
+
+def is_config_error(err):
+    """Check if an exception is caused by the configuration.
+
+    parameter err: Exception, error raised while running the engine.
+
+    return bool
+    """
+    from up_ac.utils.config_translator import InvalidConfigurationError
+
+    if isinstance(err, (InvalidConfigurationError, ConfigurationCrash)):
+        return True
+
+    return config_error_in_text(err) is not None
+
+
+def config_error_in_result(result):
+    """Find a report of unusable options in a failed engine result.
+
+    Only internal errors are inspected, since engines that fail on
+    the search itself also print their options.
+
+    parameter result: PlanGenerationResult, result of the engine run.
+
+    return str or None (reason of the crash)
+    """
+    from unified_planning.engines import PlanGenerationResultStatus
+
+    if result is None or \
+            result.status != PlanGenerationResultStatus.INTERNAL_ERROR:
+        return None
+    for message in getattr(result, 'log_messages', None) or []:
+        reason = config_error_in_text(message.message)
+        if reason is not None:
+            return reason
+
+    return None
@@ -0,0 +1,55 @@
+"""Benchmark the import time of up_ac in fresh interpreters."""
+import statistics
+import subprocess
+import sys
+
+# Modules that should only be loaded when they are actually used
+heavy_modules = ['unified_planning.shortcuts', 'ConfigSpace', 'smac',
+                 'dask', 'tarski', 'pandas', 'rpy2', 'irace']
+
+_probe = '''
+import sys
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(' '.join(m for m in {heavy} if m in sys.modules))
+'''
+
+
+def probe_import(module='up_ac'):
+    """Import a module in a fresh interpreter.
+
+    parameter module: str, module to import.
+
+    return float (import time in seconds), list (heavy modules loaded)
+    """
+    out = subprocess.run(
+        [sys.executable, '-c', _probe.format(module=module,
+                                             heavy=heavy_modules)],
+        capture_output=True, text=True, check=True).stdout.split('\n')
+
+    return float(out[0]), out[1].split()
+
+
+def import_time(module='up_ac', repeat=5):
+    """Median import time of a module over fresh interpreters.
+
+    parameter module: str, module to import.
+    parameter repeat: int, number of interpreters to start.
+
+    return float (median import time in seconds)
+    """
+    times = [probe_import(module)[0] for _ in range(repeat)]
+
+    return statistics.median(times)
+
+
+if __name__ == '__main__':
+    modules = sys.argv[1:] or ['up_ac', 'up_ac.Smac_configurator',
+                               'up_ac.Irace_configurator',
+                               'up_ac.OAT_configurator']
+    for module in modules:
+        loaded = probe_import(module)[1]
+        print(f'{module}: {import_time(module):.3f}s, '
+              f'loaded {", ".join(loaded) or "no heavy modules"}')
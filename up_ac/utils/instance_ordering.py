@@ -0,0 +1,129 @@
+"""Ordering of training instances by estimated hardness."""
+
+# Features of compute_instance_features that count predicates, functions,
+# constants and actions
+size_features = 4
+
+
+def observed_runtimes(trial_store, instances, engine=None, mode=None):
+    """Mean runtime cost per instance in a trial store.
+
+    Costs of 'runtime' and of the runtime part of 'runtime_quality'
+    trials count, timeouts with their timeout cost.
+
+    parameter trial_store: TrialStore, store of earlier runs.
+    parameter instances: list, problem instance paths.
+    parameter engine: str, engine name, all engines if None.
+    parameter mode: str, type of planning, all modes if None.
+
+    return dict of instance paths and mean runtimes
+    """
+    filters = {}
+    if engine is not None:
+        filters['engine'] = engine
+    if mode is not None:
+        filters['mode'] = mode
+    runtimes = {}
+    for metric in ('runtime', 'runtime_quality'):
+        for trial in trial_store.trials(metric=metric, **filters):
+            if trial['instance'] not in instances:
+                continue
+            cost = trial['cost']
+            if isinstance(cost, dict):
+                cost = cost['runtime']
+            runtimes.setdefault(trial['instance'], []).append(cost)
+
+    return {i: sum(r) / len(r) for i, r in runtimes.items()}
+
+
+def size_proxy(features):
+    """Hardness guess from the size of an instance.
+
+    parameter features: list, instance features of compute_instance_features.
+
+    return float
+    """
+    import math
+
+    return sum(math.log1p(max(f, 0)) for f in features[:size_features])
+
+
+def estimate_hardness(instances, instance_features=None, trial_store=None,
+                      engine=None, mode=None, seed=0):
+    """Estimate how expensive the instances are to run.
+
+    Instances with runs in the trial store get their mean runtime. A
+    random forest trained on those runs predicts the others from their
+    features. Without runs, the size of the instances is the estimate.
+
+    parameter instances: list, problem instance paths.
+    parameter instance_features: dict, instance paths and lists of features.
+    parameter trial_store: TrialStore, store of earlier runs.
+    parameter engine: str, engine name, all engines if None.
+    parameter mode: str, type of planning, all modes if None.
+    parameter seed: int, seed of the random forest.
+
+    return dict of instance paths and hardness, higher is harder
+    """
+    observed = {}
+    if trial_store is not None:
+        observed = observed_runtimes(trial_store, instances, engine, mode)
+    if instance_features is None:
+        instance_features = {}
+    hardness = dict(observed)
+    missing = [i for i in instances if i not in hardness]
+    with_features = [i for i in missing if i in instance_features]
+    trained = [i for i in observed if i in instance_features]
+    if with_features and len(trained) > 1:
+        from sklearn.ensemble import RandomForestRegressor
+
+        model = RandomForestRegressor(n_estimators=50, random_state=seed)
+        model.fit([instance_features[i] for i in trained],
+                  [observed[i] for i in trained])
+        predicted = model.predict([instance_features[i]
+                                   for i in with_features])
+        hardness.update({i: float(h)
+                         for i, h in zip(with_features, predicted)})
+    elif with_features and not observed:
+        hardness.update({i: size_proxy(instance_features[i])
+                         for i in with_features})
+    # Instances without any estimate are assumed of median hardness
+    known = sorted(hardness.values())
+    default = known[len(known) // 2] if known else 0
+    for instance in instances:
+        hardness.setdefault(instance, default)
+
+    return {i: hardness[i] for i in instances}
+
+
+def order_instances(instances, hardness, strategy='cheapest', n_strata=3):
+    """Order instances for racing and intensification.
+
+    'cheapest' puts the cheapest instances first, so bad configurations
+    are eliminated on cheap runs. 'stratified' splits the instances into
+    n_strata groups of similar hardness and takes the cheapest remaining
+    instance of every group in turn, so the first instances cover the
+    whole range of hardness.
+
+    parameter instances: list, problem instance paths.
+    parameter hardness: dict, instance paths and hardness.
+    parameter strategy: str, 'cheapest' or 'stratified'.
+    parameter n_strata: int, number of groups for 'stratified'.
+
+    return list of instance paths
+    """
+    ranked = sorted(instances, key=lambda i: hardness[i])
+    if strategy == 'cheapest':
+        return ranked
+    elif strategy != 'stratified':
+        raise ValueError(f'Unknown instance order {strategy}.')
+
+    n_strata = max(1, min(n_strata, len(ranked)))
+    bounds = [round(s * len(ranked) / n_strata)
+              for s in range(n_strata + 1)]
+    strata = [ranked[bounds[s]:bounds[s + 1]] for s in range(n_strata)]
+    ordered = []
+    for position in range(max(len(s) for s in strata)):
+        ordered += [s[position] for s in strata if position < len(s)]
+
+    return ordered
@@ -0,0 +1,216 @@
+"""Selection of small, representative training instance sets."""
+
+
+def scale_columns(rows):
+    """Scale every column to [0, 1] by its range.
+
+    parameter rows: list, lists of numbers of equal length.
+
+    return numpy.ndarray
+    """
+    import numpy as np
+
+    X = np.asarray(rows, dtype=float)
+    lower = X.min(axis=0)
+    span = X.max(axis=0) - lower
+    span[span == 0] = 1
+
+    return (X - lower) / span
+
+
+def k_medoids(X, k, max_iter=100):
+    """Cluster points around k of the points.
+
+    Medoids start with the point closest to the mean, followed by the
+    points farthest from the medoids so far. Assignment and medoid update
+    then alternate until the medoids do not change. Duplicate points
+    cannot start clusters of their own, so k is capped at the number of
+    distinct points.
+
+    parameter X: numpy.ndarray, points in rows.
+    parameter k: int, maximum number of medoids.
+    parameter max_iter: int, maximum number of updates.
+
+    return list of medoid row indices, numpy.ndarray of medoid index per point
+    """
+    import numpy as np
+
+    k = min(k, len(np.unique(X, axis=0)))
+    dist = np.linalg.norm(X[:, None, :] - X[None, :, :], axis=2)
+    medoids = [int(np.argmin(np.linalg.norm(X - X.mean(axis=0), axis=1)))]
+    while len(medoids) < k:
+        medoids.append(int(np.argmax(dist[:, medoids].min(axis=1))))
+    for _ in range(max_iter):
+        labels = np.argmin(dist[:, medoids], axis=1)
+        updated = []
+        for c in range(k):
+            members = np.flatnonzero(labels == c)
+            if not len(members):
+                updated.append(medoids[c])
+                continue
+            within = dist[np.ix_(members, members)].sum(axis=1)
+            updated.append(int(members[np.argmin(within)]))
+        if updated == medoids:
+            break
+        medoids = updated
+    labels = np.argmin(dist[:, medoids], axis=1)
+
+    return medoids, labels
+
+
+def probe_costs(ac, gaci, engine, metric, mode, instances, config=None):
+    """Costs of one configuration on the instances, e.g. of the default.
+
+    Runs go through the trial store of the configurator, so campaigns on
+    the same store reuse them.
+
+    parameter ac: Configurator, with the planner time limit set.
+    parameter gaci: ACInterface, AC interface object.
+    parameter engine: str, name of engine.
+    parameter metric: str, 'runtime', 'quality' or 'runtime_quality'.
+    parameter mode: str, type of planning.
+    parameter instances: list, problem instance paths.
+    parameter config: dict, configuration to probe, default if None.
+
+    return dict of instance paths and costs
+    """
+    if config is None:
+        config = \
+            gaci.engine_param_spaces[engine].get_default_configuration()
+    costs = {}
+    for instance in instances:
+        cost = ac.instance_cost(gaci, engine, metric, mode, config, instance)
+        costs[instance] = ac.scalarize(cost)
+
+    return costs
+
+
+def representative_subset(instances, instance_features, k, costs=None,
+                          cost_weight=1.0):
+    """Pick k diverse instances and weight them by what they represent.
+
+    Instances are described by their scaled features and, if given, the
+    scaled cost of probe runs. The medoids of k-medoids clustering are
+    the subset, each weighted by the share of instances in its cluster.
+
+    parameter instances: list, problem instance paths.
+    parameter instance_features: dict, instance paths and lists of features.
+    parameter k: int, size of the subset, smaller if fewer instances
+        differ in their features.
+    parameter costs: dict, instance paths and probe costs.
+    parameter cost_weight: float, weight of the probe cost relative to
+        one feature.
+
+    return list of instance paths, dict of instance paths and weights
+    """
+    import numpy as np
+
+    X = scale_columns([instance_features[i] for i in instances])
+    if costs is not None:
+        probe = scale_columns([[costs[i]] for i in instances])
+        X = np.hstack([X, cost_weight * probe])
+    medoids, labels = k_medoids(X, k)
+    subset = [instances[m] for m in medoids]
+    weights = {instances[m]: float(np.sum(labels == c)) / len(instances)
+               for c, m in enumerate(medoids)}
+
+    return subset, weights
+
+
+def screening_run(ac, gaci, engine, mode, config, instance):
+    """Runtime cost of one screening run, module level for worker processes.
+
+    parameter ac: Configurator, with the planner time limit set.
+    parameter gaci: ACInterface, AC interface object.
+    parameter engine: str, name of engine.
+    parameter mode: str, type of planning.
+    parameter config: dict, configuration to run.
+    parameter instance: str, problem instance path.
+
+    return float
+    """
+    return ac.instance_cost(gaci, engine, 'runtime', mode, config, instance)
+
+
+def screen_instances(ac, gaci, engine, mode, instances, n_random=3,
+                     trivial_time=0.1, n_jobs=1, seed=0):
+    """Classify instances as trivial, informative or hopeless.
+
+    The default and n_random random configurations run on every
+    instance. Instances all of them solve within trivial_time are
+    trivial, instances none of them solves within the planner time limit
+    are hopeless. Neither tells configurations apart.
+
+    parameter ac: Configurator, with the planner time limit set.
+    parameter gaci: ACInterface, AC interface object.
+    parameter engine: str, name of engine.
+    parameter mode: str, type of planning.
+    parameter instances: list, problem instance paths.
+    parameter n_random: int, number of random configurations.
+    parameter trivial_time: float, seconds below which a run is trivial.
+    parameter n_jobs: int, number of runs in parallel processes.
+    parameter seed: int, seed of the random configurations.
+
+    return dict of instance paths and dicts with 'status', 'reason' and
+        'runtimes' (None for unsolved runs)
+    """
+    import copy
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Seed a copy, the space of gaci is shared with the configurators
+    param_space = copy.deepcopy(gaci.engine_param_spaces[engine])
+    param_space.seed(seed)
+    configs = [param_space.get_default_configuration()]
+    if n_random > 0:
+        sampled = param_space.sample_configuration(n_random)
+        configs += sampled if n_random > 1 else [sampled]
+    configs = [dict(c) for c in configs]
+    runs = [(config, instance) for instance in instances
+            for config in configs]
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(screening_run, ac, gaci, engine, mode,
+                                   config, instance)
+                       for config, instance in runs]
+            costs = [f.result() for f in futures]
+    else:
+        costs = [screening_run(ac, gaci, engine, mode, config, instance)
+                 for config, instance in runs]
+
+    report = {instance: {'runtimes': []} for instance in instances}
+    for (_, instance), cost in zip(runs, costs):
+        solved = cost < ac.planner_timelimit
+        report[instance]['runtimes'].append(cost if solved else None)
+    for instance, entry in report.items():
+        solved = [r for r in entry['runtimes'] if r is not None]
+        if not solved:
+            entry['status'] = 'hopeless'
+            entry['reason'] = f'none of {len(configs)} configurations ' + \
+                f'solved it within {ac.planner_timelimit}s'
+        elif len(solved) == len(configs) and max(solved) < trivial_time:
+            entry['status'] = 'trivial'
+            entry['reason'] = f'all {len(configs)} configurations ' + \
+                f'solved it within {max(solved):.3f}s'
+        else:
+            entry['status'] = 'informative'
+            entry['reason'] = f'{len(solved)} of {len(configs)} ' + \
+                f'configurations solved it in {min(solved):.3f}s to ' + \
+                f'{max(solved):.3f}s'
+
+    return report
+
+
+def informative_instances(report):
+    """Instances to configure on after screening.
+
+    parameter report: dict, result of screen_instances.
+
+    return list of instance paths
+    """
+    for instance, entry in report.items():
+        if entry['status'] != 'informative':
+            print(f'Excluding {instance}: {entry["status"]}, ' +
+                  f'{entry["reason"]}')
+
+    return [i for i, entry in report.items()
+            if entry['status'] == 'informative']
@@ -0,0 +1,205 @@
+"""Parsers for the output of planning engines."""
+import re
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+_float = r'([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)'
+
+
+@dataclass
+class EngineRecord():
+    """Fields an engine reports about a run.
+
+    cost: plan cost or quality, search_time: seconds the engine reports
+    for solving, expansions: expanded states, memory: peak memory in KB,
+    status: name of the plan generation status, curve: (seconds, cost)
+    pairs of the plans an anytime planner found.
+    """
+
+    cost: Optional[float] = None
+    search_time: Optional[float] = None
+    expansions: Optional[int] = None
+    memory: Optional[float] = None
+    status: Optional[str] = None
+    curve: Optional[list] = None
+
+    def as_dict(self):
+        """Record as dict, e.g. for the trial store.
+
+        return dict
+        """
+        return asdict(self)
+
+
+class LogField():
+    """Field of an engine log, located by a literal anchor."""
+
+    def __init__(self, anchor, pattern, cast=float, last=True):
+        """Compile a log field.
+
+        parameter anchor: str, literal text on the lines of the field.
+        parameter pattern: str, regex with one group capturing the value.
+        parameter cast: function, cast of the captured value.
+        parameter last: bool, use the last occurrence, else the first.
+        """
+        self.anchor = anchor
+        self.pattern = re.compile(pattern)
+        self.cast = cast
+        self.last = last
+
+    def match(self, line):
+        """Value of the field on a line.
+
+        parameter line: str, line of engine output.
+
+        return value or None
+        """
+        if self.anchor not in line:
+            return None
+        match = self.pattern.search(line)
+        if match is None:
+            return None
+        try:
+            return self.cast(match.group(1))
+        except ValueError:
+            return None
+
+    def search(self, text):
+        """Value of the field in a complete output.
+
+        Jumps between anchors instead of splitting the output into
+        lines, searching backwards if the last occurrence counts.
+
+        parameter text: str, engine output.
+
+        return value or None
+        """
+        if self.last:
+            end = len(text)
+            while True:
+                pos = text.rfind(self.anchor, 0, end)
+                if pos < 0:
+                    return None
+                value = self.match(_line_at(text, pos))
+                if value is not None:
+                    return value
+                end = pos
+        else:
+            start = 0
+            while True:
+                pos = text.find(self.anchor, start)
+                if pos < 0:
+                    return None
+                value = self.match(_line_at(text, pos))
+                if value is not None:
+                    return value
+                start = pos + len(self.anchor)
+
+
+def _line_at(text, pos):
+    """Line of a text that contains a position.
+
+    parameter text: str, text to search.
+    parameter pos: int, position in the text.
+
+    return str
+    """
+    start = text.rfind('\n', 0, pos) + 1
+    end = text.find('\n', pos)
+    if end < 0:
+        end = len(text)
+
+    return text[start:end]
+
+
+class LogParser():
+    """Parser of the output of an engine."""
+
+    def __init__(self, **fields):
+        """Collect the fields of an engine log.
+
+        parameter fields: LogField per EngineRecord field name.
+        """
+        self.fields = fields
+
+    def requested(self, fields=None):
+        """Fields to parse.
+
+        parameter fields: list, names of EngineRecord fields, all if None.
+
+        return dict
+        """
+        if fields is None:
+            return self.fields
+
+        return {n: f for n, f in self.fields.items() if n in fields}
+
+    def parse(self, text, fields=None):
+        """Parse a complete engine output.
+
+        parameter text: str, engine output.
+        parameter fields: list, names of EngineRecord fields, all if None.
+
+        return EngineRecord
+        """
+        values = {}
+        for name, field in self.requested(fields).items():
+            values[name] = field.search(text)
+
+        return EngineRecord(**values)
+
+
+# Parsers by engine name
+log_parsers = {}
+
+
+def register_parser(engine, parser):
+    """Register the log parser of an engine.
+
+    parameter engine: str, name of engine.
+    parameter parser: LogParser, parser of the engine output.
+    """
+    log_parsers[engine] = parser
+
+
+def parse_result(engine, result, fields=None):
+    """Parse the output of an engine run.
+
+    parameter engine: str, name of engine.
+    parameter result: object, planning result.
+    parameter fields: list, names of EngineRecord fields, all if None.
+
+    return EngineRecord
+    """
+    parser = log_parsers.get(engine)
+    log_messages = getattr(result, 'log_messages', None)
+    if parser is not None and log_messages:
+        record = parser.parse(log_messages[0].message, fields)
+    else:
+        record = EngineRecord()
+    status = getattr(result, 'status', None)
+    if status is not None:
+        record.status = status.name
+
+    return record
+
+
+register_parser('lpg', LogParser(
+    cost=LogField('Plan quality', r'.*(?<![\w.])(-?\d*\.\d+)'),
+    search_time=LogField('Duration:', _float + r'\s*$')))
+
+_fast_downward = LogParser(
+    cost=LogField('Plan cost:', r'Plan cost: ' + _float),
+    search_time=LogField('Planner time:', r'Planner time: ' + _float + 's'),
+    expansions=LogField('Expanded ', r'Expanded (\d+) state', int),
+    memory=LogField('Peak memory:', r'Peak memory: (\d+) KB'))
+register_parser('fast-downward', _fast_downward)
+register_parser('symk', _fast_downward)
+
+# ENHSP reports milliseconds
+register_parser('enhsp', LogParser(
+    cost=LogField('Metric', r'Metric[^:]*:\s*' + _float),
+    search_time=LogField('Planning Time', r'Planning Time[^:]*:\s*' + _float,
+                         lambda v: float(v) / 1000),
+    expansions=LogField('Expanded Nodes', r'Expanded Nodes[^:]*:\s*(\d+)',
+                        int)))
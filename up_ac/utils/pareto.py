@@ -0,0 +1,29 @@
+"""Pareto fronts of configurations with several costs."""
+
+
+def dominates(costs_a, costs_b):
+    """Check if costs a Pareto dominate costs b.
+
+    parameter costs_a: tuple, costs to minimize.
+    parameter costs_b: tuple, costs to minimize.
+
+    return bool
+    """
+    return all(a <= b for a, b in zip(costs_a, costs_b)) and \
+        any(a < b for a, b in zip(costs_a, costs_b))
+
+
+def pareto_front(points):
+    """Points no other point dominates.
+
+    parameter points: list, (item, costs) pairs, costs are tuples.
+
+    return list of (item, costs) pairs, sorted by the first cost
+    """
+    front = []
+    for item, costs in sorted(points, key=lambda p: tuple(p[1])):
+        if not any(dominates(c, costs) or tuple(c) == tuple(costs)
+                   for _, c in front):
+            front.append((item, costs))
+
+    return front
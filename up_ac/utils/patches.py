@@ -112,14 +112,20 @@ def patch_pcs(pcs):
                 paramtype = "int" if "i" in il else "float"
                 log = "l" in il
                 default_value = float(param_list[7])  # type: ignore
-                param = create[paramtype](
-                    name=name,
-                    lower=lower,
-                    upper=upper,
-                    q=None,
-                    log=log,
-                    default_value=default_value,
-                )
+                if lower == upper:
+                    # Frozen numeric parameter, see write_reduced_pcs
+                    value = int(lower) if paramtype == "int" else lower
+                    param = create["categorical"](
+                        name=name, choices=[value], default_value=value)
+                else:
+                    param = create[paramtype](
+                        name=name,
+                        lower=lower,
+                        upper=upper,
+                        q=None,
+                        log=log,
+                        default_value=default_value,
+                    )
                 cont_ct += 1
             except pyparsing.ParseException:
                 pass
@@ -0,0 +1,143 @@
+"""Plan quality computed from returned plans."""
+import warnings
+from collections import OrderedDict
+
+
+class PlanEvaluator():
+    """Evaluate plan cost with the simulator of UP's plan validator.
+
+    Grounding the simulator dominates validation, so simulators are
+    cached per problem. Problems compare structurally, so a problem
+    parsed again from the same files reuses the simulator.
+    """
+
+    def __init__(self, cache_size=32):
+        """Initialize the simulator cache.
+
+        parameter cache_size: int, number of problems to keep simulators of.
+        """
+        self.cache_size = cache_size
+        self.simulators = OrderedDict()
+
+    def get_simulator(self, problem):
+        """Cached sequential simulator of a problem.
+
+        parameter problem: up.model.Problem, planning problem.
+
+        return UPSequentialSimulator
+        """
+        from unified_planning.engines.sequential_simulator import \
+            UPSequentialSimulator
+
+        if problem in self.simulators:
+            self.simulators.move_to_end(problem)
+        else:
+            with warnings.catch_warnings(record=True):
+                self.simulators[problem] = \
+                    UPSequentialSimulator(problem,
+                                          error_on_failed_checks=False)
+            if len(self.simulators) > self.cache_size:
+                self.simulators.popitem(last=False)
+
+        return self.simulators[problem]
+
+    def plan_cost(self, problem, plan):
+        """Cost of a plan, lower is better.
+
+        The cost is the value of the quality metric of the problem,
+        negated for maximized metrics. Without a metric it is the plan
+        length of sequential plans and the makespan of temporal plans.
+        It is the quality feedback configurators minimize unchanged.
+
+        parameter problem: up.model.Problem, planning problem.
+        parameter plan: up.plans.Plan, plan returned by the engine.
+
+        return float or None (None if the plan is invalid)
+        """
+        from unified_planning.plans import SequentialPlan, TimeTriggeredPlan
+
+        if plan is None:
+            return None
+        metric = None
+        if len(problem.quality_metrics) == 1:
+            metric = problem.quality_metrics[0]
+        if isinstance(plan, SequentialPlan):
+            value = self.sequential_metric(problem, plan, metric)
+        elif isinstance(plan, TimeTriggeredPlan):
+            value = self.validated_metric(problem, plan, metric)
+        else:
+            return None
+        if value is None:
+            return None
+        if metric is not None and \
+                (metric.is_maximize_expression_on_final_state() or
+                 metric.is_oversubscription() or
+                 metric.is_temporal_oversubscription()):
+            value = -value
+
+        return float(value)
+
+    def sequential_metric(self, problem, plan, metric):
+        """Simulate a sequential plan and evaluate its metric.
+
+        parameter problem: up.model.Problem, planning problem.
+        parameter plan: up.plans.SequentialPlan, plan to evaluate.
+        parameter metric: PlanQualityMetric or None.
+
+        return number or None (None if the plan is invalid)
+        """
+        from unified_planning.engines.sequential_simulator import (
+            evaluate_quality_metric,
+            evaluate_quality_metric_in_initial_state,
+        )
+        from unified_planning.exceptions import UPException
+
+        if metric is None or metric.is_minimize_sequential_plan_length():
+            value = len(plan.actions)
+            metric = None
+        simulator = self.get_simulator(problem)
+        state = simulator.get_initial_state()
+        if metric is not None:
+            value = evaluate_quality_metric_in_initial_state(simulator,
+                                                             metric)
+        for ai in plan.actions:
+            try:
+                next_state = simulator.apply(state, ai)
+            except UPException:
+                # Action instance does not fit the problem
+                return None
+            if next_state is None:
+                return None
+            if metric is not None:
+                value = evaluate_quality_metric(
+                    simulator, metric, value, state, ai.action,
+                    ai.actual_parameters, next_state)
+            state = next_state
+        if not simulator.is_goal(state):
+            return None
+
+        return value
+
+    def validated_metric(self, problem, plan, metric):
+        """Validate a temporal plan and evaluate its metric.
+
+        parameter problem: up.model.Problem, planning problem.
+        parameter plan: up.plans.TimeTriggeredPlan, plan to evaluate.
+        parameter metric: PlanQualityMetric or None.
+
+        return number or None (None if the plan is invalid)
+        """
+        from unified_planning.shortcuts import PlanValidator
+
+        with PlanValidator(problem_kind=problem.kind,
+                           plan_kind=plan.kind) as validator:
+            result = validator.validate(problem, plan)
+        if not result.status:
+            return None
+        if metric is not None and result.metric_evaluations:
+            return result.metric_evaluations[metric]
+
+        # Makespan of the plan
+        return max((start + (duration or 0)
+                    for start, _, duration in plan.timed_actions),
+                   default=0)
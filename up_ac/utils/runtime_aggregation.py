@@ -0,0 +1,111 @@
+"""Penalization and aggregation of censored runtimes."""
+import math
+import statistics
+
+
+def quantile(values, q):
+    """Quantile of values with linear interpolation.
+
+    parameter values: list, numbers.
+    parameter q: float, quantile in [0, 1].
+
+    return float
+    """
+    values = sorted(values)
+    pos = (len(values) - 1) * q
+    lower = math.floor(pos)
+    upper = math.ceil(pos)
+
+    return values[lower] + (values[upper] - values[lower]) * (pos - lower)
+
+
+def impute_censored(timelimit, observed, n_censored, cap=None):
+    """Expected runtime of a run censored at the time limit.
+
+    Runtimes on an instance are modelled as exponential, with the rate
+    estimated from solved and censored runs. By memorylessness the
+    expected runtime of a censored run is the time limit plus the mean.
+
+    parameter timelimit: float, time limit the run was censored at.
+    parameter observed: list, runtimes of solved runs on the instance.
+    parameter n_censored: int, number of censored runs on the instance.
+    parameter cap: float, largest value to impute.
+
+    return float or None (None if no run was solved yet)
+    """
+    if not observed:
+        return cap
+    exposure = sum(observed) + n_censored * timelimit
+    mean = exposure / len(observed)
+    imputed = timelimit + mean
+    if cap is not None:
+        imputed = min(imputed, cap)
+
+    return imputed
+
+
+class RuntimeAggregation():
+    """Costs of timed out runs and aggregation of runtimes."""
+
+    def __init__(self, par_k=1, statistic='mean', impute=False):
+        """Initialize runtime aggregation.
+
+        parameter par_k: float, timeouts cost par_k times the time limit.
+        parameter statistic: str or float, 'mean', 'median' or a
+            quantile in (0, 1) to aggregate runtimes over instances.
+        parameter impute: bool, impute censored runtimes from the solved
+            runs on the same instance.
+        """
+        if par_k < 1:
+            raise ValueError('PAR-k penalty needs k >= 1.')
+        if statistic not in ('mean', 'median') and \
+                not (isinstance(statistic, float) and 0 < statistic < 1):
+            raise ValueError(f'Runtime statistic {statistic} is not ' +
+                             'supported.')
+        self.par_k = par_k
+        self.statistic = statistic
+        self.impute = impute
+
+    def timeout_cost(self, timelimit):
+        """PAR-k cost of a timed out run.
+
+        parameter timelimit: float, time limit of the run.
+
+        return float
+        """
+        return self.par_k * timelimit
+
+    def censored_cost(self, timelimit, observed=(), n_censored=0):
+        """Cost of a timed out run.
+
+        parameter timelimit: float, time limit of the run.
+        parameter observed: list, runtimes of solved runs on the instance.
+        parameter n_censored: int, number of censored runs on the instance.
+
+        return float
+        """
+        cost = self.timeout_cost(timelimit)
+        if self.impute:
+            cap = cost if self.par_k > 1 else None
+            imputed = impute_censored(timelimit, list(observed),
+                                      n_censored + 1, cap)
+            if imputed is not None:
+                cost = imputed
+
+        return cost
+
+    def aggregate(self, costs):
+        """Aggregate runtimes over instances.
+
+        parameter costs: list, runtimes with timeouts penalized.
+
+        return float or None (None if there are no costs)
+        """
+        if not costs:
+            return None
+        if self.statistic == 'mean':
+            return statistics.mean(costs)
+        elif self.statistic == 'median':
+            return statistics.median(costs)
+
+        return quantile(costs, self.statistic)
@@ -0,0 +1,304 @@
+"""Local execution of planner runs on a shared pool of cores."""
+import fcntl
+import itertools
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, CancelledError
+
+
+def run_in_processes(calls, n_parallel=None, callback=None):
+    """Run calls at once, each in a new spawned process.
+
+    Every call gets its own single worker executor, so no process runs two
+    calls and configurator backends start from a clean state.
+
+    parameter calls: dict, keys and (function, args) tuples, functions at
+        module level.
+    parameter n_parallel: int, calls at once, all if None.
+    parameter callback: function, called with the key and future of every
+        call when it finishes.
+
+    return dict of keys and finished concurrent.futures.Future
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, \
+        wait
+
+    if n_parallel is None:
+        n_parallel = len(calls)
+    context = multiprocessing.get_context('spawn')
+    pending = list(calls.items())
+    running = {}
+    futures = {}
+    while pending or running:
+        while pending and len(running) < n_parallel:
+            key, (fn, args) = pending.pop(0)
+            executor = ProcessPoolExecutor(max_workers=1, mp_context=context)
+            futures[key] = executor.submit(fn, *args)
+            running[futures[key]] = (key, executor)
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            key, executor = running.pop(future)
+            executor.shutdown()
+            if callback is not None:
+                callback(key, future)
+
+    return futures
+
+
+class CoreSlots():
+    """Cores of the machine as lock files shared by all processes.
+
+    Every running job holds the lock of one slot file, so schedulers in
+    different processes, e.g. of parallel campaigns or of the forked
+    workers of a configurator, never run more jobs than there are slots.
+    Locks of killed processes are released by the operating system.
+    """
+
+    def __init__(self, n_slots=None, directory=None):
+        """Open the slots.
+
+        parameter n_slots: int, number of cores to share, all if None.
+        parameter directory: str, folder of the lock files, shared by all
+            processes using the same slots. One folder per user and
+            number of slots if None.
+        """
+        if n_slots is None:
+            n_slots = os.cpu_count()
+        if directory is None:
+            # Slot counts of other users or pools do not mix
+            directory = os.path.join(tempfile.gettempdir(),
+                                     f'up_ac_slots_{os.getuid()}_{n_slots}')
+        os.makedirs(directory, exist_ok=True)
+        self.n_slots = n_slots
+        self.directory = directory
+
+    def acquire(self, poll=0.05):
+        """Wait for a free slot and hold it.
+
+        parameter poll: float, seconds between attempts.
+
+        return file handle of the slot, to release
+        """
+        while True:
+            for slot in range(self.n_slots):
+                handle = open(os.path.join(self.directory, f'{slot}.lock'),
+                              'a')
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return handle
+                except BlockingIOError:
+                    handle.close()
+            time.sleep(poll)
+
+    def release(self, handle):
+        """Free a slot.
+
+        parameter handle: file handle from acquire.
+        """
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+
+
+class Job():
+    """Planner run waiting in or running on a TrialScheduler."""
+
+    def __init__(self, seq, fn, args, kwargs, priority, timeout, owner):
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.timeout = timeout
+        self.owner = owner
+        self.future = Future()
+        self.process = None
+        # Cancelled after leaving the queue, before its process started
+        self.cancelled = False
+
+
+class TrialScheduler():
+    """Queue of planner runs executed in processes on shared cores.
+
+    Jobs with a higher priority start first. Among jobs of equal
+    priority, the owner with the fewest running jobs goes first, so
+    campaigns sharing the scheduler get the cores in turn. Every job runs
+    in its own process, which is killed at the job's timeout or when the
+    job is cancelled.
+    """
+
+    def __init__(self, n_workers=None, slots=None):
+        """Set up the scheduler.
+
+        parameter n_workers: int, jobs of this scheduler at once, all cores
+            if None.
+        parameter slots: CoreSlots, cores shared with other schedulers,
+            all cores of the machine if None.
+        """
+        if n_workers is None:
+            n_workers = os.cpu_count()
+        if slots is None:
+            slots = CoreSlots()
+        self.n_workers = n_workers
+        self.slots = slots
+        self._pid = None
+
+    def __getstate__(self):
+        # Queue and dispatcher are per process, slots are shared
+        return {'n_workers': self.n_workers, 'slots': self.slots,
+                '_pid': None}
+
+    def _start(self):
+        """Start the dispatcher in this process."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._condition = threading.Condition()
+        self._queue = []
+        self._jobs = {}
+        self._running = {}
+        self._counter = itertools.count()
+        self._stopped = False
+        self._dispatcher = threading.Thread(target=self._dispatch,
+                                            daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, fn, *args, priority=0, timeout=None, owner=None,
+               **kwargs):
+        """Queue a job.
+
+        parameter fn: callable, function to run in a separate process.
+        parameter priority: int, jobs with higher priority start first.
+        parameter timeout: float, seconds after which the job is killed,
+            its future raises concurrent.futures.TimeoutError.
+        parameter owner: hashable, campaign the job belongs to.
+
+        return concurrent.futures.Future
+        """
+        self._start()
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError('Scheduler is shut down.')
+            job = Job(next(self._counter), fn, args, kwargs, priority,
+                      timeout, owner)
+            self._queue.append(job)
+            self._jobs[job.future] = job
+            self._condition.notify_all()
+
+        return job.future
+
+    def cancel(self, future):
+        """Cancel a queued or running job.
+
+        parameter future: concurrent.futures.Future, returned by submit.
+
+        return bool (False if the job is already done)
+        """
+        with self._condition:
+            job = self._jobs.get(future)
+            if job is None:
+                return False
+            if job in self._queue:
+                self._queue.remove(job)
+                del self._jobs[future]
+                return future.cancel()
+            process = job.process
+            if process is None:
+                # The dispatcher waits for a slot and will not start it
+                job.cancelled = True
+                return True
+
+        # The process is killed and the future raises CancelledError
+        return process.cancel()
+
+    def pending(self):
+        """Number of queued jobs.
+
+        return int
+        """
+        if self._pid != os.getpid():
+            return 0
+        with self._condition:
+            return len(self._queue)
+
+    def shutdown(self, cancel=True):
+        """Stop the scheduler.
+
+        parameter cancel: bool, cancel queued and running jobs.
+        """
+        if self._pid != os.getpid():
+            return
+        with self._condition:
+            self._stopped = True
+            futures = list(self._jobs)
+            self._condition.notify_all()
+        if cancel:
+            for future in futures:
+                self.cancel(future)
+
+    def _next_job(self):
+        """Take the next job to start from the queue.
+
+        return Job
+        """
+        top = max(job.priority for job in self._queue)
+        job = min((j for j in self._queue if j.priority == top),
+                  key=lambda j: (self._running.get(j.owner, 0), j.seq))
+        self._queue.remove(job)
+
+        return job
+
+    def _dispatch(self):
+        """Start queued jobs while workers and slots are free."""
+        from pebble import concurrent
+
+        while True:
+            with self._condition:
+                while not self._stopped and (
+                        not self._queue or
+                        sum(self._running.values()) >= self.n_workers):
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                job = self._next_job()
+                if not job.future.set_running_or_notify_cancel():
+                    del self._jobs[job.future]
+                    continue
+                self._running[job.owner] = \
+                    self._running.get(job.owner, 0) + 1
+            handle = self.slots.acquire()
+            with self._condition:
+                error = CancelledError() if job.cancelled else None
+                if error is None:
+                    try:
+                        # Jobs are local functions, which only fork can run
+                        job.process = concurrent.process(
+                            timeout=job.timeout,
+                            context=multiprocessing.get_context('fork'))(
+                                job.fn)(*job.args, **job.kwargs)
+                    except Exception as err:
+                        error = err
+            if error is not None:
+                self._finish(job, handle, None, error)
+                continue
+            job.process.add_done_callback(
+                lambda process, job=job, handle=handle:
+                    self._finish(job, handle, process))
+
+    def _finish(self, job, handle, process, error=None):
+        """Free the worker and slot of a job and pass on its result."""
+        self.slots.release(handle)
+        with self._condition:
+            self._running[job.owner] -= 1
+            self._jobs.pop(job.future, None)
+            self._condition.notify_all()
+        if error is None and process.cancelled():
+            error = CancelledError()
+        elif error is None:
+            error = process.exception()
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(process.result())
@@ -0,0 +1,98 @@
+"""Speed of the machine relative to a reference machine."""
+import os
+import socket
+import statistics
+import timeit
+
+# Speed factor of this machine per reference runtime, benchmarks run once
+_speed_factors = {}
+
+
+def benchmark_problem():
+    """Bundled problem of the speed benchmark.
+
+    return str domain path, str problem path
+    """
+    folder = os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), 'test_problems', 'depot')
+
+    return f'{folder}/domain.pddl', f'{folder}/problem.pddl'
+
+
+def benchmark(engine='tamer', repeats=3):
+    """Seconds a fixed planner run takes on this machine.
+
+    The engine solves the bundled depot problem with its default
+    options, the median of the repeats is the benchmark time.
+
+    parameter engine: str, name of a deterministic engine.
+    parameter repeats: int, number of runs.
+
+    return float
+    """
+    from unified_planning.io import PDDLReader
+    from unified_planning.shortcuts import OneshotPlanner, get_environment
+
+    get_environment().credits_stream = None
+    domain, problem = benchmark_problem()
+    problem = PDDLReader().parse_problem(domain, problem)
+    times = []
+    for _ in range(repeats):
+        with OneshotPlanner(name=engine) as planner:
+            start = timeit.default_timer()
+            planner.solve(problem)
+            times.append(timeit.default_timer() - start)
+
+    return statistics.median(times)
+
+
+def speed_factor(reference_seconds, engine='tamer', repeats=3):
+    """How much slower this machine is than the reference machine.
+
+    The benchmark runs once per machine and reference, later calls in
+    the same process return the cached factor.
+
+    parameter reference_seconds: float, benchmark time on the reference
+        machine.
+    parameter engine: str, engine of the benchmark.
+    parameter repeats: int, number of benchmark runs.
+
+    return float (above 1 on slower machines)
+    """
+    key = (socket.gethostname(), reference_seconds, engine)
+    if key not in _speed_factors:
+        seconds = benchmark(engine, repeats)
+        _speed_factors[key] = seconds / reference_seconds
+        print(f'\nSpeed factor of {key[0]}: {_speed_factors[key]}\n')
+
+    return _speed_factors[key]
+
+
+def known_speed_factors(reference_seconds=None, engine='tamer'):
+    """Speed factors benchmarked in this process.
+
+    Runs on the workers of a cluster before their first trial, so that
+    the benchmark is not timed as part of a run.
+
+    parameter reference_seconds: float, benchmark time on the reference
+        machine, no new benchmark if None.
+    parameter engine: str, engine of the benchmark.
+
+    return dict of (host, reference, engine) keys and speed factors
+    """
+    if reference_seconds is not None:
+        speed_factor(reference_seconds, engine)
+
+    return dict(_speed_factors)
+
+
+def add_speed_factors(factors):
+    """Reuse speed factors benchmarked in other processes.
+
+    Trials in fresh processes then skip the benchmark of their machine.
+    Factors of other hosts are never looked up, since keys include the
+    host name.
+
+    parameter factors: dict, see known_speed_factors.
+    """
+    _speed_factors.update(factors)
@@ -0,0 +1,217 @@
+"""Store of evaluated configurations shared between campaigns."""
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+
+def encode_cost(cost):
+    """Encode costs of several objectives as json.
+
+    parameter cost: float or dict, cost of a trial.
+
+    return float or str
+    """
+    if isinstance(cost, dict):
+        return json.dumps(cost)
+
+    return cost
+
+
+def decode_cost(cost):
+    """Decode costs of several objectives from json.
+
+    parameter cost: float or str, stored cost of a trial.
+
+    return float or dict
+    """
+    if isinstance(cost, str):
+        return json.loads(cost)
+
+    return cost
+
+
+class TrialStore():
+    """Trial results in a sqlite file, keyed by canonical configuration.
+
+    Trials are also keyed by the settings that define their cost, e.g.
+    the PAR-k penalty, so campaigns with other settings do not reuse them.
+
+    Every process opens its own connection to the file, so the store can
+    be pickled into the workers of SMAC, irace and OAT and they all see
+    the same evaluations. A temporary store is deleted when the process
+    that created it exits.
+    """
+
+    columns = ('engine', 'metric', 'mode', 'config_hash', 'instance',
+               'timelimit', 'settings', 'cost', 'config', 'info', 'created')
+
+    def __init__(self, path=None):
+        """Open or create a trial store.
+
+        parameter path: str, sqlite file, a temporary file if None.
+        """
+        self.temporary = path is None
+        if self.temporary:
+            fd, path = tempfile.mkstemp(prefix='up_ac_trials_',
+                                        suffix='.sqlite')
+            os.close(fd)
+            atexit.register(self.remove)
+        self.path = path
+        self._owner = os.getpid()
+        self._connection = None
+        self._pid = None
+        # Creates the tables
+        self.connection
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_pid'] = None
+
+        return state
+
+    def remove(self):
+        """Delete a temporary store.
+
+        Copies in other processes, e.g. workers of a configurator, leave
+        the file to the process that created it.
+        """
+        if not self.temporary or self._owner != os.getpid():
+            return
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+    @property
+    def connection(self):
+        """Sqlite connection of the current process.
+
+        Copies on machines without the file of the store, e.g. dask
+        workers on other nodes, start an empty store of their own.
+        """
+        if self._connection is None or self._pid != os.getpid():
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._pid = os.getpid()
+            with self._connection:
+                self._connection.execute(
+                    'CREATE TABLE IF NOT EXISTS trials ('
+                    'engine TEXT, metric TEXT, mode TEXT, config_hash TEXT, '
+                    'instance TEXT, timelimit REAL, settings TEXT, '
+                    'cost REAL, config TEXT, info TEXT, created REAL, '
+                    'PRIMARY KEY (engine, metric, mode, config_hash, '
+                    'instance, timelimit, settings))')
+                self._connection.execute(
+                    'CREATE TABLE IF NOT EXISTS quarantine ('
+                    'engine TEXT, mode TEXT, config_hash TEXT, reason TEXT, '
+                    'created REAL, PRIMARY KEY (engine, mode, config_hash))')
+
+        return self._connection
+
+    def lookup(self, engine, metric, mode, config_hash, instance,
+               timelimit, settings=''):
+        """Cost of a recorded trial.
+
+        parameter engine: str, name of engine.
+        parameter metric: str, optimization metric.
+        parameter mode: str, type of planning.
+        parameter config_hash: str, hash of the engine invocation.
+        parameter instance: str, path of the problem instance.
+        parameter timelimit: float, time limit of the trial.
+        parameter settings: str, settings defining the cost, see
+            Configurator.cost_settings.
+
+        return float or None (None if the trial was not recorded)
+        """
+        row = self.connection.execute(
+            'SELECT cost FROM trials WHERE engine=? AND metric=? AND '
+            'mode=? AND config_hash=? AND instance=? AND timelimit=? AND '
+            'settings=?', (engine, metric, mode, config_hash, instance,
+                           timelimit, settings)).fetchone()
+
+        return None if row is None else decode_cost(row[0])
+
+    def record(self, engine, metric, mode, config_hash, instance,
+               timelimit, cost, config=None, info=None, settings=''):
+        """Record the cost of a trial.
+
+        parameter engine: str, name of engine.
+        parameter metric: str, optimization metric.
+        parameter mode: str, type of planning.
+        parameter config_hash: str, hash of the engine invocation.
+        parameter instance: str, path of the problem instance.
+        parameter timelimit: float, time limit of the trial.
+        parameter cost: float or dict, cost the configurator minimizes,
+            costs by objective for several objectives.
+        parameter config: dict, canonical configuration.
+        parameter info: dict, further information on the run.
+        parameter settings: str, settings defining the cost, see
+            Configurator.cost_settings.
+        """
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO trials VALUES '
+                '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (engine, metric, mode, config_hash, instance, timelimit,
+                 settings, encode_cost(cost), json.dumps(config), json.dumps(info),
+                 time.time()))
+
+    def quarantine(self, engine, mode, config_hash, reason):
+        """Quarantine a configuration that crashes on every instance.
+
+        parameter engine: str, name of engine.
+        parameter mode: str, type of planning.
+        parameter config_hash: str, hash of the engine invocation.
+        parameter reason: str, error the engine reported.
+        """
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO quarantine VALUES (?, ?, ?, ?, ?)',
+                (engine, mode, config_hash, reason, time.time()))
+
+    def quarantined(self, engine, mode, config_hash):
+        """Reason a configuration was quarantined for.
+
+        parameter engine: str, name of engine.
+        parameter mode: str, type of planning.
+        parameter config_hash: str, hash of the engine invocation.
+
+        return str or None (None if the configuration is not quarantined)
+        """
+        row = self.connection.execute(
+            'SELECT reason FROM quarantine WHERE engine=? AND mode=? AND '
+            'config_hash=?', (engine, mode, config_hash)).fetchone()
+
+        return None if row is None else row[0]
+
+    def trials(self, **filters):
+        """Recorded trials.
+
+        parameter filters: column names with values to select.
+
+        return list of dicts
+        """
+        for column in filters:
+            if column not in self.columns:
+                raise ValueError(f'Unknown trial column {column}')
+        query = 'SELECT * FROM trials'
+        if filters:
+            query += ' WHERE ' + \
+                ' AND '.join(f'{column}=?' for column in filters)
+        rows = self.connection.execute(query, tuple(filters.values()))
+        trials = []
+        for row in rows:
+            trial = dict(zip(self.columns, row))
+            trial['cost'] = decode_cost(trial['cost'])
+            trial['config'] = json.loads(trial['config'])
+            trial['info'] = json.loads(trial['info'])
+            trials.append(trial)
+
+        return trials